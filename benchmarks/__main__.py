@@ -0,0 +1,55 @@
+"""
+Benchmark suite for the simulation hot paths.
+
+Runs fixed-seed microbenchmarks and end-to-end simulations at several deck counts and concurrencies, writes the
+rates as JSON, and (optionally) flags regressions against a stored baseline:
+
+    $ python -m benchmarks -o results.json
+    $ python -m benchmarks -o new.json --baseline results.json --tolerance 0.1
+"""
+
+import sys
+from argparse import ArgumentParser
+
+from benchmarks.end_to_end import simulate
+from benchmarks.micro import MICROBENCHMARKS
+from benchmarks.results import find_regressions, load_results, write_results
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser()
+    parser.add_argument('-o', '--output', help='Path of the JSON file to write results to', default='benchmark_results.json')
+    parser.add_argument('-b', '--baseline', help='Path of baseline JSON results to flag regressions against')
+    parser.add_argument('--tolerance', help='Fractional slowdown against the baseline that counts as a regression', type=float, default=0.1)
+    parser.add_argument('-d', '--decks', help='Deck counts for end-to-end simulations', type=int, nargs='+', default=[1, 3, 6])
+    parser.add_argument('-c', '--concurrency', help='Concurrencies for end-to-end simulations', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('-g', '--games', help='Number of games per end-to-end simulation', type=int, default=1000)
+    parser.add_argument('--micro-only', help='Skip the end-to-end simulations', action='store_true')
+    args = parser.parse_args()
+
+    results = {}
+
+    def record(name, value, unit):
+        results[name] = {'value': value, 'unit': unit}
+        print(f"{name:<40} {value:>16,.0f} {unit}")
+
+    for name, unit, benchmark in MICROBENCHMARKS:
+        record(name, benchmark(), unit)
+
+    if not args.micro_only:
+        for number_of_decks in args.decks:
+            for concurrency in args.concurrency:
+                name = f"simulate[decks={number_of_decks},concurrency={concurrency}]"
+                record(name, simulate(number_of_decks, concurrency, args.games), 'hands/s')
+
+    write_results(args.output, results)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = find_regressions(results, load_results(args.baseline), args.tolerance)
+        for name, baseline_value, value, ratio in regressions:
+            print(f"REGRESSION {name}: {baseline_value:,.0f} -> {value:,.0f} ({ratio - 1:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
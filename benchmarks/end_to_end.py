@@ -0,0 +1,31 @@
+"""End-to-end benchmark of the `simulate.py` pipeline (worker pool, batches and summary merging) in hands/second."""
+
+import multiprocessing as mp
+from time import perf_counter
+
+from blackjack.analytics.metric_summary import MetricSummary
+from blackjack.configuration import get_simulation_configuration
+from blackjack.simulation import default_chunk_size, game_batches, init_worker, run_games
+from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
+
+
+SEED = 1234
+
+
+def simulate(number_of_decks, concurrency, games, max_turns=100, bankroll=1000.0, auto_wager=100.0):
+    """
+    Run a seeded simulation the way `simulate.py` does and return the hands played per second (split hands count
+    separately). Pool start-up is included in the timing, as it is part of every run.
+    """
+    configuration = get_simulation_configuration(bankroll, auto_wager, number_of_decks, DefaultStaticStrategy, max_turns)
+    chunk_size = default_chunk_size(games, concurrency)
+
+    start = perf_counter()
+    summary = MetricSummary()
+    with mp.Pool(concurrency, initializer=init_worker, initargs=(configuration, 0, SEED)) as pool:
+        for batch_summary in pool.imap(run_games, game_batches(games, chunk_size)):
+            summary.update(batch_summary)
+    elapsed = perf_counter() - start
+
+    hands = summary.wins + summary.losses + summary.pushes + summary.insurance_wins
+    return hands / elapsed
@@ -0,0 +1,102 @@
+"""
+Benchmark comparing the verbose-capable GameController against the HeadlessGameController and BatchGameController.
+
+All controllers are first checked to produce identical metrics for the same seeds, then timed in hands/second.
+
+    $ python -m benchmarks.engines -g 200 -t 100
+"""
+
+import random
+from argparse import ArgumentParser
+from time import perf_counter
+
+from blackjack.controllers.batch_game_controller import BatchGameController
+from blackjack.controllers.game_controller import GameController
+from blackjack.controllers.headless_game_controller import HeadlessGameController
+from blackjack.models.dealer import Dealer
+from blackjack.models.gambler import Gambler
+from blackjack.models.shoe import Shoe
+from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
+
+
+def build_game(controller_class, seed, strategy, number_of_decks, max_turns, bankroll=1000.0, auto_wager=100.0,
+               track_deals=False):
+    """Build a non-verbose game with the given controller class and a seeded shoe."""
+    gambler = Gambler('Gambler', bankroll=bankroll, auto_wager=auto_wager)
+    shoe = Shoe(number_of_decks, rng=random.Random(seed))
+    if controller_class is GameController:
+        return GameController(
+            gambler, Dealer(), shoe, strategy, verbose=False, max_turns=max_turns, track_deals=track_deals
+        )
+    return controller_class(gambler, Dealer(), shoe, strategy, max_turns=max_turns, track_deals=track_deals)
+
+
+def build_batch_game(seeds, strategy, number_of_decks, max_turns, bankroll=1000.0, auto_wager=100.0,
+                     track_deals=False):
+    """Build a BatchGameController playing one game per seed, with each shoe seeded like `build_game`'s."""
+    rngs = [random.Random(seed) for seed in seeds]
+    return BatchGameController(
+        'Gambler', bankroll, auto_wager, number_of_decks, strategy, rngs, max_turns=max_turns, track_deals=track_deals
+    )
+
+
+def tracked_metrics(metric_tracker):
+    """Get the tracked metrics of a game, with the deal codes tracked for variance reduction."""
+    return metric_tracker.serialize_metrics(), metric_tracker.deals
+
+
+def check_parity(games, number_of_decks, max_turns):
+    """Assert that all controllers produce identical metrics (including tracked deals) for the same seeds."""
+    strategy = DefaultStaticStrategy()
+    for seed in range(games):
+        results = []
+        for controller_class in (GameController, HeadlessGameController):
+            game = build_game(controller_class, seed, strategy, number_of_decks, max_turns, track_deals=True)
+            game.play()
+            results.append(tracked_metrics(game.metric_tracker))
+        assert results[0] == results[1], f"Controllers diverged for seed {seed}"
+
+    batch = build_batch_game(range(games), strategy, number_of_decks, max_turns, track_deals=True)
+    batch.play()
+    for seed, metric_tracker in enumerate(batch.metric_trackers()):
+        game = build_game(HeadlessGameController, seed, strategy, number_of_decks, max_turns, track_deals=True)
+        game.play()
+        assert tracked_metrics(game.metric_tracker) == tracked_metrics(metric_tracker), \
+            f"Batch controller diverged for seed {seed}"
+
+
+def hands_per_second(controller_class, games, number_of_decks, max_turns):
+    """Play a number of seeded games with a controller class and return the hands played per second."""
+    strategy = DefaultStaticStrategy()
+    if controller_class is BatchGameController:
+        game = build_batch_game(range(games), strategy, number_of_decks, max_turns)
+        start = perf_counter()
+        game.play()
+        game.metric_trackers()
+        return int(game.turn.sum()) / (perf_counter() - start)
+
+    hands = 0
+    elapsed = 0.0
+    for seed in range(games):
+        game = build_game(controller_class, seed, strategy, number_of_decks, max_turns)
+        start = perf_counter()
+        game.play()
+        elapsed += perf_counter() - start
+        hands += game.turn
+    return hands / elapsed
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser()
+    parser.add_argument('-d', '--decks', help='Number of decks to play with', type=int, default=3)
+    parser.add_argument('-g', '--games', help='Number of games to play per controller', type=int, default=200)
+    parser.add_argument('-t', '--turns', help='Max number of turns to play per game', type=int, default=100)
+    args = parser.parse_args()
+
+    check_parity(args.games, args.decks, args.turns)
+    print(f"Parity check passed for {args.games} seeded games.\n")
+
+    for controller_class in (GameController, HeadlessGameController, BatchGameController):
+        rate = hands_per_second(controller_class, args.games, args.decks, args.turns)
+        print(f"{controller_class.__name__:<24} {rate:>12,.0f} hands/second")
@@ -0,0 +1,152 @@
+"""Fixed-seed microbenchmarks for the simulation hot paths. Each returns a rate (operations per second)."""
+
+import random
+import subprocess
+import sys
+from time import perf_counter
+
+from benchmarks.engines import build_game
+from benchmarks.strategies import decision_arrays, sample_decisions
+from blackjack.analytics.multi_game_analyzer import MultiGameAnalyzer
+from blackjack.controllers.game_controller import GameController
+from blackjack.controllers.headless_game_controller import HeadlessGameController
+from blackjack.models.hand import GamblerHand
+from blackjack.models.shoe import Shoe
+from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
+
+
+SEED = 1234
+
+# Modules that are slow to import, and that simulations should not need
+HEAVY_MODULES = ('pandas', 'matplotlib')
+
+# Run in a fresh interpreter by `startup`: time importing the simulation and loading a strategy (as every worker
+# does), then list any heavy modules that were imported along the way.
+STARTUP_SCRIPT = f"""
+import sys
+from time import perf_counter
+start = perf_counter()
+import blackjack.simulation
+from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
+DefaultStaticStrategy()
+print(perf_counter() - start, *(module for module in {HEAVY_MODULES!r} if module in sys.modules))
+"""
+
+
+def best_rate(operation, operations, repeats=3):
+    """Run an operation (which performs a known number of operations) a few times and return the best rate."""
+    best = 0.0
+    for _ in range(repeats):
+        start = perf_counter()
+        operation()
+        best = max(best, operations / (perf_counter() - start))
+    return best
+
+
+def play_games(controller_class, games, number_of_decks=3, max_turns=100):
+    """Hands/second of `play` for a controller class, over fixed-seed games."""
+    strategy = DefaultStaticStrategy()
+    hands = 0
+    elapsed = 0.0
+    for seed in range(SEED, SEED + games):
+        game = build_game(controller_class, seed, strategy, number_of_decks, max_turns)
+        start = perf_counter()
+        game.play()
+        elapsed += perf_counter() - start
+        hands += game.turn
+    return hands / elapsed
+
+
+def game_controller_play(games=100):
+    """Hands/second of `GameController.play` (non-verbose)."""
+    return play_games(GameController, games)
+
+
+def headless_game_controller_play(games=100):
+    """Hands/second of `HeadlessGameController.play`."""
+    return play_games(HeadlessGameController, games)
+
+
+def shoe_deal_card(cards=200000, number_of_decks=6):
+    """Cards/second dealt one at a time (including reshuffles) from a fixed-seed shoe."""
+    shoe = Shoe(number_of_decks, rng=random.Random(SEED))
+    deal_card = shoe.deal_card
+
+    def deal():
+        for _ in range(cards):
+            deal_card()
+
+    return best_rate(deal, cards)
+
+
+def hand_possible_totals(hands=2000, calls_per_hand=50):
+    """Calls/second of `possible_totals` over fixed-seed 2 to 4 card hands."""
+    shoe = Shoe(6, rng=random.Random(SEED))
+    sample = [GamblerHand(cards=shoe.deal_n_cards(2 + index % 3)) for index in range(hands)]
+
+    def total():
+        for hand in sample:
+            for _ in range(calls_per_hand):
+                hand.possible_totals()
+
+    return best_rate(total, hands * calls_per_hand)
+
+
+def strategy_get_hand_action(decisions=20000):
+    """Decisions/second of `BaseStaticStrategy.get_hand_action` over fixed-seed decisions."""
+    strategy = DefaultStaticStrategy()
+    sample = sample_decisions(decisions, seed=SEED)
+    get_hand_action = strategy.get_hand_action
+
+    def decide():
+        for hand, options, upcard in sample:
+            get_hand_action(hand, options, upcard)
+
+    return best_rate(decide, decisions)
+
+
+def strategy_get_hand_actions(decisions=20000):
+    """Decisions/second of the batched `BaseStaticStrategy.get_hand_actions` over fixed-seed decisions."""
+    strategy = DefaultStaticStrategy()
+    arrays = decision_arrays(sample_decisions(decisions, seed=SEED))
+    return best_rate(lambda: strategy.get_hand_actions(*arrays), decisions)
+
+
+def multi_game_analyzer(games=2000):
+    """Games/second merged and analyzed by `MultiGameAnalyzer`, from the MetricTrackers of fixed-seed games."""
+    strategy = DefaultStaticStrategy()
+    metric_trackers = []
+    for seed in range(SEED, SEED + games):
+        game = build_game(HeadlessGameController, seed, strategy, 3, 100)
+        game.play()
+        metric_trackers.append(game.metric_tracker)
+
+    def analyze():
+        analyzer = MultiGameAnalyzer.from_metric_trackers(metric_trackers)
+        analyzer.summary.final_bankroll_quantile(0.5)
+
+    return best_rate(analyze, games)
+
+
+def startup(repeats=3):
+    """Startups/second of a simulation worker in a fresh interpreter (imports and strategy loading)."""
+    best = 0.0
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], capture_output=True, text=True, check=True).stdout
+        elapsed, *heavy_modules = output.split()
+        assert not heavy_modules, f"Simulation startup imported {', '.join(heavy_modules)}"
+        best = max(best, 1 / float(elapsed))
+    return best
+
+
+# Name, unit and function of each microbenchmark
+MICROBENCHMARKS = [
+    ('game_controller.play', 'hands/s', game_controller_play),
+    ('headless_game_controller.play', 'hands/s', headless_game_controller_play),
+    ('shoe.deal_card', 'cards/s', shoe_deal_card),
+    ('hand.possible_totals', 'calls/s', hand_possible_totals),
+    ('strategy.get_hand_action', 'decisions/s', strategy_get_hand_action),
+    ('strategy.get_hand_actions', 'decisions/s', strategy_get_hand_actions),
+    ('multi_game_analyzer', 'games/s', multi_game_analyzer),
+    ('startup', 'startups/s', startup),
+]
@@ -0,0 +1,85 @@
+"""
+Benchmark of replaying recorded hand histories against simulating fresh games.
+
+Seeded games are recorded to a hand history, which is checked to replay them exactly (both one game at a time and in
+lockstep) with the strategy they were recorded with. Fresh simulation and replays are then timed in hands/second, and
+two strategies are compared on the identical recorded cards.
+
+    $ python -m benchmarks.replay -g 1000 -t 100
+"""
+
+import os
+import random
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+
+from benchmarks.engines import build_game
+from blackjack.controllers.headless_game_controller import HeadlessGameController
+from blackjack.history.hand_history import HandHistory, HandHistoryWriter
+from blackjack.history.replay import replay_game, replay_games
+from blackjack.models.dealer import Dealer
+from blackjack.models.gambler import Gambler
+from blackjack.models.shoe import Shoe
+from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
+from blackjack.strategies.insurance_static_strategy import InsuranceStaticStrategy
+
+
+def record_games(path, games, strategy, number_of_decks, max_turns, bankroll=1000.0, auto_wager=100.0):
+    """Play seeded games (as `build_game` seeds them), recording their hand histories, and return their MetricTrackers."""
+    metric_trackers = []
+    with HandHistoryWriter(path) as history:
+        for seed in range(games):
+            gambler = Gambler('Gambler', bankroll=bankroll, auto_wager=auto_wager)
+            shoe = Shoe(number_of_decks, rng=random.Random(seed))
+            game = HeadlessGameController(gambler, Dealer(), shoe, strategy, max_turns=max_turns, history=history)
+            game.play()
+            metric_trackers.append(game.metric_tracker)
+    return metric_trackers
+
+
+def hands(metric_trackers):
+    """Count the turns played in a list of MetricTrackers."""
+    return sum(len(metric_tracker.bankroll_progression) - 1 for metric_tracker in metric_trackers)
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser()
+    parser.add_argument('-d', '--decks', help='Number of decks to play with', type=int, default=3)
+    parser.add_argument('-g', '--games', help='Number of games to record and replay', type=int, default=1000)
+    parser.add_argument('-t', '--turns', help='Max number of turns to play per game', type=int, default=100)
+    args = parser.parse_args()
+
+    strategy = DefaultStaticStrategy()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'history.bjh')
+        recorded = record_games(path, args.games, strategy, args.decks, args.turns)
+        print(f"Recorded {args.games} games in {os.path.getsize(path):,} bytes.")
+
+        history = HandHistory(path)
+        expected = [metric_tracker.serialize_metrics() for metric_tracker in recorded]
+        assert [replay_game(game, strategy).metric_tracker.serialize_metrics() for game in history.games] == expected
+        assert [metric_tracker.serialize_metrics() for metric_tracker in replay_games(history.games, strategy)] == expected
+        print('Replays reproduce every recorded game.\n')
+
+        start = perf_counter()
+        for seed in range(args.games):
+            build_game(HeadlessGameController, seed, strategy, args.decks, args.turns).play()
+        fresh = hands(recorded) / (perf_counter() - start)
+
+        start = perf_counter()
+        replayed = [replay_game(game, strategy).metric_tracker for game in history.games]
+        one_at_a_time = hands(replayed) / (perf_counter() - start)
+
+        start = perf_counter()
+        replayed = replay_games(history.games, strategy)
+        lockstep = hands(replayed) / (perf_counter() - start)
+
+        print(f"{'fresh simulation':<24} {fresh:>12,.0f} hands/second")
+        print(f"{'replay (one at a time)':<24} {one_at_a_time:>12,.0f} hands/second")
+        print(f"{'replay (lockstep)':<24} {lockstep:>12,.0f} hands/second\n")
+
+        for compared in (strategy, InsuranceStaticStrategy()):
+            final_bankrolls = [metric_tracker.bankroll_progression[-1] for metric_tracker in replay_games(history.games, compared)]
+            print(f"{type(compared).__name__:<24} {sum(final_bankrolls) / len(final_bankrolls):>12,.2f} average final bankroll")
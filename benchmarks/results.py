@@ -0,0 +1,48 @@
+"""Writing benchmark results as JSON, and flagging regressions against a stored baseline."""
+
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+
+def metadata():
+    """Describe the machine and code the benchmarks ran on, so results can be compared meaningfully."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+
+def write_results(path, results):
+    """Write benchmark results (a dict of {name: {'value': rate, 'unit': unit}}) to a JSON file."""
+    with open(path, 'w') as results_file:
+        json.dump({'metadata': metadata(), 'results': results}, results_file, indent=2)
+
+
+def load_results(path):
+    """Load the benchmark results from a JSON file written by `write_results`."""
+    with open(path) as results_file:
+        return json.load(results_file)['results']
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Compare results against baseline results (all rates, so higher is better).
+    Returns (name, baseline value, value, ratio) for each benchmark more than `tolerance` (a fraction) slower.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['value'] / baseline[name]['value']
+        if ratio < 1 - tolerance:
+            regressions.append((name, baseline[name]['value'], result['value'], ratio))
+    return regressions
@@ -0,0 +1,122 @@
+"""
+Microbenchmark comparing compiled strategy table lookups against the previous pandas `DataFrame.at` lookups, and
+against batched lookups with `get_hand_actions`.
+
+A fixed-seed sample of decisions is drawn from real deals. All lookup paths (including the per-hand fallback of the
+batched API) are checked to agree on every decision, then timed in decisions/second.
+
+    $ python -m benchmarks.strategies -n 20000
+"""
+
+import os
+import random
+from argparse import ArgumentParser
+from collections import OrderedDict
+from time import perf_counter
+
+import numpy as np
+
+from blackjack.models.card import RANK, csv_format
+from blackjack.models.hand import GamblerHand
+from blackjack.models.shoe import Shoe
+from blackjack.strategies.base_strategy import ACTIONS, NO_PAIR, BaseStrategy, action_mask
+from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
+
+
+def sample_decisions(num_decisions, seed=0, number_of_decks=3):
+    """Draw (hand, options, dealer upcard) decisions from a seeded shoe, with every action available."""
+    shoe = Shoe(number_of_decks, rng=random.Random(seed))
+    decisions = []
+    while len(decisions) < num_decisions:
+        hand = GamblerHand(cards=shoe.deal_n_cards(2))
+        upcard = shoe.deal_card()
+        options = OrderedDict([('h', 'Hit'), ('s', 'Stand'), ('d', 'Double')])
+        if hand.is_splittable():
+            options['x'] = 'Split'
+        if not hand.is_21():
+            decisions.append((hand, options, upcard))
+    return decisions
+
+
+def load_dataframes(strategy):
+    """Load the split, soft and hard decision DataFrames of a static strategy (pandas is only needed for this)."""
+    from pandas import read_csv
+    return tuple(
+        read_csv(os.path.join(strategy.csv_directory, f"{csv_type}.csv"), index_col=0)
+        for csv_type in ('split', 'soft', 'hard')
+    )
+
+
+def pandas_get_hand_action(dataframes, hand, options, dealer_upcard):
+    """The pandas `DataFrame.at` lookup that BaseStaticStrategy.get_hand_action used before tables were compiled."""
+    split_df, soft_df, hard_df = dataframes
+
+    column = csv_format(dealer_upcard)
+    if 'Split' in options.values():
+        if split_df.at[csv_format(hand.cards[0]), column] == 'Yes':
+            return 'Split'
+
+    row = hand.final_total()
+    action = soft_df.at[row, column] if hand.is_soft() else hard_df.at[row, column]
+    if action == 'Double' and 'Double' not in options.values():
+        return 'Hit'
+    return action
+
+
+def decision_arrays(decisions):
+    """Convert a sample of decisions into the arrays taken by `get_hand_actions`."""
+    return (
+        np.array([hand.hard_total for hand, _, _ in decisions]),
+        np.array([hand.is_soft() for hand, _, _ in decisions]),
+        np.array([RANK[hand.cards[0]] if hand.is_splittable() else NO_PAIR for hand, _, _ in decisions]),
+        np.array([upcard for _, _, upcard in decisions]),
+        np.array([action_mask(options) for _, options, _ in decisions])
+    )
+
+
+def batched_decisions_per_second(get_actions, arrays):
+    """Time a batched lookup function over the arrays of a sample of decisions."""
+    start = perf_counter()
+    get_actions(*arrays)
+    return len(arrays[0]) / (perf_counter() - start)
+
+
+def decisions_per_second(get_action, decisions):
+    """Time a lookup function over a sample of decisions."""
+    start = perf_counter()
+    for hand, options, upcard in decisions:
+        get_action(hand, options, upcard)
+    return len(decisions) / (perf_counter() - start)
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser()
+    parser.add_argument('-n', '--decisions', help='Number of decisions to sample', type=int, default=20000)
+    args = parser.parse_args()
+
+    strategy = DefaultStaticStrategy()
+    decisions = sample_decisions(args.decisions)
+
+    dataframes = load_dataframes(strategy)
+
+    def legacy(hand, options, upcard):
+        return pandas_get_hand_action(dataframes, hand, options, upcard)
+
+    for hand, options, upcard in decisions:
+        assert strategy.get_hand_action(hand, options, upcard) == legacy(hand, options, upcard)
+    print(f"Compiled tables agree with pandas lookups on {len(decisions)} decisions.")
+
+    arrays = decision_arrays(decisions)
+    expected = [strategy.get_hand_action(hand, options, upcard) for hand, options, upcard in decisions]
+    assert [ACTIONS[code] for code in strategy.get_hand_actions(*arrays)] == expected
+    assert [ACTIONS[code] for code in BaseStrategy.get_hand_actions(strategy, *arrays)] == expected
+    print(f"Batched lookups (and their per-hand fallback) agree on {len(decisions)} decisions.\n")
+
+    before = decisions_per_second(legacy, decisions)
+    after = decisions_per_second(strategy.get_hand_action, decisions)
+    batched = batched_decisions_per_second(strategy.get_hand_actions, arrays)
+    print(f"{'pandas DataFrame.at':<24} {before:>14,.0f} decisions/second")
+    print(f"{'compiled tables':<24} {after:>14,.0f} decisions/second")
+    print(f"{'batched tables':<24} {batched:>14,.0f} decisions/second")
+    print(f"\nSpeedup: {after / before:.1f}x")
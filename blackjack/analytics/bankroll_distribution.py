@@ -0,0 +1,144 @@
+"""
+Final bankroll distributions of flat-betting games, by convolution instead of simulating every game.
+
+With a flat bet, a game is a random walk of independent hands: each moves the bankroll by a net payout that is a
+multiple of half a wager (e.g. -1 for a loss, +1.5 for a blackjack, +2 for a won double, -0.5 for a lost insurance
+bet). The distribution of those payouts (in wagers) is estimated once, from hands simulated with a bankroll too large
+to ever limit a bet (see PayoutDistribution.simulate). The distribution of the bankroll is then stepped through the
+turns of a game by convolving it with the payout distribution, on a lattice of half wagers, with an absorbing barrier
+at ruin (no bankroll left). This gives the final bankroll distribution of any bankroll, wager and number of turns in
+milliseconds, without the sampling noise of simulated games.
+
+The walk plays every hand as a full flat bet down to ruin, where a real game bets whatever bankroll is left once it
+can't cover a wager (and stops doubling or splitting once it can't afford to), so results near ruin are approximate.
+"""
+
+import numpy as np
+
+from blackjack.controllers.batch_game_controller import BatchGameController
+from blackjack.controllers.headless_game_controller import HeadlessGameController
+from blackjack.display_utils import money_format, pct_format
+from blackjack.history.replay import can_replay_in_lockstep
+from blackjack.models.dealer import Dealer
+from blackjack.models.gambler import Gambler
+from blackjack.models.shoe import Shoe
+from blackjack.simulation import game_generator, game_rng, new_seed
+
+
+# Payouts (and bankrolls) are counted in steps of half a wager.
+STEPS_PER_WAGER = 2
+
+# Quantiles of the final bankroll printed by BankrollDistribution.print_summary
+SUMMARY_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+class PayoutDistribution:
+    """Probabilities of the net payout of a hand, in steps of half a wager from the lowest payout (`low`, in steps)."""
+
+    def __init__(self, low, probabilities, hands):
+        self.low = low
+        self.probabilities = probabilities
+        self.hands = hands  # Number of hands the distribution was estimated from
+
+    @classmethod
+    def from_payouts(cls, payouts):
+        """Estimate the distribution from an array of hand payouts, in wagers."""
+        steps = np.rint(np.asarray(payouts) * STEPS_PER_WAGER).astype(np.int64)
+        if not np.allclose(steps, np.asarray(payouts) * STEPS_PER_WAGER):
+            raise ValueError('Hand payouts must be multiples of half a wager')
+        low = int(steps.min())
+        counts = np.bincount(steps - low)
+        return cls(low, counts / counts.sum(), len(steps))
+
+    @classmethod
+    def simulate(cls, strategy, number_of_decks, hands, seed=None, games=100, auto_wager=100.0):
+        """
+        Estimate the distribution of a flat-betting strategy from a number of simulated hands, spread over a number
+        of games. Games start with enough bankroll to never limit a bet (a hand can lose at most 8 wagers, splitting
+        into 4 doubled hands), and are played in lockstep by the batch engine if the strategy allows it.
+        """
+        if strategy.wants_to_change_wager():
+            raise ValueError('Payout distributions need a flat-betting strategy')
+        turns = -(-hands // games)
+        bankroll = auto_wager * (8 * turns + 1)
+        if seed is None:
+            seed = new_seed()
+
+        if can_replay_in_lockstep(strategy):
+            rngs = [game_generator(seed, game_index) for game_index in range(games)]
+            game = BatchGameController('Gambler', bankroll, auto_wager, number_of_decks, strategy, rngs, max_turns=turns)
+            game.play()
+            progressions = [metric_tracker.bankroll_progression for metric_tracker in game.metric_trackers()]
+        else:
+            progressions = []
+            for game_index in range(games):
+                rng = game_rng(seed, game_index)
+                gambler = Gambler('Gambler', bankroll=bankroll, auto_wager=auto_wager)
+                game = HeadlessGameController(gambler, Dealer(), Shoe(number_of_decks, rng=rng), strategy, max_turns=turns)
+                game.play()
+                progressions.append(game.metric_tracker.bankroll_progression)
+        return cls.from_payouts(np.concatenate([np.diff(progression) for progression in progressions]) / auto_wager)
+
+    def mean(self):
+        """Get the expected net payout of a hand, in wagers."""
+        steps = np.arange(self.low, self.low + len(self.probabilities))
+        return float(steps @ self.probabilities) / STEPS_PER_WAGER
+
+
+class BankrollDistribution:
+    """Probabilities of the final bankrolls of a game (in dollars, sorted), where a bankroll of 0 means ruin."""
+
+    def __init__(self, bankrolls, probabilities):
+        self.bankrolls = bankrolls
+        self.probabilities = probabilities
+
+    @classmethod
+    def convolve(cls, payouts, bankroll, auto_wager, turns):
+        """
+        Step the distribution of a bankroll through a number of turns of flat bets of `auto_wager`, convolving it with
+        the payout distribution each turn. The bankroll is rounded down to a whole number of half wagers.
+        """
+        step = auto_wager / STEPS_PER_WAGER
+        start = int(bankroll // step)
+        high = payouts.low + len(payouts.probabilities) - 1
+        size = start + turns * max(high, 0) + 1  # The highest bankroll reachable, in steps, plus ruin
+
+        # Probability of each bankroll (in steps), with ruined games absorbed at 0.
+        probabilities = np.zeros(size, dtype=np.float64)
+        probabilities[start] = 1.0
+        offset = -payouts.low  # Index of a bankroll of 0 in a convolution of the live bankrolls
+        for _ in range(turns):
+            ruined = probabilities[0]
+            probabilities[0] = 0.0
+            stepped = np.convolve(probabilities, payouts.probabilities)
+            probabilities = np.zeros(size, dtype=np.float64)
+            probabilities[0] = ruined + stepped[:offset + 1].sum()
+            live = stepped[offset + 1:offset + size]
+            probabilities[1:1 + len(live)] = live
+
+        reachable = np.flatnonzero(probabilities)
+        return cls(reachable * step, probabilities[reachable])
+
+    def risk_of_ruin(self):
+        """Get the probability of losing the whole bankroll by the end of the game."""
+        return float(self.probabilities[0]) if self.bankrolls[0] == 0 else 0.0
+
+    def mean(self):
+        """Get the expected final bankroll."""
+        return float(self.bankrolls @ self.probabilities)
+
+    def quantile(self, quantile):
+        """Get a quantile (between 0 and 1) of the final bankroll (the lowest bankroll reaching it)."""
+        index = np.searchsorted(np.cumsum(self.probabilities), quantile * (1 - 1e-12))
+        return float(self.bankrolls[min(index, len(self.bankrolls) - 1)])
+
+    def print_summary(self, payouts):
+        """Print the risk of ruin, mean and quantiles of the final bankroll, and the payouts they were computed from."""
+        print('--- Bankroll Distribution (Convolution) ---\n')
+        print(f"Payouts estimated from {payouts.hands:,} simulated hands "
+              f"(EV {pct_format(payouts.mean() * 100)} of the wager per hand)\n")
+        print(f"Risk of Ruin: {self.risk_of_ruin():.2%}")
+        print(f"Avg Bankroll: {money_format(self.mean())}")
+        for quantile in SUMMARY_QUANTILES:
+            print(f"{quantile:.0%} Quantile: {money_format(self.quantile(quantile))}")
+        print()
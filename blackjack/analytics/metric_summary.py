@@ -0,0 +1,252 @@
+from collections import Counter
+
+import numpy as np
+
+
+# Codes for the win/loss results tracked (in order) by MetricTracker.wins_losses, an int8 buffer.
+WIN = 1
+LOSS = -1
+
+# Normal quantile of a two-sided 95% confidence interval
+Z_95 = 1.959963984540054
+
+
+def run_lengths(outcomes):
+    """Run-length encode an int8 array of outcomes, returning arrays of the result and length of each run (streak)."""
+    if not outcomes.size:
+        return outcomes, np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.concatenate(([True], outcomes[1:] != outcomes[:-1])))
+    return outcomes[starts], np.diff(np.append(starts, outcomes.size))
+
+
+def add_histograms(histogram, other):
+    """Add two histograms of counts indexed by value (e.g. streak length), which may differ in length."""
+    if len(histogram) < len(other):
+        histogram, other = other, histogram
+    histogram = histogram.copy()
+    histogram[:len(other)] += other
+    return histogram
+
+
+class MetricSummary:
+    """
+    Compact, mergeable summary of the tracked metrics of one or more games, for analyzing many simulated games.
+
+    Holds metric counts, a histogram of final bankrolls and histograms of winning/losing streaks, so its size does not
+    grow with the number of games or turns summarized. Summaries are merged in game order, and streaks that run
+    across the boundary between two summaries are joined, exactly as if all games' results had been concatenated.
+    """
+
+    COUNTS = ('wins', 'losses', 'pushes', 'insurance_wins', 'insurance_losses', 'gambler_blackjacks', 'dealer_blackjacks')
+
+    def __init__(self):
+        # Metric counts (see MetricTracker)
+        self.wins = 0
+        self.losses = 0
+        self.pushes = 0
+        self.insurance_wins = 0
+        self.insurance_losses = 0
+        self.gambler_blackjacks = 0
+        self.dealer_blackjacks = 0
+
+        # Number of games summarized, their (shared) initial bankroll and a histogram of their final bankrolls
+        self.games = 0
+        self.initial_bankroll = None
+        self.final_bankrolls = Counter()
+
+        # Number of turns played, and the sum and sum of squares of the net result of each turn (its bankroll change),
+        # for estimating the expected value of a hand
+        self.turns = 0
+        self.turn_net_sum = 0.0
+        self.turn_net_squares = 0.0
+
+        # Histograms of streak lengths (count of streaks indexed by length), for streaks that are closed off on both
+        # sides within the summarized games
+        self.winning_streaks = np.zeros(1, dtype=np.int64)
+        self.losing_streaks = np.zeros(1, dtype=np.int64)
+
+        # Streaks that are still open at either end of the summarized games, as (result, length) pairs.
+        # `last_streak` is None when all results so far form a single streak.
+        self.first_streak = None
+        self.last_streak = None
+
+        # Full bankroll progressions of the games that were sampled to keep them
+        self.bankroll_progressions = []
+
+        # Accumulators of the variance reduction techniques in use, if any (see variance_reduction.VarianceReduction)
+        self.variance_reduction = None
+
+        # Timings of the phases of the games, if they were timed (see phase_timings.PhaseTimings)
+        self.phase_timings = None
+
+    @classmethod
+    def from_metric_tracker(cls, metric_tracker, keep_bankroll_progression=False):
+        """Summarize the metrics tracked for a single game."""
+        summary = cls()
+        for count in cls.COUNTS:
+            setattr(summary, count, getattr(metric_tracker, count))
+
+        bankroll_progression = metric_tracker.bankroll_progression
+        summary.games = 1
+        summary.initial_bankroll = bankroll_progression[0]
+        summary.final_bankrolls[bankroll_progression[-1]] += 1
+        turn_nets = np.diff(bankroll_progression)
+        summary.turns = len(turn_nets)
+        summary.turn_net_sum = float(turn_nets.sum())
+        summary.turn_net_squares = float(np.dot(turn_nets, turn_nets))
+        if keep_bankroll_progression:
+            summary.bankroll_progressions.append(list(bankroll_progression))
+        if metric_tracker.phase_timings is not None:
+            summary.phase_timings = metric_tracker.phase_timings.copy()
+
+        summary._set_streaks(*run_lengths(metric_tracker.outcomes()))
+        return summary
+
+    def summarize(self):
+        """A summary is already summarized (mirrors MetricTracker.summarize, so either can be merged)."""
+        return self
+
+    def _set_streaks(self, results, lengths):
+        """Set the open streaks at either end from (in order) streak results and lengths, closing off those in between."""
+        if not len(lengths):
+            return
+        self.first_streak = (int(results[0]), int(lengths[0]))
+        if len(lengths) > 1:
+            self.last_streak = (int(results[-1]), int(lengths[-1]))
+        if len(lengths) > 2:
+            results, lengths = results[1:-1], lengths[1:-1]
+            self.winning_streaks = add_histograms(self.winning_streaks, np.bincount(lengths[results == WIN]))
+            self.losing_streaks = add_histograms(self.losing_streaks, np.bincount(lengths[results == LOSS]))
+
+    def _open_streaks(self):
+        """Get the streaks that are open at either end, in order."""
+        return [streak for streak in (self.first_streak, self.last_streak) if streak]
+
+    def update(self, other):
+        """
+        Fold another summary's (or MetricTracker's) games into this summary, in place, as if they were played after
+        this summary's games. Merging is associative, so summaries can be reduced in any grouping as long as the
+        order of games is kept.
+        """
+        other = other.summarize()
+        for count in self.COUNTS:
+            setattr(self, count, getattr(self, count) + getattr(other, count))
+
+        self.games += other.games
+        if self.initial_bankroll is None:
+            self.initial_bankroll = other.initial_bankroll
+        self.final_bankrolls.update(other.final_bankrolls)
+        self.turns += other.turns
+        self.turn_net_sum += other.turn_net_sum
+        self.turn_net_squares += other.turn_net_squares
+        self.winning_streaks = add_histograms(self.winning_streaks, other.winning_streaks)
+        self.losing_streaks = add_histograms(self.losing_streaks, other.losing_streaks)
+        self.bankroll_progressions.extend(other.bankroll_progressions)
+        if other.variance_reduction is not None:
+            if self.variance_reduction is None:
+                self.variance_reduction = other.variance_reduction.copy()
+            else:
+                self.variance_reduction.update(other.variance_reduction)
+        if other.phase_timings is not None:
+            if self.phase_timings is None:
+                self.phase_timings = other.phase_timings.copy()
+            else:
+                self.phase_timings.update(other.phase_timings)
+
+        # Join the streaks open on either side of the boundary if they are of the same result.
+        streaks = self._open_streaks()
+        other_streaks = other._open_streaks()
+        if streaks and other_streaks and streaks[-1][0] == other_streaks[0][0]:
+            result, length = streaks.pop()
+            other_streaks[0] = (result, length + other_streaks[0][1])
+        streaks += other_streaks
+        self.first_streak = self.last_streak = None
+        self._set_streaks(np.array([result for result, _ in streaks], dtype=np.int8),
+                          np.array([length for _, length in streaks], dtype=np.int64))
+
+    def merge(self, other):
+        """Get a new summary of this summary's games followed by the other summary's games."""
+        merged = MetricSummary()
+        merged.update(self)
+        merged.update(other)
+        return merged
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def streak_counts(self):
+        """Get histograms (counts indexed by length) of all winning and losing streaks, including those open at either end."""
+        winning_streaks = self.winning_streaks
+        losing_streaks = self.losing_streaks
+        for result, length in self._open_streaks():
+            if result == WIN:
+                winning_streaks = add_histograms(winning_streaks, np.bincount([length]))
+            else:
+                losing_streaks = add_histograms(losing_streaks, np.bincount([length]))
+        return winning_streaks, losing_streaks
+
+    def final_bankroll_distribution(self):
+        """Get the distinct final bankrolls (sorted) and the number of games that finished with each, as arrays."""
+        bankrolls = sorted(self.final_bankrolls)
+        counts = [self.final_bankrolls[bankroll] for bankroll in bankrolls]
+        return np.array(bankrolls, dtype=np.float64), np.array(counts, dtype=np.int64)
+
+    def mean_final_bankroll(self):
+        """Get the average final bankroll."""
+        bankrolls, counts = self.final_bankroll_distribution()
+        return float(np.dot(bankrolls, counts) / counts.sum())
+
+    def final_bankroll_quantile(self, quantile):
+        """Get a quantile (between 0 and 1) of the final bankrolls, using the lower of two values when between them."""
+        bankrolls, counts = self.final_bankroll_distribution()
+        rank = int(quantile * (self.games - 1))
+        return float(bankrolls[np.searchsorted(np.cumsum(counts), rank, side='right')])
+
+    def mean_turn_net(self):
+        """Get the average net result of a turn (the expected value of a hand, as estimated so far)."""
+        return self.turn_net_sum / self.turns if self.turns else 0.0
+
+    def turn_net_half_width(self, z=Z_95):
+        """Get the half-width of the confidence interval (95% by default) of the expected value of a hand."""
+        return confidence_half_width(self.turns, self.turn_net_sum, self.turn_net_squares, z)
+
+    def variance_reduced_estimates(self, number_of_decks, z=Z_95):
+        """
+        Get the estimates of the expected value of a hand of each variance reduction technique in use, as (technique,
+        estimate, confidence interval half-width, variance reduction) tuples (see VarianceReduction.estimates).
+        """
+        if self.variance_reduction is None:
+            return []
+        return self.variance_reduction.estimates(number_of_decks, z)
+
+    def best_turn_net_half_width(self, number_of_decks=None, z=Z_95):
+        """
+        Get the narrowest confidence interval half-width of the expected value of a hand, of the plain estimate and of
+        any variance reduction techniques in use (which need the number of decks).
+        """
+        half_widths = [self.turn_net_half_width(z)]
+        if number_of_decks is not None:
+            half_widths += [half_width for _, _, half_width, _ in self.variance_reduced_estimates(number_of_decks, z)]
+        return min(half_widths)
+
+    def final_bankroll_half_width(self, z=Z_95):
+        """Get the half-width of the confidence interval (95% by default) of the average final bankroll."""
+        bankrolls, counts = self.final_bankroll_distribution()
+        return confidence_half_width(self.games, np.dot(bankrolls, counts), np.dot(bankrolls ** 2, counts), z)
+
+
+def confidence_half_width(count, total, squares, z=Z_95):
+    """Get the half-width of the confidence interval of a mean, from the count, sum and sum of squares of a sample."""
+    if count < 2:
+        return float('inf')
+    mean = total / count
+    variance = max(squares / count - mean ** 2, 0.0) * count / (count - 1)
+    return float(z * np.sqrt(variance / count))
+
+
+def merge_all(metrics):
+    """Merge an ordered iterable of MetricSummaries and/or MetricTrackers into a single MetricSummary."""
+    summary = MetricSummary()
+    for metric in metrics:
+        summary.update(metric)
+    return summary
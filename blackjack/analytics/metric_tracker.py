@@ -1,3 +1,11 @@
+from array import array
+
+import numpy as np
+
+from blackjack.analytics.metric_summary import LOSS, WIN, MetricSummary
+from blackjack.analytics.variance_reduction import VALUE_INDEX, VarianceReduction, deal_code
+
+
 class MetricTracker:
     """Class for tracking game metrics for analytics purposes."""
 
@@ -14,8 +22,15 @@ class MetricTracker:
         # Bankroll over time
         self.bankroll_progression = []
 
-        # Track win/loss results
-        self.wins_losses = []
+        # Track win/loss results, in order, as WIN/LOSS codes in an int8 buffer
+        self.wins_losses = array('b')
+
+        # Track the starting cards of each turn, in order, as deal codes (see variance_reduction.deal_code) in a
+        # uint16 buffer, if the game tracks them (see GameController's `track_deals`)
+        self.deals = array('H')
+
+        # Timings of the game's phases, if it is timed (see PhaseTimings.attach)
+        self.phase_timings = None
 
     def _increment_metric(self, metric):
         """Increment the desired metric (privately)."""
@@ -23,10 +38,10 @@ class MetricTracker:
             self.turns += 1
         elif metric == 'wins':
             self.wins += 1
-            self.wins_losses.append('win')
+            self.wins_losses.append(WIN)
         elif metric == 'losses':
             self.losses += 1
-            self.wins_losses.append('loss')
+            self.wins_losses.append(LOSS)
         elif metric == 'pushes':
             self.pushes += 1
         elif metric == 'insurance wins':
@@ -62,6 +77,10 @@ class MetricTracker:
         if hand.lost_insurance:
             self._increment_metric('insurance losses')
 
+    def process_deal(self, card_1, card_2, card_3, card_4):
+        """Track the starting cards of a turn, in dealing order (the gambler is dealt cards 1 and 3, the dealer 2 and 4)."""
+        self.deals.append(deal_code(VALUE_INDEX[card_1], VALUE_INDEX[card_3], VALUE_INDEX[card_2], VALUE_INDEX[card_4]))
+
     def process_dealer_hand(self, hand):
         """Track metrics for a played DealerHand."""
         if hand.status == 'Blackjack':
@@ -71,6 +90,10 @@ class MetricTracker:
         """Append a bankroll amount to the list of bankrolls tracked."""
         self.bankroll_progression.append(bankroll)
 
+    def outcomes(self):
+        """Get the tracked win/loss results as an int8 NumPy array (a view of the tracked buffer, without copying)."""
+        return np.frombuffer(self.wins_losses, dtype=np.int8)
+
     def serialize_metrics(self):
         """Get a dictionary representation of tracked metrics."""
         return {
@@ -84,3 +107,24 @@ class MetricTracker:
             'bankroll_progression': self.bankroll_progression,
             'wins_losses': self.wins_losses
         }
+
+    def summarize(self, keep_bankroll_progression=False, variance_reduction=(), game_index=0):
+        """
+        Get a compact, mergeable summary of the tracked metrics (optionally keeping the full bankroll progression).
+        Accumulators of any variance reduction techniques (see variance_reduction.TECHNIQUES) are kept with it, for
+        the `game_index`-th game of a simulation.
+        """
+        summary = MetricSummary.from_metric_tracker(self, keep_bankroll_progression)
+        if variance_reduction:
+            summary.variance_reduction = VarianceReduction.from_metric_tracker(self, variance_reduction, game_index)
+        return summary
+
+    def merge(self, other):
+        """
+        Merge this game's metrics with another MetricTracker's (or MetricSummary's) metrics that follow it.
+        Returns a MetricSummary, which can be merged further with either kind. Streaks are carried across the merge.
+        """
+        return self.summarize().merge(other)
+
+    def __add__(self, other):
+        return self.merge(other)
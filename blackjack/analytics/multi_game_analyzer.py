@@ -1,8 +1,10 @@
-from statistics import mean
 from textwrap import dedent
-import matplotlib.pyplot as plt
+import numpy as np
+from blackjack.analytics.metric_summary import merge_all
+from blackjack.analytics.plotting import finish_plots, pyplot
 from blackjack.display_utils import money_format, pct_format, zero_division_pct
 
+
 def slice_label(percent, all_vals):
     """
     Create a pie chart slice label of the form `x% (absolute count)` (e.g. --> 45.3% (153) ).
@@ -14,79 +16,41 @@ def slice_label(percent, all_vals):
 class MultiGameAnalyzer:
     """Class for running basic analytics on tracked metrics for a multiple games."""
 
-    def __init__(self, metric_trackers):
-        # All games have the same initial bankroll. Grab it from the first game.
-        self.initial_bankroll = metric_trackers[0].bankroll_progression[0]
-
-        (self.wins, self.losses, self.pushes, self.insurance_wins, self.insurance_losses,
-         self.gambler_blackjacks, self.dealer_blackjacks, self.final_bankrolls,
-         self.winning_streaks, self.losing_streaks) = self._aggregate_metrics(metric_trackers)
+    def __init__(self, summary, number_of_decks=None):
+        """
+        summary - MetricSummary of all of the games to analyze (see MetricSummary.merge)
+        number_of_decks - Number of decks the games were played with, for the estimates of any variance reduction
+                          techniques tracked in the summary
+        """
+        # All games have the same initial bankroll.
+        self.initial_bankroll = summary.initial_bankroll
+
+        self.wins = summary.wins
+        self.losses = summary.losses
+        self.pushes = summary.pushes
+        self.insurance_wins = summary.insurance_wins
+        self.insurance_losses = summary.insurance_losses
+        self.gambler_blackjacks = summary.gambler_blackjacks
+        self.dealer_blackjacks = summary.dealer_blackjacks
+        self.summary = summary
+        self.number_of_decks = number_of_decks
+
+        # Streak length histograms (count of streaks indexed by streak length)
+        self.winning_streaks, self.losing_streaks = summary.streak_counts()
+
+        # Distinct final bankrolls (sorted) and the number of games that finished with each
+        self.final_bankrolls, self.final_bankroll_counts = summary.final_bankroll_distribution()
 
     @staticmethod
-    def _calculate_streaks(wins_losses):
-        winning_streaks = []
-        losing_streaks = []
-        current_winning_streak = 0
-        current_losing_streak = 0
-
-        for result in wins_losses:
-            if result == 'win':
-                if current_losing_streak > 0:
-                    losing_streaks.append(current_losing_streak)
-                    current_losing_streak = 0
-                current_winning_streak += 1
-            elif result == 'loss':
-                if current_winning_streak > 0:
-                    winning_streaks.append(current_winning_streak)
-                    current_winning_streak = 0
-                current_losing_streak += 1
-            else:
-                if current_winning_streak > 0:
-                    winning_streaks.append(current_winning_streak)
-                    current_winning_streak = 0
-                if current_losing_streak > 0:
-                    losing_streaks.append(current_losing_streak)
-                    current_losing_streak = 0
-
-        if current_winning_streak > 0:
-            winning_streaks.append(current_winning_streak)
-        if current_losing_streak > 0:
-            losing_streaks.append(current_losing_streak)
-
-        return winning_streaks, losing_streaks
+    def _streak_lengths(streaks):
+        """Get the streak lengths that occurred and how many times each did, from a streak length histogram."""
+        lengths = np.flatnonzero(streaks)
+        return lengths, streaks[lengths]
 
-    @staticmethod
-    def _aggregate_metrics(metric_trackers):
-        # Gross metric counts
-        wins = 0
-        losses = 0
-        pushes = 0
-        insurance_wins = 0
-        insurance_losses = 0
-        gambler_blackjacks = 0
-        dealer_blackjacks = 0
-
-        # Final bankrolls
-        final_bankrolls = []
-
-        # Track winning and losing streaks
-        all_wins_losses = []
-
-        # Process each MetricTracker
-        for mt in metric_trackers:
-            wins += mt.wins
-            losses += mt.losses
-            pushes += mt.pushes
-            insurance_wins += mt.insurance_wins
-            insurance_losses += mt.insurance_losses
-            gambler_blackjacks += mt.gambler_blackjacks
-            dealer_blackjacks += mt.dealer_blackjacks
-            final_bankrolls.append(mt.bankroll_progression[-1])
-            all_wins_losses.extend(mt.wins_losses)  # Assuming `wins_losses` is a list of 'win' or 'loss' strings
-
-        winning_streaks, losing_streaks = MultiGameAnalyzer._calculate_streaks(all_wins_losses)
-
-        return wins, losses, pushes, insurance_wins, insurance_losses, gambler_blackjacks, dealer_blackjacks, final_bankrolls, winning_streaks, losing_streaks
+    @classmethod
+    def from_metric_trackers(cls, metric_trackers):
+        """Analyze the MetricTrackers of a list of games, in order."""
+        return cls(merge_all(metric_trackers))
 
     def print_summary(self):
         """Print a simple summary of analyzed results."""
@@ -109,16 +73,17 @@ class MultiGameAnalyzer:
         ins_loss_pct = zero_division_pct(self.insurance_losses, total_insurance)
 
         # --- Bankroll ---
-        winnings_gross_avg = mean(self.final_bankrolls) - self.initial_bankroll
+        final_bankroll_avg = self.summary.mean_final_bankroll()
+        winnings_gross_avg = final_bankroll_avg - self.initial_bankroll
         winnings_pct_avg = zero_division_pct(winnings_gross_avg, self.initial_bankroll)
+        final_bankroll_median = self.summary.final_bankroll_quantile(0.5)
+        final_bankroll_half_width = self.summary.final_bankroll_half_width()
+        hand_net_avg = self.summary.mean_turn_net()
+        hand_net_half_width = self.summary.turn_net_half_width()
 
-        # --- Winning Streaks ---
-        winning_streaks = self.winning_streaks
-        winning_streak_counts = {streak: winning_streaks.count(streak) for streak in set(winning_streaks)}
-
-        # --- Losing Streaks ---
-        losing_streaks = self.losing_streaks
-        losing_streak_counts = {streak: losing_streaks.count(streak) for streak in set(losing_streaks)}
+        # --- Streaks --- (of the form {streak length: count})
+        winning_streak_counts = dict(zip(*(values.tolist() for values in self._streak_lengths(self.winning_streaks))))
+        losing_streak_counts = dict(zip(*(values.tolist() for values in self._streak_lengths(self.losing_streaks))))
 
         # Return the formatted summary string
         print(dedent(f"""\
@@ -148,10 +113,12 @@ class MultiGameAnalyzer:
             --- Bankroll ---
 
             Avg Winnings: {money_format(winnings_gross_avg)} ({pct_format(winnings_pct_avg)})
+            Avg Net per Hand: {money_format(hand_net_avg)} (± {money_format(hand_net_half_width)} at 95% confidence)
 
-            Max Bankroll: {money_format(max(self.final_bankrolls))}
-            Min Bankroll: {money_format(min(self.final_bankrolls))}
-            Avg Bankroll: {money_format(mean(self.final_bankrolls))}
+            Max Bankroll: {money_format(self.final_bankrolls.max())}
+            Min Bankroll: {money_format(self.final_bankrolls.min())}
+            Avg Bankroll: {money_format(final_bankroll_avg)} (± {money_format(final_bankroll_half_width)} at 95% confidence)
+            Median Bankroll: {money_format(final_bankroll_median)}
 
             --- Winning Streaks ---
 
@@ -163,14 +130,35 @@ class MultiGameAnalyzer:
 
             """)
               )
+        self.print_variance_reduction()
+        if self.summary.phase_timings is not None:
+            self.summary.phase_timings.print_summary()
+
+    def print_variance_reduction(self):
+        """Print the estimated EV per hand of each variance reduction technique tracked, if any."""
+        if self.number_of_decks is None or self.summary.variance_reduction is None:
+            return
+        print('--- Variance Reduction ---\n')
+        print(f"Plain: {money_format(self.summary.mean_turn_net())} per hand "
+              f"(± {money_format(self.summary.turn_net_half_width())} at 95% confidence)")
+        for technique, estimate, half_width, reduction in self.summary.variance_reduced_estimates(self.number_of_decks):
+            print(f"{technique.capitalize()}: {money_format(estimate)} per hand "
+                  f"(± {money_format(half_width)} at 95% confidence, {reduction:.2f}x variance reduction)")
+        print()
+
+    def create_plots(self, path=None):
+        """Create charts summarizing the tracked metric data, and show them (or save them to `path`, see plotting)."""
+        plt = pyplot(path)
 
-    def create_plots(self):
-        """Create charts summarizing the tracked metric data."""
         # Create a figure to hold the plots (called "axes")
-        fig, (ax1, ax2, ax3, ax4) = plt.subplots(4, 1, figsize=(10, 20))  # Adjust the figure size
+        # A fifth plot is added for the bankroll progressions of sampled games, if any were kept.
+        bankroll_progressions = self.summary.bankroll_progressions
+        num_axes = 5 if bankroll_progressions else 4
+        fig, axes = plt.subplots(num_axes, 1, figsize=(10, 5 * num_axes))  # Adjust the figure size
+        ax1, ax2, ax3, ax4 = axes[:4]
 
         # Axes 1: Final Bankroll Distribution (Histogram)
-        ax1.hist(self.final_bankrolls)
+        ax1.hist(self.final_bankrolls, weights=self.final_bankroll_counts)
         ax1.set_xlabel('Final Bankroll ($)')
         ax1.set_ylabel('Count')
         ax1.set_title('Final Bankrolls')
@@ -192,9 +180,7 @@ class MultiGameAnalyzer:
         ax2.axis('equal')
 
         # Axes 3: Winning Streaks (Bar chart)
-        winning_streaks = self.winning_streaks
-        winning_streak_counts = {streak: winning_streaks.count(streak) for streak in set(winning_streaks)}
-        bars = ax3.bar(winning_streak_counts.keys(), winning_streak_counts.values())
+        bars = ax3.bar(*self._streak_lengths(self.winning_streaks))
         ax3.set_xlabel('Winning Streak Length')
         ax3.set_ylabel('Frequency')
         ax3.set_title('Winning Streaks')
@@ -209,9 +195,7 @@ class MultiGameAnalyzer:
                          ha='center', va='bottom')
 
         # Axes 4: Losing Streaks (Bar chart)
-        losing_streaks = self.losing_streaks
-        losing_streak_counts = {streak: losing_streaks.count(streak) for streak in set(losing_streaks)}
-        bars = ax4.bar(losing_streak_counts.keys(), losing_streak_counts.values())
+        bars = ax4.bar(*self._streak_lengths(self.losing_streaks))
         ax4.set_xlabel('Losing Streak Length')
         ax4.set_ylabel('Frequency')
         ax4.set_title('Losing Streaks')
@@ -225,6 +209,13 @@ class MultiGameAnalyzer:
                          textcoords="offset points",
                          ha='center', va='bottom')
 
-        # Avoid plot label overlap
-        plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        # Axes 5: Bankroll vs. Turn Number of sampled games (line chart)
+        if bankroll_progressions:
+            ax5 = axes[4]
+            for bankroll_progression in bankroll_progressions:
+                ax5.plot(bankroll_progression, linewidth=0.8)
+            ax5.set_xlabel('Turn Number')
+            ax5.set_ylabel('Bankroll ($)')
+            ax5.set_title(f"Bankroll vs. Turn Number ({len(bankroll_progressions)} Sampled Games)")
+
+        finish_plots(plt, fig, path)
\ No newline at end of file
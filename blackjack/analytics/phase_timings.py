@@ -0,0 +1,106 @@
+"""
+Opt-in timing of the phases of a game, for finding where a simulation spends its time.
+
+A PhaseTimings is attached to a GameController when it is built (see GameController's `timings`). It wraps that
+controller's phase methods, and its strategy, with timed versions on the instance only, so games played without
+timings run the exact same code as before, at no extra cost. Timings accumulate a call count and a total of
+`perf_counter_ns` nanoseconds per phase, and are merged across games (and worker processes) with the MetricSummary
+they are kept in.
+"""
+
+from time import perf_counter_ns
+
+from blackjack.display_utils import pct_format, zero_division_pct
+
+
+# GameController methods timed as phases of a turn
+PHASES = ('deal', 'play_pre_turn', 'play_gambler_turn', 'play_dealer_turn', 'settle_up', 'track_metrics')
+
+# Strategy methods timed (together) as the 'strategy' phase. Strategy calls are made during the other phases, so their
+# time is also included in those phases'.
+STRATEGY_METHODS = ('wants_to_change_wager', 'get_new_auto_wager', 'wants_even_money', 'wants_insurance', 'get_hand_action')
+
+# Whole games (GameController.play), which all other phases are part of
+GAME = 'game'
+
+
+class TimedStrategy:
+    """Strategy wrapper that times the decision methods of a strategy (see STRATEGY_METHODS) as the 'strategy' phase."""
+
+    def __init__(self, strategy, timings):
+        self.strategy = strategy
+        self.timings = timings
+
+    def __getattr__(self, name):
+        attribute = getattr(self.strategy, name)
+        if name in STRATEGY_METHODS:
+            # Wrap once, then keep the timed method on the wrapper so later lookups don't come back here.
+            attribute = self.timings.timed('strategy', attribute)
+            setattr(self, name, attribute)
+        return attribute
+
+
+class PhaseTimings:
+    """Mergeable call counts and total nanoseconds spent in each phase of the games timed."""
+
+    def __init__(self):
+        self.games = 0
+        self.calls = dict.fromkeys(PHASES + ('strategy', GAME), 0)
+        self.nanoseconds = dict.fromkeys(PHASES + ('strategy', GAME), 0)
+
+    def timed(self, phase, method):
+        """Get a version of a (bound) method that accumulates its calls and time into a phase."""
+        calls = self.calls
+        nanoseconds = self.nanoseconds
+
+        def timed_method(*args, **kwargs):
+            start = perf_counter_ns()
+            result = method(*args, **kwargs)
+            nanoseconds[phase] += perf_counter_ns() - start
+            calls[phase] += 1
+            return result
+        return timed_method
+
+    def attach(self, controller):
+        """Time the phases of a game controller (and its strategy) from now on, keeping the timings with its metrics."""
+        for phase in PHASES:
+            setattr(controller, phase, self.timed(phase, getattr(controller, phase)))
+        controller.play = self.timed(GAME, controller.play)
+        controller.strategy = TimedStrategy(controller.strategy, self)
+        controller.metric_tracker.phase_timings = self
+        self.games += 1
+
+    def copy(self):
+        """Get a copy of these timings."""
+        timings = PhaseTimings()
+        timings.update(self)
+        return timings
+
+    def update(self, other):
+        """Add another game's (or games') timings to these, in place."""
+        self.games += other.games
+        for phase in self.calls:
+            self.calls[phase] += other.calls[phase]
+            self.nanoseconds[phase] += other.nanoseconds[phase]
+
+    def merge(self, other):
+        """Get new timings of these games and the other timings' games."""
+        merged = self.copy()
+        merged.update(other)
+        return merged
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def print_summary(self):
+        """Print a table of the calls and time of each phase, and its share of the total time played."""
+        game_nanoseconds = self.nanoseconds[GAME]
+        print(f"--- Phase Timings ({self.games} games) ---\n")
+        print(f"{'Phase':<20} {'Calls':>12} {'Total (ms)':>12} {'Per Call (ns)':>14} {'Share':>8}")
+        for phase in PHASES + ('strategy', GAME):
+            calls = self.calls[phase]
+            nanoseconds = self.nanoseconds[phase]
+            per_call = nanoseconds / calls if calls else 0
+            share = pct_format(zero_division_pct(nanoseconds, game_nanoseconds))
+            print(f"{phase:<20} {calls:>12,} {nanoseconds / 1e6:>12,.1f} {per_call:>14,.0f} {share:>8}")
+        print('\n(Strategy calls are made during the other phases, and are included in their time too.)\n')
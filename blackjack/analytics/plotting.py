@@ -0,0 +1,38 @@
+"""
+Helpers for creating analytics plots.
+
+matplotlib is slow to import, so it is only imported when plots are actually created. Plots are either shown in a
+window (blocking until it is closed) or saved to a file with the non-interactive Agg backend, in the format given by
+the file's extension (e.g. `.png` or `.svg`).
+"""
+
+import os
+
+
+# Ways of creating plots: show them in a window, save them to a file, or skip plotting altogether
+PLOT_MODES = ('show', 'file', 'none')
+
+
+def pyplot(path=None):
+    """Import `matplotlib.pyplot`, with the non-interactive Agg backend if plots will be saved to a `path`."""
+    import matplotlib
+    if path is not None:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def finish_plots(plt, fig, path=None):
+    """Lay out a figure's plots, then save it to a `path` (and close it) if given, otherwise show it."""
+    plt.tight_layout()  # Avoid plot label overlap
+    if path is None:
+        plt.show()
+    else:
+        fig.savefig(path)
+        plt.close(fig)
+
+
+def labelled_path(path, label):
+    """Insert a label before the extension of a plot file path (e.g. plots.png -> plots-label.png)."""
+    root, extension = os.path.splitext(path)
+    return f"{root}-{label}{extension}"
@@ -1,8 +1,7 @@
 from statistics import mean
 from textwrap import dedent
 
-import matplotlib.pyplot as plt
-
+from blackjack.analytics.plotting import finish_plots, pyplot
 from blackjack.display_utils import money_format, pct_format, zero_division_pct
 
 
@@ -26,7 +25,8 @@ class SingleGameAnalyzer:
                  insurance_losses=0,
                  gambler_blackjacks=0,
                  dealer_blackjacks=0,
-                 bankroll_progression=None
+                 bankroll_progression=None,
+                 wins_losses=None
                 ):
         self.wins = wins
         self.losses = losses
@@ -36,6 +36,7 @@ class SingleGameAnalyzer:
         self.gambler_blackjacks = gambler_blackjacks
         self.dealer_blackjacks = dealer_blackjacks
         self.bankroll_progression = bankroll_progression or []
+        self.wins_losses = wins_losses
 
     def print_summary(self):
         """Print a simple summary of analyzed results."""
@@ -95,8 +96,10 @@ class SingleGameAnalyzer:
             """)
         )
 
-    def create_plots(self):
-        """Create charts summarizing the tracked metric data."""
+    def create_plots(self, path=None):
+        """Create charts summarizing the tracked metric data, and show them (or save them to `path`, see plotting)."""
+        plt = pyplot(path)
+
         # Create a figure to hold the plots (called "axes")
         fig, (ax1, ax2) = plt.subplots(2, 1)  # 2 rows 1 column of axes (i.e. stacked plots)
 
@@ -121,6 +124,4 @@ class SingleGameAnalyzer:
         ax2.set_title('Hand Outcomes')
         ax2.axis('equal')
 
-        # Avoid plot label overlap
-        plt.tight_layout()
-        plt.show()
+        finish_plots(plt, fig, path)
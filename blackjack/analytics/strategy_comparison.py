@@ -0,0 +1,123 @@
+import numpy as np
+
+from blackjack.analytics.metric_summary import Z_95, MetricSummary, confidence_half_width
+from blackjack.display_utils import money_format
+
+
+class StrategyComparison:
+    """
+    Compact, mergeable summary of several strategies played on shared shoes (the same card piles, in the same order,
+    for every strategy).
+
+    Holds a MetricSummary of each strategy's games, and the differences between each strategy's net result of a hand
+    (turn) and the first (baseline) strategy's net result of the same turn in the same game, accumulated as a count,
+    sum and sum of squares. Games are merged in order, like MetricSummaries.
+
+    Hands are paired by turn index, not by the cards dealt: each strategy's shoe deals the shared piles at its own
+    pace, so once two strategies take a different number of cards in a round (e.g. one hits where the other stands),
+    the rest of that shoe deals them different cards. Only strategies that always take the same cards (e.g. default
+    and insurance) are compared on the same cards hand by hand. The mean difference still estimates the difference
+    in EV per hand, but with less variance reduction than a comparison on identical hands.
+    """
+
+    def __init__(self, num_strategies):
+        self.summaries = [MetricSummary() for _ in range(num_strategies)]
+
+        # Per-turn differences against the baseline strategy, by strategy (all zero for the baseline itself)
+        self.paired_hands = np.zeros(num_strategies, dtype=np.int64)
+        self.difference_sums = np.zeros(num_strategies, dtype=np.float64)
+        self.difference_squares = np.zeros(num_strategies, dtype=np.float64)
+
+    @classmethod
+    def from_metric_trackers(cls, metric_trackers, keep_bankroll_progression=False, variance_reduction=(), game_index=0):
+        """
+        Summarize a game played once per strategy on shared shoes, from each strategy's MetricTracker (in order).
+        Each strategy's summary keeps accumulators of any variance reduction techniques (see MetricTracker.summarize).
+        """
+        comparison = cls(len(metric_trackers))
+        comparison.summaries = [
+            metric_tracker.summarize(keep_bankroll_progression, variance_reduction, game_index)
+            for metric_tracker in metric_trackers
+        ]
+
+        # Hands are paired by turn (not by cards, see the class docstring), for the turns that the baseline and the
+        # other strategy both played.
+        hand_results = [np.diff(metric_tracker.bankroll_progression) for metric_tracker in metric_trackers]
+        baseline = hand_results[0]
+        for strategy, results in enumerate(hand_results[1:], start=1):
+            hands = min(len(baseline), len(results))
+            differences = results[:hands] - baseline[:hands]
+            comparison.paired_hands[strategy] = hands
+            comparison.difference_sums[strategy] = differences.sum()
+            comparison.difference_squares[strategy] = np.dot(differences, differences)
+        return comparison
+
+    def summarize(self):
+        """A comparison is already summarized (mirrors MetricTracker.summarize)."""
+        return self
+
+    def update(self, other):
+        """Fold another comparison's games into this comparison, in place, as if they were played after its games."""
+        for summary, other_summary in zip(self.summaries, other.summaries):
+            summary.update(other_summary)
+        self.paired_hands += other.paired_hands
+        self.difference_sums += other.difference_sums
+        self.difference_squares += other.difference_squares
+
+    def merge(self, other):
+        """Get a new comparison of this comparison's games followed by the other comparison's games."""
+        merged = StrategyComparison(len(self.summaries))
+        merged.update(self)
+        merged.update(other)
+        return merged
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    @property
+    def games(self):
+        """Number of games compared."""
+        return self.summaries[0].games
+
+    def paired_differences(self, z=Z_95):
+        """
+        Get the mean per-hand difference (paired by turn) of each strategy against the baseline, and the half-width
+        of its confidence interval (95% by default).
+        """
+        means = self.difference_sums / np.maximum(self.paired_hands, 1)
+        half_widths = np.array([
+            confidence_half_width(hands, total, squares, z)
+            for hands, total, squares in zip(self.paired_hands, self.difference_sums, self.difference_squares)
+        ])
+        return means, half_widths
+
+    def turn_net_half_width(self, z=Z_95):
+        """Get the widest confidence interval half-width of the paired per-hand differences (see paired_differences)."""
+        return float(self.paired_differences(z)[1][1:].max())
+
+    def best_turn_net_half_width(self, number_of_decks=None, z=Z_95):
+        """
+        Get the widest confidence interval half-width of the paired per-hand differences. Variance reduction is not
+        applied to the differences, so this is the same as turn_net_half_width (mirrors MetricSummary).
+        """
+        return self.turn_net_half_width(z)
+
+    def print_summary(self, names):
+        """Print the paired per-hand differences of each strategy (by name) against the baseline strategy."""
+        means, half_widths = self.paired_differences()
+        print('--- Differences by Turn ---\n')
+        for name, mean, half_width, hands in zip(names[1:], means[1:], half_widths[1:], self.paired_hands[1:]):
+            print(f"{name} vs. {names[0]}: {money_format(mean)} per hand "
+                  f"(± {money_format(half_width)} at 95% confidence, {hands} hands paired by turn)")
+        print('\nHands are paired by turn on shared card piles. Strategies that take different cards in a round are '
+              'dealt different cards for the rest of that shoe.\n')
+
+
+def merge_comparisons(comparisons):
+    """Merge an ordered, non-empty iterable of StrategyComparisons into a single StrategyComparison."""
+    merged = None
+    for comparison in comparisons:
+        if merged is None:
+            merged = StrategyComparison(len(comparison.summaries))
+        merged.update(comparison)
+    return merged
@@ -0,0 +1,126 @@
+"""
+Wager-independent stores of simulated rounds, for sweeping bankrolls and wagers without re-simulating every game.
+
+With a static, flat-betting strategy, the cards a game is dealt and the decisions made on them don't depend on the
+size of the bankroll or the bet, until the bankroll limits a bet: it can't cover the auto-wager (which then drops to
+the bankroll left), a double, a split or an insurance bet. So seeded games are recorded once, with a bankroll so large
+it never limits a bet, as the net result and the exposure (total amount bet) of every round, in half wagers.
+
+Any bankroll and wager can then be rescored with array arithmetic: the bankroll before each round is the starting
+bankroll plus the running sum of the results, scaled by the wager. Each round is exact as long as that bankroll covers
+the round's exposure. Games with a round that it doesn't cover (flagged rounds) are played differently from that round
+on, and with the cards after it shifted, so those games are re-simulated in full, with the same seeds.
+"""
+
+import numpy as np
+
+from blackjack.controllers.batch_game_controller import BatchGameController
+from blackjack.history.replay import can_replay_in_lockstep
+from blackjack.simulation import game_generator
+
+
+# Results and exposures are stored in steps of half a wager.
+STEPS_PER_WAGER = 2
+
+# A round can lose at most 8 wagers (splitting into 4 doubled hands), which recording bankrolls must cover every turn.
+MAX_EXPOSURE = 8.5
+
+
+class UnitOutcomes:
+    """
+    The rounds of a number of seeded games: `results` and `exposures` are (game, turn) int8 arrays of the net result
+    and the total amount bet of each round, in half wagers (see the module docstring). Games are recorded (and
+    re-simulated) with a strategy, named by its class.
+    """
+
+    def __init__(self, results, exposures, seed, number_of_decks, strategy_name):
+        self.results = results
+        self.exposures = exposures
+        self.seed = seed
+        self.number_of_decks = number_of_decks
+        self.strategy_name = strategy_name
+
+    @property
+    def games(self):
+        return self.results.shape[0]
+
+    @property
+    def turns(self):
+        return self.results.shape[1]
+
+    @classmethod
+    def record(cls, strategy, number_of_decks, games, turns, seed, auto_wager=100.0):
+        """Play seeded games in lockstep with a bankroll that never limits a bet, and record their rounds."""
+        if not can_replay_in_lockstep(strategy):
+            raise ValueError('Unit outcomes need a static strategy that never changes its wager')
+        bankroll = auto_wager * (MAX_EXPOSURE * turns + 1)
+        rngs = [game_generator(seed, game_index) for game_index in range(games)]
+        game = BatchGameController('Gambler', bankroll, auto_wager, number_of_decks, strategy, rngs, max_turns=turns)
+        game.play()
+
+        step = auto_wager / STEPS_PER_WAGER
+        progressions = np.array([metric_tracker.bankroll_progression for metric_tracker in game.metric_trackers()])
+        results = np.rint(np.diff(progressions, axis=1) / step).astype(np.int8)
+        exposures = np.rint(game.exposures().T / step).astype(np.int8)
+        return cls(results, exposures, seed, number_of_decks, type(strategy).__name__)
+
+    def save(self, path):
+        """Save the rounds and the settings they were recorded with to a NumPy `.npz` file."""
+        np.savez_compressed(
+            path, results=self.results, exposures=self.exposures, seed=self.seed, number_of_decks=self.number_of_decks,
+            strategy_name=self.strategy_name
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load rounds saved with `save`."""
+        with np.load(path) as store:
+            return cls(
+                store['results'], store['exposures'], int(store['seed']), int(store['number_of_decks']),
+                str(store['strategy_name'])
+            )
+
+    def rescore(self, bankroll, auto_wager, turns=None):
+        """
+        Get the final bankroll of every game played with a bankroll and wager (for up to `turns` turns, by default
+        all recorded), and a boolean mask of the games that had a flagged round.
+        """
+        turns = turns or self.turns
+        if turns > self.turns:
+            raise ValueError(f"Only {self.turns} turns were recorded")
+        step = auto_wager / STEPS_PER_WAGER
+        results = self.results[:, :turns]
+
+        # Bankroll (in steps) before each round, and after the last one
+        start = bankroll / step
+        before = start + np.concatenate(
+            (np.zeros((self.games, 1), dtype=np.int64), np.cumsum(results[:, :-1], axis=1, dtype=np.int64)), axis=1
+        )
+        after = before[:, -1] + results[:, -1]
+
+        # A game is over once its bankroll runs out, and its rounds are exact until one isn't covered.
+        broke = np.isclose(before, 0)
+        over = np.cumsum(broke, axis=1) > 0
+        flagged = ((before < self.exposures[:, :turns] - 1e-9) & ~over).any(axis=1)
+
+        final = np.where(over.any(axis=1), 0.0, after * step)
+        return final, flagged
+
+    def final_bankrolls(self, strategy, bankroll, auto_wager, turns=None):
+        """
+        Get the final bankroll of every game played with a bankroll and wager, rescoring the recorded rounds and
+        re-simulating the games with flagged rounds. Returns the final bankrolls and the number of games re-simulated.
+        """
+        if type(strategy).__name__ != self.strategy_name:
+            raise ValueError(f"These games were recorded with {self.strategy_name}")
+        turns = turns or self.turns
+        final, flagged = self.rescore(bankroll, auto_wager, turns)
+        replayed = np.flatnonzero(flagged)
+        if replayed.size:
+            rngs = [game_generator(self.seed, game_index) for game_index in replayed.tolist()]
+            game = BatchGameController(
+                'Gambler', bankroll, auto_wager, self.number_of_decks, strategy, rngs, max_turns=turns
+            )
+            game.play()
+            final[replayed] = [metric_tracker.bankroll_progression[-1] for metric_tracker in game.metric_trackers()]
+        return final, replayed.size
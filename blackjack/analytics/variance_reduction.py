@@ -0,0 +1,243 @@
+"""
+Opt-in variance reduction for the estimated expected value of a hand.
+
+Each technique gives its own estimate of the average net result of a hand, with the half-width of its confidence
+interval and its variance reduction: the variance of the plain estimate divided by the technique's (how many times
+more hands the plain estimate would need for the same precision).
+
+- Control variates ('control'): each hand's net result is regressed on events of its starting cards whose exact
+  probabilities are known (see CONTROLS and blackjack.odds.starting_hands), and the average is corrected by how far
+  the events' observed frequencies are from their probabilities.
+- Stratified sampling ('stratified'): hands are post-stratified by the gambler's pair of card values and the dealer's
+  upcard, and the stratum averages are reweighted by the exact stratum probabilities. A shoe deals its cards in
+  sequence, so the strata cannot be sampled directly; reweighting removes the noise in how often each came up.
+- Antithetic shuffles ('antithetic'): games are played in pairs, the second game of a pair dealt the mirrored cards
+  of the first (see AntitheticShuffler), and the pairs are used as the sampling units. Against playing the same
+  games independently, the reduction comes from the negative correlation between a pair's games.
+
+Hands are tracked by their deal codes (see deal_code), which pack the value indices (see odds.composition) of the four
+starting cards.
+"""
+
+import numpy as np
+
+from blackjack.analytics.metric_summary import Z_95
+from blackjack.models.card import HARD_VALUE
+from blackjack.odds.composition import ACE_INDEX, NUM_VALUES, TEN_INDEX
+from blackjack.odds.starting_hands import (
+    NUM_STRATA, PAIR_INDEX, blackjack_probability, stratum_probabilities, upcard_probability
+)
+
+
+TECHNIQUES = ('antithetic', 'control', 'stratified')
+
+# Events of a hand's starting cards used as control variates
+CONTROLS = ('gambler blackjack', 'dealer blackjack', 'upcard Ace', 'upcard ten')
+
+# Value index of each card code
+VALUE_INDEX = tuple(value - 1 for value in HARD_VALUE)
+
+
+def deal_code(first, second, up_card, hole_card):
+    """Pack the value indices of a hand's starting cards (ints or arrays): the gambler's two, the upcard and hole card."""
+    return ((first * NUM_VALUES + second) * NUM_VALUES + up_card) * NUM_VALUES + hole_card
+
+
+def decode_deals(deals):
+    """Unpack a buffer of uint16 deal codes into arrays of the value indices of the gambler's cards, upcard and hole card."""
+    deals = np.frombuffer(deals, dtype=np.uint16).astype(np.int64)
+    return deals // NUM_VALUES ** 3, deals // NUM_VALUES ** 2 % NUM_VALUES, deals // NUM_VALUES % NUM_VALUES, deals % NUM_VALUES
+
+
+def is_blackjack(first, second):
+    """Check which pairs of value indices are blackjacks."""
+    return ((first == ACE_INDEX) & (second == TEN_INDEX)) | ((first == TEN_INDEX) & (second == ACE_INDEX))
+
+
+def control_means(number_of_decks):
+    """Get the exact expectation of each control variate (see CONTROLS)."""
+    blackjack = blackjack_probability(number_of_decks)
+    return np.array([
+        blackjack, blackjack, upcard_probability(number_of_decks, ACE_INDEX), upcard_probability(number_of_decks, TEN_INDEX)
+    ])
+
+
+def moments(values, weights):
+    """Get the sums of a pair of samples, of their squares and of their products (see ratio_estimate)."""
+    return np.array([values.sum(), weights.sum(), values @ values, weights @ weights, values @ weights], dtype=np.float64)
+
+
+def ratio_estimate(units, sums):
+    """
+    Estimate a ratio of means (e.g. net result per hand, over games of varying length) and the variance of the
+    estimate, from the number of sampled units and their moments (see moments).
+    """
+    if units < 2 or not sums[1]:
+        return 0.0, float('inf')
+    value_sum, weight_sum, value_squares, weight_squares, products = sums
+    ratio = value_sum / weight_sum
+    residual_squares = value_squares - 2 * ratio * products + ratio ** 2 * weight_squares
+    variance = residual_squares / (units - 1) / units / (weight_sum / units) ** 2
+    return ratio, max(variance, 0.0)
+
+
+class VarianceReduction:
+    """
+    Compact, mergeable accumulators of the variance reduction techniques of one or more games (see the module
+    docstring). Like MetricSummaries, they are merged in game order; games must be merged in the order of their index,
+    so antithetic pairs split across a merge are joined.
+    """
+
+    def __init__(self, techniques=()):
+        self.techniques = tuple(technique for technique in TECHNIQUES if technique in techniques)
+
+        # Number of hands, and the sum and sum of squares of their net results
+        self.hands = 0
+        self.net_sum = 0.0
+        self.net_squares = 0.0
+
+        # Control variates: sums of the controls, of their products with each other and with the net result
+        self.control_sums = np.zeros(len(CONTROLS), dtype=np.float64)
+        self.control_products = np.zeros((len(CONTROLS), len(CONTROLS)), dtype=np.float64)
+        self.control_net_products = np.zeros(len(CONTROLS), dtype=np.float64)
+
+        # Stratification: number of hands in each stratum, and the sum and sum of squares of their net results
+        self.stratum_hands = np.zeros(NUM_STRATA, dtype=np.int64)
+        self.stratum_net_sums = np.zeros(NUM_STRATA, dtype=np.float64)
+        self.stratum_net_squares = np.zeros(NUM_STRATA, dtype=np.float64)
+
+        # Antithetic pairs: (net winnings, hands) moments of the games and of the complete pairs (see moments).
+        # Games [start, end) are accumulated, and the (net winnings, hands) of a game whose pair is cut off at either
+        # end are held until its partner is merged.
+        self.games = 0
+        self.game_moments = np.zeros(5, dtype=np.float64)
+        self.pairs = 0
+        self.pair_moments = np.zeros(5, dtype=np.float64)
+        self.start = self.end = None
+        self.leading_game = self.trailing_game = None
+
+    @classmethod
+    def from_metric_tracker(cls, metric_tracker, techniques, game_index=0):
+        """Accumulate a single game (the `game_index`-th of a simulation) of a MetricTracker."""
+        reduction = cls(techniques)
+        nets = np.diff(metric_tracker.bankroll_progression)
+        reduction.hands = len(nets)
+        reduction.net_sum = float(nets.sum())
+        reduction.net_squares = float(nets @ nets)
+
+        first, second, up_card, hole_card = decode_deals(metric_tracker.deals)
+        if 'control' in reduction.techniques:
+            controls = np.column_stack([
+                is_blackjack(first, second), is_blackjack(up_card, hole_card), up_card == ACE_INDEX, up_card == TEN_INDEX
+            ]).astype(np.float64)
+            reduction.control_sums = controls.sum(axis=0)
+            reduction.control_products = controls.T @ controls
+            reduction.control_net_products = controls.T @ nets
+
+        if 'stratified' in reduction.techniques:
+            strata = PAIR_INDEX[first, second] * NUM_VALUES + up_card
+            reduction.stratum_hands = np.bincount(strata, minlength=NUM_STRATA)
+            reduction.stratum_net_sums = np.bincount(strata, weights=nets, minlength=NUM_STRATA)
+            reduction.stratum_net_squares = np.bincount(strata, weights=nets ** 2, minlength=NUM_STRATA)
+
+        if 'antithetic' in reduction.techniques:
+            game = (reduction.net_sum, reduction.hands)
+            reduction.games = 1
+            reduction.game_moments = moments(*(np.array([value]) for value in game))
+            reduction.start, reduction.end = game_index, game_index + 1
+            if game_index % 2:
+                reduction.leading_game = game
+            else:
+                reduction.trailing_game = game
+        return reduction
+
+    def copy(self):
+        """Get a copy of these accumulators."""
+        reduction = VarianceReduction(self.techniques)
+        reduction.update(self)
+        return reduction
+
+    def update(self, other):
+        """Fold another game's (or games') accumulators into these, in place, as if they followed these games."""
+        self.hands += other.hands
+        self.net_sum += other.net_sum
+        self.net_squares += other.net_squares
+        self.control_sums += other.control_sums
+        self.control_products += other.control_products
+        self.control_net_products += other.control_net_products
+        self.stratum_hands += other.stratum_hands
+        self.stratum_net_sums += other.stratum_net_sums
+        self.stratum_net_squares += other.stratum_net_squares
+
+        if other.start is None:
+            return
+        self.games += other.games
+        self.game_moments += other.game_moments
+        self.pairs += other.pairs
+        self.pair_moments += other.pair_moments
+        if self.start is None:
+            self.start, self.leading_game = other.start, other.leading_game
+        elif self.trailing_game is not None and other.leading_game is not None and self.end == other.start:
+            # The last game of these games and the first of the other's are a pair, so close it off.
+            nets, hands = zip(self.trailing_game, other.leading_game)
+            self.pairs += 1
+            self.pair_moments += moments(np.array([sum(nets) / 2]), np.array([sum(hands) / 2]))
+        self.end, self.trailing_game = other.end, other.trailing_game
+
+    def control_estimate(self, number_of_decks):
+        """Get the control variate estimate of the average net result of a hand, and its variance."""
+        hands = self.hands
+        if hands < len(CONTROLS) + 2:
+            return 0.0, float('inf')
+        control_means_observed = self.control_sums / hands
+        net_mean = self.net_sum / hands
+        control_covariance = self.control_products - hands * np.outer(control_means_observed, control_means_observed)
+        control_net_covariance = self.control_net_products - hands * control_means_observed * net_mean
+        coefficients = np.linalg.lstsq(control_covariance, control_net_covariance, rcond=None)[0]
+
+        estimate = net_mean - coefficients @ (control_means_observed - control_means(number_of_decks))
+        residual_squares = self.net_squares - hands * net_mean ** 2 - coefficients @ control_net_covariance
+        return float(estimate), max(float(residual_squares), 0.0) / (hands - len(CONTROLS) - 1) / hands
+
+    def stratified_estimate(self, number_of_decks):
+        """Get the post-stratified estimate of the average net result of a hand, and its variance."""
+        if self.hands < 2:
+            return 0.0, float('inf')
+        observed = self.stratum_hands > 0
+        probabilities = stratum_probabilities(number_of_decks)[observed]
+        probabilities /= probabilities.sum()  # Strata with no hands yet are left out.
+        hands = self.stratum_hands[observed]
+        means = self.stratum_net_sums[observed] / hands
+
+        # Strata with a single hand have no variance of their own, so they are given the overall variance.
+        overall_variance = (self.net_squares - self.net_sum ** 2 / self.hands) / (self.hands - 1)
+        squares = self.stratum_net_squares[observed] - hands * means ** 2
+        variances = np.where(hands > 1, squares / np.maximum(hands - 1, 1), overall_variance)
+        return float(probabilities @ means), float(np.maximum(probabilities ** 2 * variances / hands, 0.0).sum())
+
+    def antithetic_estimates(self):
+        """Get the antithetic (paired) estimate of the average net result of a hand and its variance, and the variance
+        of the same estimate from the games taken independently."""
+        estimate, variance = ratio_estimate(self.pairs, self.pair_moments)
+        return estimate, variance, ratio_estimate(self.games, self.game_moments)[1]
+
+    def estimates(self, number_of_decks, z=Z_95):
+        """
+        Get the estimate of the average net result of a hand of each technique, as (technique, estimate, confidence
+        interval half-width (95% by default), variance reduction) tuples.
+        """
+        plain_variance = float('inf')
+        if self.hands > 1:
+            plain_variance = (self.net_squares - self.net_sum ** 2 / self.hands) / (self.hands - 1) / self.hands
+
+        estimates = []
+        for technique in self.techniques:
+            if technique == 'antithetic':
+                estimate, variance, baseline_variance = self.antithetic_estimates()
+            else:
+                estimator = self.control_estimate if technique == 'control' else self.stratified_estimate
+                estimate, variance = estimator(number_of_decks)
+                baseline_variance = plain_variance
+            reduction = baseline_variance / variance if 0 < variance < float('inf') else float('nan')
+            estimates.append((technique, estimate, z * np.sqrt(variance), reduction))
+        return estimates
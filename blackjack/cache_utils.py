@@ -0,0 +1,12 @@
+import os
+
+
+# Directory for on-disk caches (computed tables, simulation results). Can be overridden with an environment variable.
+CACHE_DIRECTORY = os.environ.get('BLACKJACK_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'blackjack'))
+
+
+def cache_path(*parts):
+    """Get the path of a file in the cache directory, creating its parent directories if necessary."""
+    path = os.path.join(CACHE_DIRECTORY, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
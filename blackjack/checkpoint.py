@@ -0,0 +1,54 @@
+"""
+Checkpoints of running simulations, so a long simulation can be resumed after it is interrupted.
+
+Batch summaries are merged into the running summary in game order (see blackjack.simulation), so the state of a
+simulation is just that summary: the games it summarizes are always the first `summary.games` games, and the
+simulation continues from the next game index. A checkpoint holds the summary, the master seed (so that an unseeded
+simulation resumes with the seed it drew), the time simulated so far (for time budgets) and the hash of the
+simulation's configuration (see result_cache.simulation_key), which a resumed simulation must match.
+
+Summaries don't grow with the number of games played, and checkpoints are written at most once per interval, so their
+cost is bounded no matter how long a simulation runs. They are written to a temporary file and then moved over the
+previous checkpoint, so an interruption while writing leaves the previous checkpoint intact.
+"""
+
+import os
+import pickle
+from time import perf_counter
+
+
+# Default number of seconds between checkpoints
+CHECKPOINT_INTERVAL = 60.0
+
+
+def save_checkpoint(path, key, seed, summary, elapsed):
+    """Atomically write a checkpoint of a simulation's running summary."""
+    checkpoint = {'key': key, 'seed': seed, 'games': summary.games, 'summary': summary, 'elapsed': elapsed}
+    with open(f"{path}.tmp", 'wb') as checkpoint_file:
+        pickle.dump(checkpoint, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(f"{path}.tmp", path)
+
+
+def load_checkpoint(path):
+    """Load a checkpoint, as a dictionary of its `key`, `seed`, `games`, `summary` and `elapsed` seconds."""
+    with open(path, 'rb') as checkpoint_file:
+        return pickle.load(checkpoint_file)
+
+
+class Checkpointer:
+    """Writes checkpoints of a simulation's running summary to a file, at most once per interval (in seconds)."""
+
+    def __init__(self, path, key, seed, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.key = key
+        self.seed = seed
+        self.interval = interval
+        self.last_checkpoint = perf_counter()
+
+    def update(self, summary, elapsed, force=False):
+        """Checkpoint the running summary if the interval has passed since the last checkpoint (or if forced)."""
+        if force or perf_counter() - self.last_checkpoint >= self.interval:
+            save_checkpoint(self.path, self.key, self.seed, summary, elapsed)
+            self.last_checkpoint = perf_counter()
@@ -1,8 +1,27 @@
 from blackjack.display_utils import header
+from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
+from blackjack.strategies.insurance_static_strategy import InsuranceStaticStrategy
+from blackjack.strategies.optimal_static_strategy import OptimalStaticStrategy
 from blackjack.strategies.user_input_strategy import UserInputStrategy
 from blackjack.user_input import float_response, get_user_input, int_response
 
 
+# Strategies that simulations can be played with, by name
+STRATEGY_MAP = {
+    'default': DefaultStaticStrategy,
+    'insurance': InsuranceStaticStrategy,
+    'optimal': OptimalStaticStrategy
+}
+
+
+def load_strategy(name, number_of_decks):
+    """Build a simulation strategy by name (see STRATEGY_MAP) for a number of decks."""
+    if STRATEGY_MAP[name] is OptimalStaticStrategy:
+        # Optimal tables depend on the number of decks played.
+        return OptimalStaticStrategy(number_of_decks)
+    return STRATEGY_MAP[name]()
+
+
 def get_interactive_configuration(default):
     """Get game configuration data for the interactive game mode."""
     if default:
@@ -0,0 +1,377 @@
+"""
+Lockstep batch engine for simulations.
+
+Plays many independent, non-verbose games at once, a turn at a time, with the state of every game held in NumPy
+arrays (struct-of-arrays): each game's shoe is a row of an integer matrix, and hand totals, Ace counts, wagers and
+bankrolls are vectors. Dealing, the pre-turn flow, strategy decisions (with the strategy's batched get_hand_actions),
+the dealer's turn and settling up are all vectorized across games.
+
+The rules, the order in which cards are dealt and the payout arithmetic are the same as HeadlessGameController's,
+so a game gives bit-identical metrics with either engine when shuffled with the same `random.Random` stream. The rare turns
+in which the gambler splits fall back to a HeadlessGameController playing that game's turn on to the end.
+"""
+
+from array import array
+
+import numpy as np
+
+from blackjack.analytics.metric_summary import LOSS, WIN, MetricSummary
+from blackjack.analytics.metric_tracker import MetricTracker
+from blackjack.analytics.variance_reduction import deal_code
+from blackjack.controllers.headless_game_controller import HeadlessGameController
+from blackjack.models.card import ACE, HARD_VALUE, NUM_CARDS, RANK
+from blackjack.models.dealer import Dealer
+from blackjack.models.gambler import Gambler
+from blackjack.models.hand import DealerHand, GamblerHand
+from blackjack.strategies.base_static_strategy import BaseStaticStrategy
+from blackjack.strategies.base_strategy import ACTION_BITS, ACTION_CODES, ACTIONS, NO_PAIR
+
+
+# Lookup tables indexed by card code, as arrays for gathering
+RANKS = np.array(RANK, dtype=np.int64)
+HARD_VALUES = np.array(HARD_VALUE, dtype=np.int64)
+
+# Hand status codes (the statuses GameController uses, for hands that are not split)
+PENDING, PLAYING, STOOD, DOUBLED, BUSTED, PLAYED, BLACKJACK = range(7)
+
+# Hand outcome codes (NO_OUTCOME while the outcome is not known yet)
+NO_OUTCOME, OUTCOME_WIN, OUTCOME_LOSS, OUTCOME_PUSH, OUTCOME_EVEN_MONEY, OUTCOME_INSURANCE_WIN = range(6)
+
+HIT, STAND, DOUBLE, SPLIT = (ACTION_CODES[action] for action in ('Hit', 'Stand', 'Double', 'Split'))
+
+# Recorded win/loss result of a turn that was played by the split fallback (its results are kept separately)
+SPLIT_TURN = 2
+
+
+class _ShoeRow:
+    """The `deal_card` interface of a Shoe, over a single game's row of a BatchGameController's shoes."""
+
+    def __init__(self, controller, game):
+        self.controller = controller
+        self.game = game
+        self.cards = controller.shoes[game]  # A view, which stays valid as the shoe is reshuffled in place
+
+    def deal_card(self):
+        """Deal a card from the game's shoe (reshuffle if pile exhausted)."""
+        controller = self.controller
+        position = int(controller.position[self.game])
+        if position == controller.shoe_size:
+            controller.reshuffle(self.game)
+            position = 0
+        controller.position[self.game] = position + 1
+        return int(self.cards[position])
+
+
+class BatchGameController:
+    """
+    Plays a batch of non-verbose games in lockstep (see the module docstring). Each game shuffles its shoe with its own
+    random generator: either a NumPy Generator (much faster), or a `random.Random` to shuffle exactly like a Shoe
+    with that generator would. The strategy must be a static strategy that never changes its wager, and whose answers to
+    even money and insurance do not change between turns.
+    """
+
+    def __init__(self, name, bankroll, auto_wager, number_of_decks, strategy, rngs, max_turns=None, track_deals=False):
+        if not isinstance(strategy, BaseStaticStrategy):
+            raise ValueError('The batch engine requires a static strategy')
+        if strategy.wants_to_change_wager():
+            raise ValueError('The batch engine does not support changing wagers')
+
+        self.name = name
+        self.strategy = strategy
+        self.max_turns = max_turns
+        self.track_deals = track_deals
+        self.rngs = rngs
+        self.games = len(rngs)
+        self.initial_bankroll = bankroll
+        self.wants_even_money = strategy.wants_even_money()
+        self.wants_insurance = strategy.wants_insurance()
+
+        # Shoes, shuffled the same way as Shoe: one row of encoded cards per game, and the position dealt up to.
+        self.shoe_size = NUM_CARDS * number_of_decks
+        self.shoes = np.tile(np.arange(NUM_CARDS, dtype=np.uint8), (self.games, number_of_decks))
+        self.position = np.zeros(self.games, dtype=np.int64)
+        for game in range(self.games):
+            self.reshuffle(game)
+
+        # Gambler state
+        self.bankroll = np.full(self.games, bankroll, dtype=np.float64)
+        self.auto_wager = np.full(self.games, auto_wager, dtype=np.float64)
+        self.turn = np.zeros(self.games, dtype=np.int64)
+
+        # Metric counts, per game (see MetricTracker)
+        self.counts = {count: np.zeros(self.games, dtype=np.int64) for count in MetricSummary.COUNTS}
+
+        # Win/loss result and bankroll of every game after each turn (one array per turn), and the win/loss results of
+        # the turns played by the split fallback, by (game, turn)
+        self.turn_results = []
+        self.turn_bankrolls = []
+        self.turn_deals = []  # Deal codes of the starting cards, if tracked (see MetricTracker.process_deal)
+        self.turn_exposures = []  # Total amount wagered (hands and insurance) on the turn
+        self.split_results = {}
+
+    def reshuffle(self, game):
+        """Reshuffle a game's shoe in place (as Shoe.reset_card_pile does) and start dealing from the top again."""
+        rng = self.rngs[game]
+        if isinstance(rng, np.random.Generator):
+            rng.shuffle(self.shoes[game])
+        else:
+            # `random.Random` swaps one item at a time, which is much faster on an array buffer than on a NumPy row.
+            cards = array('B', self.shoes[game].tobytes())
+            rng.shuffle(cards)
+            self.shoes[game] = np.frombuffer(cards, dtype=np.uint8)
+        self.position[game] = 0
+
+    def deal(self, games):
+        """Deal a card to each of a set of games (reshuffling any exhausted shoes) and return the cards."""
+        for game in games[self.position[games] == self.shoe_size].tolist():
+            self.reshuffle(game)
+        cards = self.shoes[games, self.position[games]].astype(np.int64)
+        self.position[games] += 1
+        return cards
+
+    def active_games(self):
+        """Get the games that play another turn (see GameController.play_condition), and vet their wagers."""
+        active = (self.auto_wager != 0) & (self.bankroll != 0)
+        if self.max_turns:
+            active &= self.turn < self.max_turns
+        games = np.flatnonzero(active)
+
+        # The auto-wager is lowered to the bankroll if it can't be placed.
+        self.auto_wager[games] = np.minimum(self.auto_wager[games], self.bankroll[games])
+        games = games[self.auto_wager[games] != 0]
+        self.turn[games] += 1
+        return games
+
+    def play(self):
+        """Play every game to completion, a turn at a time."""
+        while True:
+            games = self.active_games()
+            if not games.size:
+                break
+            self.play_turn(games)
+
+    def play_turn(self, games):
+        """Play a turn of a set of games."""
+        # Deal like GameController.deal: one card to each player at a time, starting with the gambler.
+        card_1, up_card, card_3, hole_card = (self.deal(games) for _ in range(4))
+        wager = self.auto_wager[games].copy()
+        bankroll = self.bankroll[games] - wager
+        insurance = np.zeros(games.size, dtype=np.float64)
+        lost_insurance = np.zeros(games.size, dtype=bool)
+
+        hard_total = HARD_VALUES[card_1] + HARD_VALUES[card_3]
+        num_aces = (RANKS[card_1] == ACE).astype(np.int64) + (RANKS[card_3] == ACE)
+        num_cards = np.full(games.size, 2, dtype=np.int64)
+        dealer_total = HARD_VALUES[up_card] + HARD_VALUES[hole_card]
+        dealer_aces = (RANKS[up_card] == ACE).astype(np.int64) + (RANKS[hole_card] == ACE)
+        outcome = np.full(games.size, NO_OUTCOME, dtype=np.int8)
+
+        # Hands dealt as blackjacks get the 'Blackjack' status (see Hand).
+        gambler_blackjack = (hard_total == 11) & (num_aces > 0)
+        dealer_blackjack = (dealer_total == 11) & (dealer_aces > 0)
+        status = np.where(gambler_blackjack, BLACKJACK, PENDING).astype(np.int8)
+
+        # --- Pre-turn flow (see HeadlessGameController.play_pre_turn) --- #
+        showing_ace = RANKS[up_card] == ACE
+        showing_ten = HARD_VALUES[up_card] == 10
+
+        if self.wants_even_money:
+            outcome[showing_ace & gambler_blackjack] = OUTCOME_EVEN_MONEY
+        else:
+            outcome[showing_ace & gambler_blackjack & dealer_blackjack] = OUTCOME_PUSH
+            outcome[showing_ace & gambler_blackjack & ~dealer_blackjack] = OUTCOME_WIN
+
+        no_blackjack = showing_ace & ~gambler_blackjack
+        if self.wants_insurance:
+            insured = no_blackjack & (wager / 2 <= bankroll)
+            insurance[insured] = wager[insured] / 2
+            bankroll[insured] -= insurance[insured]
+            outcome[insured & dealer_blackjack] = OUTCOME_INSURANCE_WIN
+            lost_insurance[insured & ~dealer_blackjack] = True
+            no_blackjack &= ~insured
+        outcome[no_blackjack & dealer_blackjack] = OUTCOME_LOSS
+
+        outcome[showing_ten & dealer_blackjack] = np.where(gambler_blackjack, OUTCOME_PUSH, OUTCOME_LOSS)[showing_ten & dealer_blackjack]
+        outcome[showing_ten & ~dealer_blackjack & gambler_blackjack] = OUTCOME_WIN
+        outcome[~showing_ace & ~showing_ten & gambler_blackjack] = OUTCOME_WIN
+        status[(outcome != NO_OUTCOME) & (status == PENDING)] = PLAYED
+
+        # --- Gambler's turn (see HeadlessGameController.play_gambler_hand) --- #
+        pair = RANKS[card_1] == RANKS[card_3]
+        split = np.zeros(games.size, dtype=bool)
+        status[status == PENDING] = PLAYING
+        playing = np.flatnonzero(status == PLAYING)
+        while playing.size:
+            action = self.hand_actions(
+                hard_total[playing], num_aces[playing], num_cards[playing], pair[playing], card_1[playing],
+                up_card[playing], wager[playing] <= bankroll[playing]
+            )
+
+            # Hands that split are played on by the scalar fallback, below.
+            split[playing[action == SPLIT]] = True
+            status[playing[action == SPLIT]] = PENDING
+
+            stand = playing[action == STAND]
+            status[stand] = STOOD
+
+            double = playing[action == DOUBLE]
+            bankroll[double] -= wager[double]
+            wager[double] += wager[double]
+            status[double] = DOUBLED
+
+            hit = playing[(action == HIT) | (action == DOUBLE)]
+            card = self.deal(games[hit])
+            hard_total[hit] += HARD_VALUES[card]
+            num_aces[hit] += RANKS[card] == ACE
+            num_cards[hit] += 1
+
+            # If the hand is 21 or busted, the hand is done being played.
+            acted = playing[action != SPLIT]
+            total = self.final_totals(hard_total[acted], num_aces[acted])
+            status[acted[total == 21]] = STOOD
+            busted = acted[hard_total[acted] > 21]
+            status[busted] = BUSTED
+            outcome[busted] = OUTCOME_LOSS
+
+            playing = playing[status[playing] == PLAYING]
+
+        # --- Dealer's turn (see HeadlessGameController.play_dealer_turn) --- #
+        dealer_playing = np.flatnonzero(((status == STOOD) | (status == DOUBLED)) & ~split)
+        while dealer_playing.size:
+            total = self.final_totals(dealer_total[dealer_playing], dealer_aces[dealer_playing])
+            soft = (dealer_aces[dealer_playing] > 0) & (dealer_total[dealer_playing] <= 11)
+            dealer_playing = dealer_playing[(total < 17) | ((total == 17) & soft)]
+            card = self.deal(games[dealer_playing])
+            dealer_total[dealer_playing] += HARD_VALUES[card]
+            dealer_aces[dealer_playing] += RANKS[card] == ACE
+            dealer_playing = dealer_playing[dealer_total[dealer_playing] <= 21]
+
+        # --- Settle up (see HeadlessGameController.settle_hand) --- #
+        undecided = (outcome == NO_OUTCOME) & ~split
+        dealer_final = self.final_totals(dealer_total, dealer_aces)
+        gambler_final = self.final_totals(hard_total, num_aces)
+        outcome[undecided & (dealer_total > 21)] = OUTCOME_WIN
+        undecided &= dealer_total <= 21
+        outcome[undecided & (gambler_final > dealer_final)] = OUTCOME_WIN
+        outcome[undecided & (gambler_final == dealer_final)] = OUTCOME_PUSH
+        outcome[undecided & (gambler_final < dealer_final)] = OUTCOME_LOSS
+
+        # Everything wagered on the turn has been placed by now (split hands are added by the fallback, below).
+        exposures = np.zeros(self.games, dtype=np.float64)
+        exposures[games] = self.bankroll[games] - bankroll
+
+        # Payouts are made with the same arithmetic and in the same order as HeadlessGameController's.
+        paid = (outcome == OUTCOME_WIN) | (outcome == OUTCOME_EVEN_MONEY)
+        blackjack_win = (outcome == OUTCOME_WIN) & (status == BLACKJACK)
+        bankroll[blackjack_win] += wager[blackjack_win] * 3 / 2
+        bankroll[paid & ~blackjack_win] += wager[paid & ~blackjack_win] * 1 / 1
+        bankroll[paid | (outcome == OUTCOME_PUSH)] += wager[paid | (outcome == OUTCOME_PUSH)]
+        insurance_win = outcome == OUTCOME_INSURANCE_WIN
+        bankroll[insurance_win] += insurance[insurance_win] * 2 / 1
+        bankroll[insurance_win] += insurance[insurance_win]
+        self.bankroll[games] = bankroll
+
+        # --- Track metrics (see MetricTracker.process_gambler_hand) --- #
+        counts = self.counts
+        counts['wins'][games] += paid
+        counts['losses'][games] += outcome == OUTCOME_LOSS
+        counts['pushes'][games] += outcome == OUTCOME_PUSH
+        counts['insurance_wins'][games] += insurance_win
+        counts['insurance_losses'][games] += lost_insurance & ~split  # Counted by the split fallback otherwise
+        counts['gambler_blackjacks'][games] += status == BLACKJACK
+        counts['dealer_blackjacks'][games] += dealer_blackjack
+
+        results = np.zeros(self.games, dtype=np.int8)
+        results[games] = np.select([paid, outcome == OUTCOME_LOSS, split], [WIN, LOSS, SPLIT_TURN], 0)
+
+        for index in np.flatnonzero(split).tolist():
+            exposures[games[index]] += self.play_split_turn(
+                int(games[index]), int(card_1[index]), int(card_3[index]), int(up_card[index]), int(hole_card[index]),
+                float(wager[index]), float(insurance[index]), bool(lost_insurance[index])
+            )
+
+        self.turn_results.append(results)
+        self.turn_exposures.append(exposures)
+        if self.track_deals:
+            deals = np.zeros(self.games, dtype=np.uint16)
+            deals[games] = deal_code(*(HARD_VALUES[card] - 1 for card in (card_1, card_3, up_card, hole_card)))
+            self.turn_deals.append(deals)
+        self.turn_bankrolls.append(self.bankroll.copy())
+
+    def play_split_turn(self, game, card_1, card_3, up_card, hole_card, wager, insurance, lost_insurance):
+        """
+        Play on the turn of a game whose gambler splits, with a HeadlessGameController over that game's shoe.
+        The gambler's hand is played from its first decision (which splits again), so the flow is exactly the same.
+        Returns the amount wagered on the hands split off.
+        """
+        gambler = Gambler(self.name, bankroll=float(self.bankroll[game]), auto_wager=float(self.auto_wager[game]))
+        hand = GamblerHand(cards=[card_1, card_3], wager=wager, insurance=insurance)
+        hand.lost_insurance = lost_insurance
+        gambler.hands.append(hand)
+        dealer = Dealer(DealerHand(cards=[up_card, hole_card]))
+
+        controller = HeadlessGameController(gambler, dealer, _ShoeRow(self, game), self.strategy)
+        controller.play_gambler_turn()
+        controller.play_dealer_turn()
+        controller.settle_up()
+        controller.track_metrics()
+
+        self.bankroll[game] = gambler.bankroll
+        metric_tracker = controller.metric_tracker
+        for count, values in self.counts.items():
+            values[game] += getattr(metric_tracker, count)
+        self.split_results[game, int(self.turn[game])] = metric_tracker.wins_losses
+        return sum(split_hand.wager for split_hand in gambler.hands) - wager
+
+    @staticmethod
+    def final_totals(hard_total, num_aces):
+        """Get the final totals of hands from their hard totals and Ace counts (see Hand.final_total)."""
+        return np.where((num_aces > 0) & (hard_total <= 11), hard_total + 10, hard_total)
+
+    def hand_actions(self, hard_total, num_aces, num_cards, pair, first_card, up_card, can_afford):
+        """Get the action code of each hand from the strategy, for the options GameController.get_hand_options gives."""
+        two_cards = num_cards == 2
+        allowed = np.full(hard_total.size, ACTION_BITS[HIT] | ACTION_BITS[STAND], dtype=np.int64)
+        allowed[two_cards & can_afford] |= ACTION_BITS[DOUBLE]
+        allowed[two_cards & pair & can_afford] |= ACTION_BITS[SPLIT]
+        soft = (num_aces > 0) & (hard_total <= 11)
+        pair_ranks = np.where(two_cards & pair, RANKS[first_card], NO_PAIR)
+
+        action = self.strategy.get_hand_actions(hard_total, soft, pair_ranks, up_card, allowed)
+        if (action > SPLIT).any():
+            raise Exception(f"Unhandled response: {ACTIONS[action.max()]}")
+        return action
+
+    def exposures(self):
+        """Get the total amount wagered on each turn of each game, as a (turn, game) array (0 for turns not played)."""
+        return np.array(self.turn_exposures).reshape(-1, self.games)
+
+    def metric_trackers(self):
+        """Get a MetricTracker of each game's metrics, as if it had been played by a GameController."""
+        results = np.array(self.turn_results).reshape(-1, self.games)
+        bankrolls = np.array(self.turn_bankrolls).reshape(-1, self.games)
+        deals = np.array(self.turn_deals, dtype=np.uint16).reshape(-1, self.games)
+
+        metric_trackers = []
+        for game in range(self.games):
+            metric_tracker = MetricTracker()
+            for count, values in self.counts.items():
+                setattr(metric_tracker, count, int(values[game]))
+
+            turns = int(self.turn[game])
+            metric_tracker.bankroll_progression = [self.initial_bankroll] + bankrolls[:turns, game].tolist()
+            if self.track_deals:
+                metric_tracker.deals = array('H', deals[:turns, game].tobytes())
+
+            game_results = results[:turns, game]
+            game_results = game_results[game_results != 0]
+            if (game_results == SPLIT_TURN).any():
+                wins_losses = array('b')
+                split_turns = iter(turn + 1 for turn in np.flatnonzero(results[:turns, game] == SPLIT_TURN).tolist())
+                for result in game_results.tolist():
+                    wins_losses.extend(self.split_results[game, next(split_turns)] if result == SPLIT_TURN else [result])
+                metric_tracker.wins_losses = wins_losses
+            else:
+                metric_tracker.wins_losses = array('b', game_results.tobytes())
+            metric_trackers.append(metric_tracker)
+        return metric_trackers
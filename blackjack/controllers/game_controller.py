@@ -3,6 +3,7 @@ from time import sleep
 
 from blackjack.analytics.metric_tracker import MetricTracker
 from blackjack.exc import InsufficientBankrollError
+from blackjack.models.card import is_ace
 from blackjack.models.hand import DealerHand, GamblerHand
 from blackjack.display_utils import clear, header, money_format, pct_format
 
@@ -18,7 +19,8 @@ def render_after(instance_method):
 
 class GameController:
 
-    def __init__(self, gambler, dealer, shoe, strategy, verbose=True, max_turns=None):
+    def __init__(self, gambler, dealer, shoe, strategy, verbose=True, max_turns=None, history=None, timings=None,
+                 track_deals=False):
         # Configured models from game setup
         self.gambler = gambler
         self.dealer = dealer
@@ -39,8 +41,19 @@ class GameController:
         self.turn = 0
         self.max_turns = max_turns
 
-        # Metric tracking (for analytics)
+        # Metric tracking (for analytics). The starting cards of each turn are only tracked when asked for (they are
+        # only needed for variance reduction).
         self.metric_tracker = MetricTracker()
+        self.track_deals = track_deals
+
+        # Optional hand history recording (a HandHistoryWriter)
+        self.history = history
+        if history is not None:
+            history.start_game(gambler, shoe, max_turns)
+
+        # Optional timing of the game's phases (a PhaseTimings). Only timed games have their methods wrapped.
+        if timings is not None:
+            timings.attach(self)
 
     def play(self):
         """Main game loop that controls entire game flow."""
@@ -144,6 +157,8 @@ class GameController:
         # Deal like they do a casinos --> one card to each player at a time, starting with the gambler.
         self.gambler.hands.append(GamblerHand(cards=[card_1, card_3]))
         self.dealer.hand = DealerHand(cards=[card_2, card_4])
+        if self.track_deals:
+            self.metric_tracker.process_deal(card_1, card_2, card_3, card_4)
 
         # Place the gambler's auto-wager on the hand. We've already vetted that they have sufficient bankroll.
         self.gambler.place_auto_wager()
@@ -296,7 +311,7 @@ class GameController:
                     break
 
                 # Split Aces only get 1 more card by rule. If they're not a blackjack mark them as stood.
-                if hand.cards[0].is_ace():
+                if is_ace(hand.cards[0]):
                     if hand.status != 'Blackjack':
                         self.set_hand_status(hand, 'Stood')
                     break
@@ -306,6 +321,8 @@ class GameController:
 
             # Get the gambler's action (e.g. 'Hit', 'Stand', etc.)
             action = self.strategy.get_hand_action(hand, options, self.dealer.up_card())
+            if self.history is not None:
+                self.history.record_action(hand, action)
 
             if action == 'Hit':
                 self.hit_hand(hand)  # Deal another card and keep playing the hand.
@@ -348,12 +365,12 @@ class GameController:
     def hit_hand(self, hand):
         """Add a card to a hand from the shoe."""
         card = self.shoe.deal_card()  # Deal a card
-        hand.cards.append(card)  # Add the card to the hand
+        hand.add_card(card)  # Add the card to the hand
 
     @render_after
     def split_hand(self, hand):
         """Split a hand."""
-        split_card = hand.cards.pop(1)  # Pop the second card off the hand to make a new hand
+        split_card = hand.pop_card(1)  # Pop the second card off the hand to make a new hand
         new_hand = GamblerHand(cards=[split_card], hand_number=len(self.gambler.hands) + 1)  # TODO: Do away with hand_number
         self.gambler.place_hand_wager(hand.wager, new_hand)  # Place the same wager on the new hand
         self.gambler.hands.append(new_hand)  # Add the hand to the gambler's list of hands
@@ -551,6 +568,10 @@ class GameController:
         # Update tracked metrics
         self.track_metrics()
 
+        # Record the turn in the hand history if applicable.
+        if self.history is not None:
+            self.history.record_turn(self.turn, self.gambler, self.shoe)
+
         # Reset the activity log for the next turn.
         self.activity = []
 
@@ -570,7 +591,11 @@ class GameController:
         # Render game over message if applicable
         if self.verbose:
             self.render_game_over()
-        
+
+        # Write out the rest of the hand history if applicable.
+        if self.history is not None:
+            self.history.flush()
+
     def render(self):
         """Print out the entire game (comprised of table, activity log, and user action) to the console."""
         clear()  # Clear previous rendering
@@ -0,0 +1,234 @@
+from blackjack.controllers.game_controller import GameController
+from blackjack.models.card import is_ace
+from blackjack.models.hand import DealerHand, GamblerHand
+
+
+class HeadlessGameController(GameController):
+    """
+    GameController that plays the exact same rules without rendering, pausing or building an activity log.
+    Used for simulations, where nobody reads the output. Gameplay must stay in lockstep with GameController.
+    """
+
+    def __init__(self, gambler, dealer, shoe, strategy, max_turns=None, history=None, timings=None, track_deals=False):
+        super().__init__(
+            gambler, dealer, shoe, strategy, verbose=False, max_turns=max_turns, history=history, timings=timings,
+            track_deals=track_deals
+        )
+
+    def play(self):
+        """Main game loop that controls entire game flow."""
+        # Track the starting bankroll
+        self.metric_tracker.append_bankroll(self.gambler.bankroll)
+
+        # Play the game to completion
+        while self.play_condition():
+            self.turn += 1
+
+            # If the gambler cashed out, don't play the turn. The game is over.
+            self.check_gambler_wager()
+            if self.gambler.auto_wager == 0:
+                break
+
+            self.deal()
+            self.play_pre_turn()
+            self.play_gambler_turn()
+            self.play_dealer_turn()
+            self.settle_up()
+            self.finalize_turn()
+
+        self.finalize_game()
+
+    def add_activity(self, *messages):
+        """No activity log is kept when running headless."""
+
+    def check_gambler_wager(self):
+        """Pre-turn vetting of the gambler's wager (see GameController.check_gambler_wager)."""
+        if not self.gambler.can_place_auto_wager():
+            self.gambler.set_new_auto_wager(self.gambler.bankroll)
+
+        if self.strategy.wants_to_change_wager():
+            self.set_new_auto_wager()
+
+    def deal(self):
+        """Deal cards from the Shoe to both the gambler and the dealer to form their initial hands."""
+        card_1, card_2, card_3, card_4 = self.shoe.deal_n_cards(4)
+        self.gambler.hands.append(GamblerHand(cards=[card_1, card_3]))
+        self.dealer.hand = DealerHand(cards=[card_2, card_4])
+        if self.track_deals:
+            self.metric_tracker.process_deal(card_1, card_2, card_3, card_4)
+        self.gambler.place_auto_wager()
+
+    def play_pre_turn(self):
+        """Carry out pre-turn flow for blackjacks and insurance (see GameController.play_pre_turn)."""
+        gambler_hand = self.gambler.first_hand()
+        gambler_has_blackjack = gambler_hand.is_blackjack()
+        dealer_has_blackjack = self.dealer.hand.is_blackjack()
+
+        # Dealer is showing an Ace, so insurance/even money come into play.
+        if self.dealer.is_showing_ace():
+            if gambler_has_blackjack:
+                if self.strategy.wants_even_money():
+                    self.set_hand_outcome(gambler_hand, 'Even Money')
+                elif dealer_has_blackjack:
+                    self.set_hand_outcome(gambler_hand, 'Push')
+                else:
+                    self.set_hand_outcome(gambler_hand, 'Win')
+
+            elif self.gambler.can_place_insurance_wager() and self.strategy.wants_insurance():
+                self.gambler.place_insurance_wager()
+                if dealer_has_blackjack:
+                    self.set_hand_outcome(gambler_hand, 'Insurance Win')
+                else:
+                    gambler_hand.lost_insurance = True
+
+            elif dealer_has_blackjack:
+                self.set_hand_outcome(gambler_hand, 'Loss')
+
+        # Dealer is showing a face card, so check for a dealer blackjack.
+        elif self.dealer.is_showing_face_card():
+            if dealer_has_blackjack:
+                self.set_hand_outcome(gambler_hand, 'Push' if gambler_has_blackjack else 'Loss')
+            elif gambler_has_blackjack:
+                self.set_hand_outcome(gambler_hand, 'Win')
+
+        # Dealer cannot have blackjack.
+        elif gambler_has_blackjack:
+            self.set_hand_outcome(gambler_hand, 'Win')
+
+    def play_gambler_turn(self):
+        """Play the gambler's turn, meaning play all of the gambler's hands to completion."""
+        # Split hands are always appended after the hand being played, so a single in-order pass plays them all.
+        hands = self.gambler.hands
+        index = 0
+        while index < len(hands):
+            hand = hands[index]
+            if hand.status == 'Pending':
+                self.play_gambler_hand(hand)
+            index += 1
+
+    def play_gambler_hand(self, hand):
+        """Play a gambler hand (see GameController.play_gambler_hand)."""
+        hand.status = 'Playing'
+
+        while hand.status == 'Playing':
+
+            # Handle single-card hands that result from splitting
+            if len(hand.cards) == 1:
+                self.hit_hand(hand)
+
+                if hand.is_blackjack():
+                    hand.status = 'Blackjack'
+                    self.set_hand_outcome(hand, 'Win')
+                    break
+
+                # Split Aces only get 1 more card by rule.
+                if is_ace(hand.cards[0]):
+                    hand.status = 'Stood'
+                    break
+
+            action = self.strategy.get_hand_action(hand, self.get_hand_options(hand), self.dealer.up_card())
+            if self.history is not None:
+                self.history.record_action(hand, action)
+
+            if action == 'Hit':
+                self.hit_hand(hand)
+            elif action == 'Stand':
+                hand.status = 'Stood'
+            elif action == 'Double':
+                self.double_hand(hand)
+            elif action == 'Split':
+                self.split_hand(hand)
+            else:
+                raise Exception('Unhandled response.')  # Should never get here
+
+            if hand.is_21():
+                hand.status = 'Stood'
+            elif hand.is_busted():
+                hand.status = 'Busted'
+                self.set_hand_outcome(hand, 'Loss')
+
+    def hit_hand(self, hand):
+        """Add a card to a hand from the shoe."""
+        hand.add_card(self.shoe.deal_card())
+
+    def split_hand(self, hand):
+        """Split a hand."""
+        new_hand = GamblerHand(cards=[hand.pop_card(1)], hand_number=len(self.gambler.hands) + 1)
+        self.gambler.place_hand_wager(hand.wager, new_hand)
+        self.gambler.hands.append(new_hand)
+
+    def set_hand_status(self, hand, status):
+        """Set a new status for a hand."""
+        hand.status = status
+
+    def set_hand_outcome(self, hand, outcome):
+        """Set the outcome of the hand, and change the status if applicable."""
+        hand.outcome = outcome
+        if hand.status == 'Pending':
+            hand.status = 'Played'
+
+    def play_dealer_turn(self):
+        """Play the dealer's turn (if necessary). Dealer hits under 17 and must hit a soft 17."""
+        if not any(hand.status in ('Doubled', 'Stood') for hand in self.gambler.hands):
+            return
+
+        hand = self.dealer.hand
+        hand.status = 'Playing'
+
+        while hand.status == 'Playing':
+            total = hand.final_total()
+            if total < 17 or (total == 17 and hand.is_soft()):
+                self.hit_hand(hand)
+            else:
+                hand.status = 'Stood'
+
+            if hand.is_busted():
+                hand.status = 'Busted'
+
+    def _pay_out(self, hand, amount):
+        """Pay an amount to the gambler on behalf of a hand."""
+        hand.earnings += amount
+        self.gambler.payout(amount)
+
+    def settle_hand(self, hand):
+        """Settle any outstanding wagers on a hand (see GameController.settle_hand)."""
+        if not hand.outcome:
+            self.determine_hand_outcome(hand, self.dealer.hand)
+
+        outcome = hand.outcome
+
+        # Payouts are made in the same order and with the same arithmetic as GameController.perform_hand_payout,
+        # so that bankrolls stay bit-identical between the two controllers.
+        if outcome == 'Win':
+            if hand.status == 'Blackjack':
+                self._pay_out(hand, hand.wager * 3 / 2)
+            else:
+                self._pay_out(hand, hand.wager * 1 / 1)
+            self._pay_out(hand, hand.wager)
+
+        elif outcome == 'Push':
+            self._pay_out(hand, hand.wager)
+
+        elif outcome == 'Even Money':
+            self._pay_out(hand, hand.wager * 1 / 1)
+            self._pay_out(hand, hand.wager)
+
+        elif outcome == 'Insurance Win':
+            self._pay_out(hand, hand.insurance * 2 / 1)
+            self._pay_out(hand, hand.insurance)
+
+        elif outcome != 'Loss':
+            raise ValueError(f"Unhandled hand outcome: {outcome}")
+
+    def finalize_turn(self):
+        """Clean up the current turn in preparation for the next turn."""
+        self.track_metrics()
+        if self.history is not None:
+            self.history.record_turn(self.turn, self.gambler, self.shoe)
+        self.gambler.discard_hands()
+        self.dealer.discard_hand()
+
+    def finalize_game(self):
+        """Nothing to render at the end of a headless game, but write out the rest of the hand history if applicable."""
+        if self.history is not None:
+            self.history.flush()
@@ -1,26 +1,64 @@
 
+import random
+
+from blackjack.controllers.batch_game_controller import BatchGameController
 from blackjack.controllers.game_controller import GameController
+from blackjack.controllers.headless_game_controller import HeadlessGameController
 from blackjack.models.dealer import Dealer
 from blackjack.models.gambler import Gambler
 from blackjack.models.shoe import Shoe
 
 
-def setup_game(config):
-    """Set up the GameController class that runs the game from a configuration dictionary."""
+def setup_game(config, strategy=None, seed=None, rng=None, history=None, timings=None, track_deals=False):
+    """
+    Set up the GameController class that runs the game from a configuration dictionary.
+    An already-built strategy instance can be passed in to be reused, instead of instantiating the configured one.
+    The shoe is shuffled with `rng` if given, otherwise with a new generator seeded with `seed` (if given).
+    The game's hand history is recorded to `history` (a HandHistoryWriter) if given, and the time spent in each of
+    its phases is accumulated into `timings` (a PhaseTimings) if given. The starting cards of each turn are tracked if
+    `track_deals` is set (for variance reduction).
+    """
     # Extract values from configuration. Note that this dict could grow and be stored/loaded from a
     # different source, so doing this to keep configuration flexible.
     name = config['gambler']['name']
     bankroll = config['gambler']['bankroll']
     auto_wager = config['gambler']['auto_wager']
     number_of_decks = config['shoe']['number_of_decks']
-    strategy = config['gameplay']['strategy']
+    strategy = strategy or config['gameplay']['strategy']()
     verbose = config['gameplay']['verbose']
     max_turns = config['gameplay']['max_turns']
 
     # Create core components of the game: A Gambler, a Dealer, and a Shoe of cards.
     gambler = Gambler(name, bankroll=bankroll, auto_wager=auto_wager)
     dealer = Dealer()
-    shoe = Shoe(number_of_decks)
+    if rng is None and seed is not None:
+        rng = random.Random(seed)
+    shoe = Shoe(number_of_decks, rng=rng)
+
+    # Instantiate and return the central controller of the game. Non-verbose games skip all rendering machinery.
+    if not verbose:
+        return HeadlessGameController(
+            gambler, dealer, shoe, strategy, max_turns=max_turns, history=history, timings=timings,
+            track_deals=track_deals
+        )
+    return GameController(
+        gambler, dealer, shoe, strategy, verbose=verbose, max_turns=max_turns, history=history, timings=timings,
+        track_deals=track_deals
+    )
+
 
-    # Instantiate and return the central controller of the game.
-    return GameController(gambler, dealer, shoe, strategy(), verbose=verbose, max_turns=max_turns)
+def setup_batch_game(config, rngs, strategy=None, track_deals=False):
+    """
+    Set up a BatchGameController that plays one non-verbose game per random generator in `rngs` from a configuration
+    dictionary (the same configuration as `setup_game`), all in lockstep, tracking starting cards if `track_deals`.
+    """
+    return BatchGameController(
+        config['gambler']['name'],
+        config['gambler']['bankroll'],
+        config['gambler']['auto_wager'],
+        config['shoe']['number_of_decks'],
+        strategy or config['gameplay']['strategy'](),
+        rngs,
+        max_turns=config['gameplay']['max_turns'],
+        track_deals=track_deals
+    )
@@ -0,0 +1,242 @@
+"""
+Compact binary hand histories of played games.
+
+A history file is an append-only sequence of chunks, each a fixed-size header followed by a payload of packed,
+little-endian NumPy records, so a whole file can be memory-mapped and read without copying. A file holds one or more
+games, each made of:
+
+- A GAME chunk with the game's settings (see GAME_DTYPE).
+- A SHOE chunk for each card pile the game's shoe was shuffled into (encoded cards, in dealing order), in order.
+- Interleaved with those, TURNS chunks of a number of turns each. A TURNS chunk holds a record of each turn (see TURN_DTYPE), followed by the
+  cards dealt in those turns (in dealing order), the actions taken (see ACTION_DTYPE) and the gambler's hands
+  (see HAND_DTYPE), each concatenated over the turns of the chunk.
+
+The recorded shoes are all that is needed to replay a game's cards (see blackjack.history.replay).
+"""
+
+import os
+import struct
+from array import array
+
+import numpy as np
+
+from blackjack.strategies.base_strategy import ACTION_CODES
+
+
+MAGIC = b'BJHH'
+
+# Chunk kinds
+GAME, SHOE, TURNS = range(3)
+
+# Chunk header: magic, kind, and the number of turns, cards, actions and hands in the payload
+HEADER = struct.Struct('<4sB3xIIII')
+
+GAME_DTYPE = np.dtype([
+    ('bankroll', '<f8'),
+    ('auto_wager', '<f8'),
+    ('number_of_decks', '<u2'),
+    ('max_turns', '<u4')  # 0 when there is no max
+])
+TURN_DTYPE = np.dtype([
+    ('turn', '<u4'),
+    ('bankroll', '<f8'),  # Gambler's bankroll after the turn
+    ('cards', '<u2'),
+    ('actions', '<u2'),
+    ('hands', 'u1')
+])
+ACTION_DTYPE = np.dtype([
+    ('hand', 'u1'),  # Hand number
+    ('action', 'u1')  # Action code (see ACTIONS)
+])
+HAND_DTYPE = np.dtype([
+    ('wager', '<f8'),
+    ('insurance', '<f8'),
+    ('earnings', '<f8'),
+    ('outcome', 'u1'),
+    ('status', 'u1'),
+    ('lost_insurance', '?')
+])
+
+# Codes of hand outcomes and statuses, as recorded in HAND_DTYPE records
+OUTCOMES = ('Win', 'Loss', 'Push', 'Even Money', 'Insurance Win')
+OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+STATUSES = ('Pending', 'Playing', 'Stood', 'Doubled', 'Busted', 'Played', 'Blackjack')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+class RecordingShuffler:
+    """Random generator wrapper for a Shoe, which records every card pile the shoe is shuffled into."""
+
+    def __init__(self, rng, history):
+        self.rng = rng
+        self.history = history
+
+    def shuffle(self, cards):
+        self.rng.shuffle(cards)
+        self.history.record_shoe(cards)
+
+
+class HandHistoryWriter:
+    """
+    Appends the hand histories of games to a file. Turns are buffered and written a chunk of `chunk_turns` turns at a
+    time. Attach to a game by passing to a GameController as `history`.
+    """
+
+    def __init__(self, path, chunk_turns=1024):
+        self.file = open(path, 'ab')
+        self.chunk_turns = chunk_turns
+        self._reset_turns()
+
+        # Card piles the current turn was dealt from, and the position in the first of them where the turn started
+        self.piles = []
+        self.start = 0
+
+    def _reset_turns(self):
+        """Clear the buffered turns."""
+        self.turns = []
+        self.cards = array('B')
+        self.actions = []
+        self.hands = []
+        self.turn_actions = 0  # Index of the first action of the current turn
+
+    def _write_chunk(self, kind, turns=0, cards=0, actions=0, hands=0, *payloads):
+        """Write a chunk header followed by its payloads."""
+        self.file.write(HEADER.pack(MAGIC, kind, turns, cards, actions, hands))
+        for payload in payloads:
+            self.file.write(payload)
+
+    def start_game(self, gambler, shoe, max_turns=None):
+        """Start recording a new game, played with a freshly shuffled shoe."""
+        if shoe.position != 0:
+            raise ValueError('A hand history must be started before any cards are dealt from the shoe')
+        self.flush()
+
+        game = np.array([(gambler.bankroll, gambler.auto_wager, shoe.num_decks, max_turns or 0)], dtype=GAME_DTYPE)
+        self._write_chunk(GAME, 1, 0, 0, 0, game.tobytes())
+
+        # Record the shoe's current pile, and every pile it is reshuffled into from now on.
+        self.piles = []
+        self.start = 0
+        self.record_shoe(shoe.card_pile)
+        shoe.rng = RecordingShuffler(shoe.rng, self)
+
+    def record_shoe(self, card_pile):
+        """Record a card pile the shoe was shuffled into."""
+        pile = bytes(card_pile)
+        self._write_chunk(SHOE, 0, len(pile), 0, 0, pile)
+        self.piles.append(pile)
+
+    def record_action(self, hand, action):
+        """Record an action taken on a hand during the current turn."""
+        self.actions.append((hand.hand_number, ACTION_CODES[action]))
+
+    def record_turn(self, turn, gambler, shoe):
+        """Record a finished turn: the cards dealt since the last turn, the gambler's hands and their bankroll."""
+        # The cards dealt this turn run from the start position in the first pile to the shoe's position in the last.
+        end = shoe.position
+        if len(self.piles) == 1:
+            cards = self.piles[0][self.start:end]
+        else:
+            cards = self.piles[0][self.start:] + b''.join(self.piles[1:-1]) + self.piles[-1][:end]
+        self.cards.frombytes(cards)
+        self.piles = self.piles[-1:]
+        self.start = end
+
+        self.turns.append((turn, gambler.bankroll, len(cards), len(self.actions) - self.turn_actions, len(gambler.hands)))
+        self.turn_actions = len(self.actions)
+        self.hands.extend(
+            (hand.wager, hand.insurance, hand.earnings, OUTCOME_CODES[hand.outcome], STATUS_CODES[hand.status],
+             hand.lost_insurance)
+            for hand in gambler.hands
+        )
+
+        if len(self.turns) >= self.chunk_turns:
+            self.flush()
+
+    def flush(self):
+        """Write any buffered turns as a TURNS chunk."""
+        if not self.turns:
+            return
+        turns = np.array(self.turns, dtype=TURN_DTYPE)
+        actions = np.array(self.actions, dtype=ACTION_DTYPE)
+        hands = np.array(self.hands, dtype=HAND_DTYPE)
+        self._write_chunk(
+            TURNS, len(turns), len(self.cards), len(actions), len(hands),
+            turns.tobytes(), self.cards.tobytes(), actions.tobytes(), hands.tobytes()
+        )
+        self._reset_turns()
+
+    def close(self):
+        """Write any buffered turns and close the file."""
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameHistory:
+    """The recorded history of a single game: its settings, shoes and turns (as views of the mapped file)."""
+
+    def __init__(self, game):
+        self.bankroll = float(game['bankroll'])
+        self.auto_wager = float(game['auto_wager'])
+        self.number_of_decks = int(game['number_of_decks'])
+        self.max_turns = int(game['max_turns']) or None
+
+        # Recorded card piles, and (turns, cards, actions, hands) record arrays of each TURNS chunk
+        self.shoes = []
+        self.chunks = []
+
+    def turns(self):
+        """Iterate over the recorded turns, as (turn record, cards dealt, actions, hands) tuples."""
+        for turns, cards, actions, hands in self.chunks:
+            card_offsets = np.concatenate(([0], np.cumsum(turns['cards'], dtype=np.int64)))
+            action_offsets = np.concatenate(([0], np.cumsum(turns['actions'], dtype=np.int64)))
+            hand_offsets = np.concatenate(([0], np.cumsum(turns['hands'], dtype=np.int64)))
+            for index, turn in enumerate(turns):
+                yield (
+                    turn,
+                    cards[card_offsets[index]:card_offsets[index + 1]],
+                    actions[action_offsets[index]:action_offsets[index + 1]],
+                    hands[hand_offsets[index]:hand_offsets[index + 1]]
+                )
+
+
+class HandHistory:
+    """A hand history file, memory-mapped for reading. Its recorded games are in `games`, in order."""
+
+    def __init__(self, path):
+        self.games = []
+        if not os.path.getsize(path):
+            return
+        self.buffer = np.memmap(path, dtype=np.uint8, mode='r')
+
+        offset = 0
+        while offset < len(self.buffer):
+            magic, kind, turns, cards, actions, hands = HEADER.unpack_from(self.buffer, offset)
+            if magic != MAGIC:
+                raise ValueError(f"Not a hand history chunk at offset {offset} of {path}")
+            offset += HEADER.size
+
+            if kind == GAME:
+                self.games.append(GameHistory(self._read(GAME_DTYPE, offset, turns)[0]))
+                offset += GAME_DTYPE.itemsize * turns
+            elif kind == SHOE:
+                self.games[-1].shoes.append(self.buffer[offset:offset + cards])
+                offset += cards
+            elif kind == TURNS:
+                chunk = []
+                for dtype, count in ((TURN_DTYPE, turns), (np.dtype(np.uint8), cards), (ACTION_DTYPE, actions), (HAND_DTYPE, hands)):
+                    chunk.append(self._read(dtype, offset, count))
+                    offset += dtype.itemsize * count
+                self.games[-1].chunks.append(tuple(chunk))
+            else:
+                raise ValueError(f"Unsupported hand history chunk kind: {kind}")
+
+    def _read(self, dtype, offset, count):
+        """View a number of records of a dtype at an offset of the mapped file."""
+        return np.frombuffer(self.buffer, dtype=dtype, count=count, offset=offset)
@@ -0,0 +1,80 @@
+"""
+Deterministic replays of recorded games.
+
+A replayed game is dealt the exact card piles its recorded shoe was shuffled into, instead of reshuffling: each time
+the shoe would shuffle, the next recorded pile is copied in. Replaying a game with the strategy it was recorded with
+reproduces it exactly, and replaying it with other strategies compares them on identical cards. A strategy that
+plays through more cards than were recorded gets fresh shuffles from then on, from a stream seeded by the game's
+recorded piles, so every strategy replaying a game gets the same extra shuffles and no cards are dealt twice.
+
+Games are replayed in lockstep by a BatchGameController when the strategy allows it (much faster than playing them
+one at a time), otherwise each game is replayed by a HeadlessGameController.
+"""
+
+import hashlib
+import random
+from array import array
+from itertools import groupby
+
+from blackjack.controllers.batch_game_controller import BatchGameController
+from blackjack.controllers.headless_game_controller import HeadlessGameController
+from blackjack.models.dealer import Dealer
+from blackjack.models.gambler import Gambler
+from blackjack.models.shoe import Shoe
+from blackjack.strategies.base_static_strategy import BaseStaticStrategy
+
+
+class ReplayShuffler:
+    """
+    Random generator stand-in for a Shoe, which "shuffles" the shoe into each of a game's recorded piles in turn, and
+    then shuffles it with a stream seeded by the recorded piles once they run out.
+    """
+
+    def __init__(self, shoes):
+        self.piles = [array('B', shoe.tobytes()) for shoe in shoes]
+        self.index = 0
+        self.rng = None
+
+    def shuffle(self, cards):
+        if self.index < len(self.piles):
+            cards[:] = self.piles[self.index]
+            self.index += 1
+            return
+        if self.rng is None:
+            digest = hashlib.sha256(b''.join(pile.tobytes() for pile in self.piles)).digest()
+            self.rng = random.Random(int.from_bytes(digest[:8], 'little'))
+        self.rng.shuffle(cards)
+
+
+def replay_game(game_history, strategy, max_turns=None):
+    """Replay a recorded game with a strategy and return its (played) HeadlessGameController."""
+    gambler = Gambler('Gambler', bankroll=game_history.bankroll, auto_wager=game_history.auto_wager)
+    shoe = Shoe(game_history.number_of_decks, rng=ReplayShuffler(game_history.shoes))
+    game = HeadlessGameController(gambler, Dealer(), shoe, strategy, max_turns=max_turns or game_history.max_turns)
+    game.play()
+    return game
+
+
+def can_replay_in_lockstep(strategy):
+    """Check whether games can be replayed with a strategy by the batch engine (see BatchGameController)."""
+    return isinstance(strategy, BaseStaticStrategy) and not strategy.wants_to_change_wager()
+
+
+def replay_games(game_histories, strategy, max_turns=None):
+    """Replay recorded games with a strategy and return each game's MetricTracker, in order."""
+    if not can_replay_in_lockstep(strategy):
+        return [replay_game(game_history, strategy, max_turns).metric_tracker for game_history in game_histories]
+
+    # Games with the same settings are replayed together, in runs of consecutive games.
+    def settings(game_history):
+        return game_history.bankroll, game_history.auto_wager, game_history.number_of_decks, game_history.max_turns
+
+    metric_trackers = []
+    for (bankroll, auto_wager, number_of_decks, game_max_turns), run in groupby(game_histories, key=settings):
+        rngs = [ReplayShuffler(game_history.shoes) for game_history in run]
+        game = BatchGameController(
+            'Gambler', bankroll, auto_wager, number_of_decks, strategy, rngs, max_turns=max_turns or game_max_turns
+        )
+        game.play()
+        metric_trackers.extend(game.metric_trackers())
+    return metric_trackers
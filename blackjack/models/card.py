@@ -1,41 +1,72 @@
-class Card:
-
-    SUITS = ['Spades', 'Hearts', 'Clubs', 'Diamonds']
-    RANKS = [
-        ('Ace', [1, 11]),
-        ('2', 2),
-        ('3', 3),
-        ('4', 4),
-        ('5', 5),
-        ('6', 6),
-        ('7', 7),
-        ('8', 8),
-        ('9', 9),
-        ('10', 10),
-        ('Jack', 10),
-        ('Queen', 10),
-        ('King', 10)
-    ]
-
-    def __init__(self, suit, name, value):
-        self.suit = suit
-        self.name = name
-        self.value = value
-
-    def __str__(self):
-        return f"{self.name} of {self.suit}"
-
-    def __repr__(self):
-        return self.__str__()
-
-    def is_ace(self):
-        """Check whether the card is an ace."""
-        return self.name == 'Ace'
-
-    def is_facecard(self):
-        """Check whether the card is a facecard."""
-        return self.value == 10
-
-    def csv_format(self):
-        """String representation of the card for Strategy CSVs."""
-        return 'A' if self.is_ace() else str(self.value)
+"""
+Cards are encoded as small integers so that a Shoe can hold them in a compact array buffer.
+
+A card's code is `suit_index * 13 + rank_index`, where rank index 0 is the Ace and 12 is the King. The suit is
+only kept for display; gameplay works on the rank and value lookup tables below, which are indexed by card code.
+"""
+
+SUITS = ['Spades', 'Hearts', 'Clubs', 'Diamonds']
+RANKS = [
+    ('Ace', [1, 11]),
+    ('2', 2),
+    ('3', 3),
+    ('4', 4),
+    ('5', 5),
+    ('6', 6),
+    ('7', 7),
+    ('8', 8),
+    ('9', 9),
+    ('10', 10),
+    ('Jack', 10),
+    ('Queen', 10),
+    ('King', 10)
+]
+
+ACE = 0
+NUM_RANKS = len(RANKS)
+NUM_CARDS = len(SUITS) * NUM_RANKS
+
+# Lookup tables indexed by card code
+RANK = tuple(code % NUM_RANKS for code in range(NUM_CARDS))
+HARD_VALUE = tuple(1 if rank == ACE else RANKS[rank][1] for rank in RANK)  # Aces count as 1
+CSV_FORMAT = tuple('A' if rank == ACE else str(RANKS[rank][1]) for rank in RANK)
+
+# Card of the same suit with its rank mirrored among the 2s to 9s (2 <-> 9, 3 <-> 8, 4 <-> 7, 5 <-> 6). Mirroring every
+# card of a shoe keeps its composition, so a mirrored shuffle is as likely as the original (see AntitheticShuffler).
+MIRROR = tuple(code - rank + (9 - rank if 1 <= rank <= 8 else rank) for code, rank in enumerate(RANK))
+
+
+def encode(suit, name):
+    """Get the code for a card from its suit and rank name (e.g. 'Hearts', 'Queen')."""
+    rank = next(index for index, (rank_name, _) in enumerate(RANKS) if rank_name == name)
+    return SUITS.index(suit) * NUM_RANKS + rank
+
+
+def card_name(card):
+    """Get the rank name of a card (e.g. 'Ace', '7', 'King')."""
+    return RANKS[RANK[card]][0]
+
+
+def card_suit(card):
+    """Get the suit of a card."""
+    return SUITS[card // NUM_RANKS]
+
+
+def card_str(card):
+    """Human readable representation of a card (e.g. 'Ace of Spades')."""
+    return f"{card_name(card)} of {card_suit(card)}"
+
+
+def is_ace(card):
+    """Check whether the card is an ace."""
+    return RANK[card] == ACE
+
+
+def is_facecard(card):
+    """Check whether the card is a facecard."""
+    return HARD_VALUE[card] == 10
+
+
+def csv_format(card):
+    """String representation of the card for Strategy CSVs."""
+    return CSV_FORMAT[card]
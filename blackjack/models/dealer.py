@@ -1,3 +1,6 @@
+from blackjack.models.card import is_ace, is_facecard
+
+
 class Dealer:
 
     def __init__(self, hand=None):
@@ -10,11 +13,11 @@ class Dealer:
 
     def is_showing_ace(self):
         """Check whether the dealer is showing an ace."""
-        return self.up_card().is_ace()
+        return is_ace(self.up_card())
 
     def is_showing_face_card(self):
         """Check whether the dealer is showing a face card."""
-        return self.up_card().is_facecard()
+        return is_facecard(self.up_card())
 
     def discard_hand(self):
         """Reset the dealer's hand."""
@@ -1,4 +1,6 @@
-from blackjack.models.card import Card
+from array import array
+
+from blackjack.models.card import NUM_CARDS
 
 
 class Deck:
@@ -8,9 +10,5 @@ class Deck:
 
     @staticmethod
     def _build_deck():
-        """Create a full deck of all 52 cards."""
-        cards = []
-        for suit in Card.SUITS:
-            for name, value in Card.RANKS:
-                cards.append(Card(suit, name, value))
-        return cards
+        """Create a full deck of all 52 encoded cards."""
+        return array('B', range(NUM_CARDS))
@@ -1,50 +1,55 @@
 from blackjack.display_utils import money_format
+from blackjack.models.card import ACE, HARD_VALUE, RANK, card_str, is_ace
 
 
 class Hand:
 
+    __slots__ = ('cards', 'status', 'hard_total', 'num_aces')
+
     def __init__(self, cards=None, status='Pending'):
         self.cards = cards or []  # Card order matters for consistent display
         self.status = status
 
+        # Running totals, kept up to date by `add_card` and `pop_card` so that total queries don't re-scan the cards.
+        self.hard_total = sum(HARD_VALUE[card] for card in self.cards)  # Every Ace counted as 1
+        self.num_aces = sum(1 for card in self.cards if is_ace(card))
+
         if self.is_blackjack():
             self.status = 'Blackjack'
 
     def __str__(self):
-        return ' | '.join(str(card) for card in self.cards)
+        return ' | '.join(card_str(card) for card in self.cards)
 
     def __repr__(self):
         return self.__str__()
 
+    def add_card(self, card):
+        """Add a card to the end of the hand."""
+        self.cards.append(card)
+        self.hard_total += HARD_VALUE[card]
+        if RANK[card] == ACE:
+            self.num_aces += 1
+
+    def pop_card(self, index=-1):
+        """Remove a card from the hand (e.g. when splitting) and return it."""
+        card = self.cards.pop(index)
+        self.hard_total -= HARD_VALUE[card]
+        if RANK[card] == ACE:
+            self.num_aces -= 1
+        return card
+
     def possible_totals(self):
         """Sum the cards in the hand. Return 2 totals, due to the dual value of Aces."""
-        # Get the number of aces in the hand
-        num_aces = self.get_num_aces_in_hand()
-
-        # Get the total for all non-ace cards first, as this is constant
-        non_ace_total = sum(card.value for card in self.cards if card.name != 'Ace')
-
-        # If there are no aces in the hand, there is only one possible total. Return it.
-        if num_aces == 0:
-            return non_ace_total, None
-
-        # If there are aces in the hand, extra logic is needed:
-        # - Each ace can have 2 possible values (1 or 11). 
-        # - However, only one ace *per hand* can logically be 11 in order to *possibly* stay under a total of 22.
-        # - Thus, there will always be 2 *possibly non-busting* hand totals if there is at least one ace in the hand.
-        high_total = non_ace_total + 11 + num_aces - 1
-        low_total = non_ace_total + num_aces
-
-        # If the high_total is already busting, only return the low_total (to be vetted for busting later)
-        if high_total > 21:
-            return low_total, None
-        # Otherwise, return both totals
-        else:
-            return low_total, high_total
+        # Only one ace *per hand* can logically be 11 in order to *possibly* stay under a total of 22. Thus, there are
+        # 2 possible totals if there is at least one ace in the hand and counting one of them as 11 doesn't bust.
+        low_total = self.hard_total
+        if self.num_aces and low_total <= 11:
+            return low_total, low_total + 10
+        return low_total, None
 
     def get_num_aces_in_hand(self):
         """Get the number of Aces in the hand."""
-        return sum(1 for card in self.cards if card.is_ace())
+        return self.num_aces
 
     def format_possible_totals(self):
         """Get human readable string representing the hand total(s) to display."""
@@ -61,8 +66,9 @@ class Hand:
 
     def final_total(self):
         """Get the singular hand total for determining the outcome (high total if it exists, otherwise low total)."""
-        low_total, high_total = self.possible_totals()
-        return high_total or low_total
+        if self.num_aces and self.hard_total <= 11:
+            return self.hard_total + 10
+        return self.hard_total
 
     def get_total_to_display(self):
         """Get the hand total to display contingent on hand status."""
@@ -82,16 +88,17 @@ class Hand:
 
     def is_busted(self):
         """Check whether the hand is busted."""
-        return self.final_total() > 21
+        return self.hard_total > 21
 
     def is_soft(self):
         """Check whether a hand is 'soft', meaning has an Ace counted as 11."""
-        _, high_total = self.possible_totals()
-        return bool(high_total)
+        return self.num_aces > 0 and self.hard_total <= 11
 
 
 class GamblerHand(Hand):
 
+    __slots__ = ('wager', 'insurance', 'hand_number', 'outcome', 'earnings', 'lost_insurance')
+
     def __init__(self, cards=None, status='Pending', wager=0, insurance=0, hand_number=1):
         super().__init__(cards, status)
         # Attributes
@@ -130,7 +137,7 @@ class GamblerHand(Hand):
         1) Hand is made up of two cards.
         2) The name of the two cards matches (e.g. King-King, Five-Five, etc.)
         """
-        return len(self.cards) == 2 and self.cards[0].name == self.cards[1].name
+        return len(self.cards) == 2 and RANK[self.cards[0]] == RANK[self.cards[1]]
 
     def is_doubleable(self):
         """
@@ -143,6 +150,8 @@ class GamblerHand(Hand):
 
 class DealerHand(Hand):
 
+    __slots__ = ()
+
     def up_card(self):
         return self.cards[0]
 
@@ -150,8 +159,8 @@ class DealerHand(Hand):
         """Get a string representation of the hand formatted to be printed."""
         if hide:
             up_card = self.up_card()
-            cards = f"Upcard: {up_card}"
-            total = f"Total: {up_card.value if up_card.name != 'Ace' else '1 or 11'}"
+            cards = f"Upcard: {card_str(up_card)}"
+            total = f"Total: {HARD_VALUE[up_card] if not is_ace(up_card) else '1 or 11'}"
             status = 'Status: Pending'
         else:
             cards = f"Cards: {self}"
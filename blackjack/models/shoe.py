@@ -1,44 +1,118 @@
 import random
+from array import array
 
+import numpy as np
+
+from blackjack.models.card import MIRROR
 from blackjack.models.deck import Deck
 
 
+# Byte translation table of MIRROR, for mirroring a whole card pile at once
+MIRROR_TABLE = bytes(MIRROR) + bytes(range(len(MIRROR), 256))
+
+
 class Shoe:
 
-    def __init__(self, num_decks):
-        # Create the decks of cards.
-        self.decks = [Deck() for _ in range(num_decks)]
+    def __init__(self, num_decks, rng=None):
+        self.num_decks = num_decks
+
+        # Random number generator used for shuffling (e.g. a seeded `random.Random`). Defaults to an unseeded one.
+        self.rng = rng or random.Random()
+
+        # Preallocated buffer of encoded cards, in the order in which they'll be dealt. Reshuffling permutes it in place.
+        self.card_pile = Deck().cards * num_decks
 
-        # List to hold the cards to be dealt, in the order in which they'll be dealt.
-        self.card_pile = []
+        # Index of the next card to be dealt from the card pile.
+        self.position = 0
 
         # Initialize with a shuffled card pile so the shoe is ready to be played.
         self.reset_card_pile()
 
-    def cards(self):
-        """Get all cards belonging to the shoe (through decks)."""
-        cards = []
-        for deck in self.decks:
-            for card in deck.cards:
-                cards.append(card)
-        return cards
-
-    def shuffled_cards(self):
-        """Shuffle the shoe's cards."""
-        cards = self.cards()
-        random.shuffle(cards)
-        return cards
+    def cards_remaining(self):
+        """Get the number of cards left to deal before the next reshuffle."""
+        return len(self.card_pile) - self.position
 
     def reset_card_pile(self):
-        """Reset the shoe's card pile."""
-        self.card_pile = self.shuffled_cards()
+        """Reshuffle all of the shoe's cards and start dealing from the top again."""
+        self.rng.shuffle(self.card_pile)
+        self.position = 0
 
     def deal_card(self):
         """Deal a card from the shoe (reshuffle if pile exhausted)."""
-        if not self.card_pile:
+        if self.position == len(self.card_pile):
             self.reset_card_pile()
-        return self.card_pile.pop()
+        card = self.card_pile[self.position]
+        self.position += 1
+        return card
 
     def deal_n_cards(self, num_cards):
         """Deal a set number of cards from the shoe."""
-        return [self.deal_card() for _ in range(num_cards)]
+        # Reshuffling may be needed partway through, in which case deal one card at a time.
+        if self.position + num_cards > len(self.card_pile):
+            return [self.deal_card() for _ in range(num_cards)]
+        start = self.position
+        self.position += num_cards
+        return self.card_pile[start:self.position].tolist()
+
+
+class SharedShuffle:
+    """
+    The sequence of card piles a shoe would be shuffled into by a random generator (a `random.Random` or a NumPy
+    Generator), shuffled once and shared by several shoes so that they are all shuffled into the same piles. Each shoe
+    is given its own `shuffler()` in place of a random generator, and deals the piles at its own pace, so shoes whose
+    players take different cards are dealt different hands from then on.
+    """
+
+    def __init__(self, num_decks, rng):
+        self.rng = rng
+        self.piles = []
+        self.card_pile = Deck().cards * num_decks
+
+    def pile(self, index):
+        """Get a pile of the sequence, shuffling any piles up to it that haven't been yet."""
+        while len(self.piles) <= index:
+            # Each pile is a reshuffle of the previous one, as a Shoe reshuffles its card pile in place.
+            self.card_pile = array('B', self.card_pile)
+            if isinstance(self.rng, np.random.Generator):
+                self.rng.shuffle(np.frombuffer(self.card_pile, dtype=np.uint8))
+            else:
+                self.rng.shuffle(self.card_pile)
+            self.piles.append(self.card_pile)
+        return self.piles[index]
+
+    def shuffler(self):
+        """Get a random generator stand-in for a shoe, which "shuffles" it into each pile of the sequence in turn."""
+        return SharedShuffler(self)
+
+
+class SharedShuffler:
+    """A shoe's view of a SharedShuffle (see SharedShuffle.shuffler)."""
+
+    def __init__(self, shared_shuffle):
+        self.shared_shuffle = shared_shuffle
+        self.index = 0
+
+    def shuffle(self, cards):
+        cards[:] = self.shared_shuffle.pile(self.index)
+        self.index += 1
+
+
+class AntitheticShuffler:
+    """
+    Random generator wrapper for a shoe, which deals the antithetic (mirrored, see card.MIRROR) counterpart of the
+    shoe another shoe deals when shuffled by the same random stream. The mirrored card pile is shuffled with the same
+    permutations, so every pile dealt is the mirror image of the other shoe's.
+    """
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.mirrored = False
+
+    def shuffle(self, cards):
+        if not self.mirrored:
+            cards[:] = array('B', bytes(cards).translate(MIRROR_TABLE))
+            self.mirrored = True
+        if isinstance(self.rng, np.random.Generator):
+            self.rng.shuffle(np.frombuffer(cards, dtype=np.uint8))
+        else:
+            self.rng.shuffle(cards)
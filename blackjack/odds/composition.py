@@ -0,0 +1,37 @@
+"""
+Shoe compositions for exact probability calculations.
+
+A composition is a tuple of the number of cards left of each value, indexed by `hard value - 1`
+(index 0 for Aces, 1 for twos, ... 9 for all ten-valued cards), so it can be used as a memoization key.
+"""
+
+from blackjack.models.card import HARD_VALUE, NUM_CARDS
+
+
+ACE_INDEX = 0
+TEN_INDEX = 9
+NUM_VALUES = 10
+
+# Column labels of each value index, as used in strategy CSVs
+VALUE_LABELS = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10')
+
+
+def shoe_composition(number_of_decks):
+    """Get the composition of a full shoe of a number of decks."""
+    counts = [0] * NUM_VALUES
+    for card in range(NUM_CARDS):
+        counts[HARD_VALUE[card] - 1] += number_of_decks
+    return tuple(counts)
+
+
+def remove_card(composition, value_index):
+    """Get the composition left after removing a card of a value index."""
+    counts = list(composition)
+    counts[value_index] -= 1
+    return tuple(counts)
+
+
+def value_index(card):
+    """Get the value index of an encoded card."""
+    return HARD_VALUE[card] - 1
+
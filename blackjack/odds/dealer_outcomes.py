@@ -0,0 +1,147 @@
+"""
+Exact dealer outcome probabilities.
+
+Computes the distribution of the dealer's final total for each upcard from a shoe composition, under the same rules
+as `GameController.play_dealer_turn`: the dealer hits below 17 and must hit a soft 17 (standing on soft 17 can be
+chosen instead, for other rule sets). The calculation is a memoized recursion over (remaining composition, dealer
+hand), with a bounded LRU cache, and full-shoe tables are persisted to disk per number of decks (and rule) so
+repeated runs load them instantly.
+
+    $ python -m blackjack.odds.dealer_outcomes -d 6
+"""
+
+import json
+import os
+from argparse import ArgumentParser
+from functools import lru_cache
+
+from blackjack.cache_utils import cache_path
+from blackjack.odds.composition import ACE_INDEX, NUM_VALUES, TEN_INDEX, VALUE_LABELS, remove_card, shoe_composition
+
+
+# Final dealer outcomes, in the order of the probabilities returned below
+OUTCOMES = ('17', '18', '19', '20', '21', 'Bust', 'Blackjack')
+BUST = OUTCOMES.index('Bust')
+BLACKJACK = OUTCOMES.index('Blackjack')
+
+# Maximum number of (composition, hand) states kept in the memoization cache
+CACHE_SIZE = 2 ** 18
+
+# Bump when the calculation changes, so that stale tables on disk are not loaded
+TABLE_VERSION = 1
+
+
+def _outcome(total):
+    """Get the probability vector of a single, certain final total (or bust)."""
+    probabilities = [0.0] * len(OUTCOMES)
+    probabilities[BUST if total > 21 else total - 17] = 1.0
+    return tuple(probabilities)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _final_total_probabilities(composition, hard_total, has_ace, hit_soft_17=True):
+    """
+    Probabilities of each final outcome for a dealer hand (as its hard total and whether it holds an Ace) that has
+    already been dealt its hole card, drawing from the remaining composition.
+    """
+    total = hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+    is_soft = total != hard_total
+
+    # Dealer stands at 17 and above (except soft 17, if hitting it), and is done if busted.
+    if total > 17 or (total == 17 and not (is_soft and hit_soft_17)):
+        return _outcome(total)
+
+    # Otherwise the dealer hits: weight the outcomes of each card that could be drawn by its probability.
+    remaining = sum(composition)
+    probabilities = [0.0] * len(OUTCOMES)
+    for index in range(NUM_VALUES):
+        count = composition[index]
+        if not count:
+            continue
+        drawn = _final_total_probabilities(
+            remove_card(composition, index), hard_total + index + 1, has_ace or index == ACE_INDEX, hit_soft_17
+        )
+        weight = count / remaining
+        for outcome, probability in enumerate(drawn):
+            probabilities[outcome] += weight * probability
+    return tuple(probabilities)
+
+
+def dealer_probabilities(composition, upcard_index, peeked=False, hit_soft_17=True):
+    """
+    Get the probability of each final dealer outcome (see OUTCOMES) given the dealer's upcard value index and the
+    composition of the shoe the hole card and any hits are drawn from (i.e. with the upcard already removed).
+
+    With `peeked`, the probabilities are conditioned on the dealer not having blackjack, as is the case whenever the
+    gambler's turn is played against an Ace or ten-valued upcard (the dealer checks for blackjack first).
+    """
+    remaining = sum(composition)
+    probabilities = [0.0] * len(OUTCOMES)
+    for index in range(NUM_VALUES):
+        count = composition[index]
+        if not count:
+            continue
+        weight = count / remaining
+        if {upcard_index, index} == {ACE_INDEX, TEN_INDEX}:
+            probabilities[BLACKJACK] += weight
+            continue
+        drawn = _final_total_probabilities(
+            remove_card(composition, index), upcard_index + index + 2, ACE_INDEX in (upcard_index, index), hit_soft_17
+        )
+        for outcome, probability in enumerate(drawn):
+            probabilities[outcome] += weight * probability
+
+    if peeked and probabilities[BLACKJACK]:
+        no_blackjack = 1.0 - probabilities[BLACKJACK]
+        probabilities = [probability / no_blackjack for probability in probabilities]
+        probabilities[BLACKJACK] = 0.0
+    return tuple(probabilities)
+
+
+def compute_dealer_table(number_of_decks, hit_soft_17=True):
+    """Compute the dealer outcome probabilities of each upcard, dealt from a full shoe of a number of decks."""
+    shoe = shoe_composition(number_of_decks)
+    return {
+        VALUE_LABELS[upcard_index]: dict(zip(
+            OUTCOMES, dealer_probabilities(remove_card(shoe, upcard_index), upcard_index, hit_soft_17=hit_soft_17)
+        ))
+        for upcard_index in range(NUM_VALUES)
+    }
+
+
+def dealer_table(number_of_decks, hit_soft_17=True, use_cache=True):
+    """
+    Get a table of {upcard label: {outcome: probability}} for a full shoe of a number of decks.
+    Tables are computed once per number of decks (and soft 17 rule) and then loaded from the on-disk cache.
+    """
+    rule = 'h17' if hit_soft_17 else 's17'
+    path = cache_path('dealer_outcomes', f"v{TABLE_VERSION}_{number_of_decks}_decks_{rule}.json")
+    if use_cache and os.path.exists(path):
+        with open(path) as table_file:
+            return json.load(table_file)
+
+    table = compute_dealer_table(number_of_decks, hit_soft_17)
+    if use_cache:
+        # Write to a temporary file first so that concurrent runs never read a partially written table.
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w') as table_file:
+            json.dump(table, table_file, indent=2)
+        os.replace(temporary_path, path)
+    return table
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser()
+    parser.add_argument('-d', '--decks', help='Number of decks in the shoe', type=int, default=3)
+    parser.add_argument('--stand-soft-17', help='Dealer stands on soft 17 (instead of hitting, as in the game)', action='store_true')
+    parser.add_argument('--no-cache', help='Compute the table instead of loading it from the cache', action='store_true')
+    args = parser.parse_args()
+
+    table = dealer_table(args.decks, hit_soft_17=not args.stand_soft_17, use_cache=not args.no_cache)
+
+    rule = 'stands on' if args.stand_soft_17 else 'hits'
+    print(f"Dealer outcome probabilities ({args.decks} decks, dealer {rule} soft 17)\n")
+    print('Upcard ' + ''.join(f"{outcome:>11}" for outcome in OUTCOMES))
+    for upcard, probabilities in table.items():
+        print(f"{upcard:<7}" + ''.join(f"{probabilities[outcome]:>11.4%}" for outcome in OUTCOMES))
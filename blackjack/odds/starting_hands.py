@@ -0,0 +1,51 @@
+"""
+Exact probabilities of the starting cards of a hand dealt from a full shoe.
+
+A hand starts with the gambler's two cards and the dealer's upcard. These are grouped into strata: the unordered pair
+of the gambler's card values and the upcard's value, indexed by `pair_index * NUM_VALUES + upcard value index` (see
+PAIR_INDEX, and composition for value indices).
+
+The probabilities of a full shoe are also those of a hand dealt at any point of a shoe, averaged over its shuffles
+(the share of each value in the cards left is a martingale as cards are dealt), so they are the exact expectations
+of the starting cards of every hand of a simulation.
+"""
+
+import numpy as np
+
+from blackjack.odds.composition import ACE_INDEX, NUM_VALUES, TEN_INDEX, shoe_composition
+
+
+# Index of each unordered pair of value indices (symmetric), numbering the pairs in order
+PAIR_INDEX = np.zeros((NUM_VALUES, NUM_VALUES), dtype=np.int64)
+for _index, (_low, _high) in enumerate((low, high) for low in range(NUM_VALUES) for high in range(low, NUM_VALUES)):
+    PAIR_INDEX[_low, _high] = PAIR_INDEX[_high, _low] = _index
+NUM_PAIRS = NUM_VALUES * (NUM_VALUES + 1) // 2
+NUM_STRATA = NUM_PAIRS * NUM_VALUES
+
+
+def stratum_probabilities(number_of_decks):
+    """Get the probability of each stratum of starting cards (gambler's pair of values and upcard), from a full shoe."""
+    counts = shoe_composition(number_of_decks)
+    cards = sum(counts)
+    probabilities = np.zeros(NUM_STRATA, dtype=np.float64)
+    for first in range(NUM_VALUES):
+        for second in range(NUM_VALUES):
+            for up_card in range(NUM_VALUES):
+                # Cards of each value are dealt without replacement: gambler's first card, then upcard, then second.
+                ways = counts[first] * (counts[up_card] - (up_card == first)) * \
+                    (counts[second] - (second == first) - (second == up_card))
+                probabilities[PAIR_INDEX[first, second] * NUM_VALUES + up_card] += ways
+    return probabilities / (cards * (cards - 1) * (cards - 2))
+
+
+def blackjack_probability(number_of_decks):
+    """Get the probability of being dealt a blackjack (an Ace and a ten-valued card) from a full shoe."""
+    counts = shoe_composition(number_of_decks)
+    cards = sum(counts)
+    return 2 * counts[ACE_INDEX] * counts[TEN_INDEX] / (cards * (cards - 1))
+
+
+def upcard_probability(number_of_decks, value_index):
+    """Get the probability of the dealer's upcard being of a value index, from a full shoe."""
+    counts = shoe_composition(number_of_decks)
+    return counts[value_index] / sum(counts)
@@ -0,0 +1,203 @@
+"""
+EV-maximizing static strategy tables.
+
+Computes the expected value (in units of the initial wager) of standing, hitting, doubling and splitting every hand
+total against every dealer upcard, by a memoized recursion over hand states, and writes the best action of each as
+`hard.csv`, `soft.csv` and `split.csv` tables in the format `BaseStaticStrategy` loads. Rules follow `GameController`
+unless chosen otherwise: the dealer peeks for blackjack and hits soft 17, blackjack pays 3:2, any two cards may be
+doubled (including after a split), split Aces get one card, and a two-card 21 after a split counts as blackjack.
+
+The dealer's outcomes are exact for the shoe less the upcard (see `dealer_outcomes`). The gambler's draws are taken
+from that same composition, i.e. the removal of the gambler's own cards is ignored, which is what makes the tables
+depend on the hand total alone (as the CSVs do). Resplits are not modelled: split hands are played without
+splitting again. Tables are cached on disk per configuration.
+
+    $ python -m blackjack.odds.strategy_generator -d 6
+"""
+
+import csv
+import os
+from argparse import ArgumentParser
+from functools import lru_cache
+
+from blackjack.cache_utils import cache_path
+from blackjack.odds.composition import ACE_INDEX, TEN_INDEX, VALUE_LABELS, remove_card, shoe_composition
+from blackjack.odds.dealer_outcomes import BUST, dealer_probabilities
+
+
+# Columns of the generated tables (dealer upcards), in the order of the hand-written CSVs
+COLUMNS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'A')
+
+# Rows of the generated tables, in the order of the hand-written CSVs
+HARD_TOTALS = range(21, 3, -1)
+SOFT_TOTALS = range(21, 11, -1)
+PAIRS = ('A', '10', '9', '8', '7', '6', '5', '4', '3', '2')
+
+# Actions in order of preference when their expected values tie
+ACTIONS = ('Stand', 'Hit', 'Double')
+
+# Bump when the calculation changes, so that stale tables on disk are not loaded
+TABLE_VERSION = 1
+
+
+def _total(hard_total, has_ace):
+    """Get the best total of a hand from its hard total and whether it holds an Ace."""
+    return hard_total + 10 if has_ace and hard_total <= 11 else hard_total
+
+
+class UpcardEV:
+    """Expected values of the gambler's actions against a single dealer upcard."""
+
+    def __init__(self, composition, upcard_index, hit_soft_17=True, blackjack_payout=1.5, double_after_split=True):
+        self.blackjack_payout = blackjack_payout
+        self.double_after_split = double_after_split
+
+        # The gambler's turn is only played once the dealer has checked for blackjack.
+        self.dealer = dealer_probabilities(composition, upcard_index, peeked=True, hit_soft_17=hit_soft_17)
+
+        # Probability of drawing each card value
+        remaining = sum(composition)
+        self.draws = tuple((index, count / remaining) for index, count in enumerate(composition) if count)
+
+        # Memoize the recursion per instance (states are only (hard total, has Ace)).
+        self.stand = lru_cache(maxsize=None)(self.stand)
+        self.play = lru_cache(maxsize=None)(self.play)
+
+    def stand(self, total):
+        """EV of standing on a (best) total."""
+        if total > 21:
+            return -1.0
+        ev = self.dealer[BUST]
+        for outcome, probability in enumerate(self.dealer[:BUST]):
+            dealer_total = outcome + 17
+            if dealer_total < total:
+                ev += probability
+            elif dealer_total > total:
+                ev -= probability
+        return ev
+
+    def hit(self, hard_total, has_ace):
+        """EV of hitting a hand, then playing it on with the best of hitting and standing."""
+        return sum(
+            probability * self.play(hard_total + index + 1, has_ace or index == ACE_INDEX)
+            for index, probability in self.draws
+        )
+
+    def play(self, hard_total, has_ace):
+        """EV of a hand that can no longer be doubled or split, played with the best of hitting and standing."""
+        if hard_total > 21:
+            return -1.0
+        total = _total(hard_total, has_ace)
+        if total == 21:
+            return self.stand(total)
+        return max(self.stand(total), self.hit(hard_total, has_ace))
+
+    def double(self, hard_total, has_ace):
+        """EV of doubling a hand (twice the wager, exactly one more card)."""
+        return 2 * sum(
+            probability * self.stand(_total(hard_total + index + 1, has_ace or index == ACE_INDEX))
+            for index, probability in self.draws
+        )
+
+    def actions(self, hard_total, has_ace, can_double=True):
+        """EV of each action (see ACTIONS) on a two-card hand."""
+        total = _total(hard_total, has_ace)
+        evs = {'Stand': self.stand(total), 'Hit': self.hit(hard_total, has_ace)}
+        if can_double:
+            evs['Double'] = self.double(hard_total, has_ace)
+        return evs
+
+    def best_action(self, hard_total, has_ace):
+        """Get the action with the highest EV on a two-card hand, and that EV."""
+        evs = self.actions(hard_total, has_ace)
+        action = max(ACTIONS, key=lambda action: evs[action])
+        return action, evs[action]
+
+    def split(self, pair_index):
+        """EV of splitting a pair of a value index (two hands, each dealt one more card)."""
+        ev = 0.0
+        for index, probability in self.draws:
+            hard_total = pair_index + index + 2
+            has_ace = ACE_INDEX in (pair_index, index)
+            if {pair_index, index} == {ACE_INDEX, TEN_INDEX}:
+                hand_ev = self.blackjack_payout  # Two-card 21s win as blackjacks, the dealer has already peeked.
+            elif pair_index == ACE_INDEX:
+                hand_ev = self.stand(_total(hard_total, has_ace))  # Split Aces only get one card.
+            else:
+                hand_ev = max(self.actions(hard_total, has_ace, self.double_after_split).values())
+            ev += probability * hand_ev
+        return 2 * ev
+
+
+def generate_strategy(number_of_decks, hit_soft_17=True, blackjack_payout=1.5, double_after_split=True):
+    """
+    Compute the EV-maximizing strategy tables for a full shoe of a number of decks.
+    Returns {'hard': rows, 'soft': rows, 'split': rows}, where rows map a row label to the action of each column.
+    """
+    shoe = shoe_composition(number_of_decks)
+    evs = {
+        label: UpcardEV(remove_card(shoe, index), index, hit_soft_17, blackjack_payout, double_after_split)
+        for index, label in enumerate(VALUE_LABELS)
+    }
+
+    tables = {'hard': {}, 'soft': {}, 'split': {}}
+    for total in HARD_TOTALS:
+        tables['hard'][str(total)] = [evs[column].best_action(total, False)[0] for column in COLUMNS]
+    for total in SOFT_TOTALS:
+        tables['soft'][str(total)] = [evs[column].best_action(total - 10, True)[0] for column in COLUMNS]
+    for pair in PAIRS:
+        pair_index = VALUE_LABELS.index(pair)
+        row = []
+        for column in COLUMNS:
+            upcard_ev = evs[column]
+            keep_ev = upcard_ev.best_action(2 * (pair_index + 1), pair_index == ACE_INDEX)[1]
+            row.append('Yes' if upcard_ev.split(pair_index) > keep_ev else 'No')
+        tables['split'][pair] = row
+    return tables
+
+
+def write_strategy(tables, directory):
+    """Write strategy tables as the CSVs loaded by `BaseStaticStrategy`."""
+    os.makedirs(directory, exist_ok=True)
+    for csv_type, rows in tables.items():
+        # Write to a temporary file first so that concurrent runs never read a partially written table.
+        path = os.path.join(directory, f"{csv_type}.csv")
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['', *COLUMNS])
+            for label, actions in rows.items():
+                writer.writerow([label, *actions])
+        os.replace(temporary_path, path)
+
+
+def strategy_directory(number_of_decks, hit_soft_17=True, blackjack_payout=1.5, double_after_split=True):
+    """
+    Get the directory of the EV-maximizing strategy CSVs for a configuration, generating them on first use.
+    Generated tables are cached on disk per number of decks and rule set.
+    """
+    rules = f"{'h17' if hit_soft_17 else 's17'}_bj{blackjack_payout:g}_{'das' if double_after_split else 'ndas'}"
+    directory = cache_path('strategies', f"v{TABLE_VERSION}_{number_of_decks}_decks_{rules}", '')
+    if not all(os.path.exists(os.path.join(directory, f"{csv_type}.csv")) for csv_type in ('hard', 'soft', 'split')):
+        write_strategy(generate_strategy(number_of_decks, hit_soft_17, blackjack_payout, double_after_split), directory)
+    return directory
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser()
+    parser.add_argument('-d', '--decks', help='Number of decks in the shoe', type=int, default=3)
+    parser.add_argument('--stand-soft-17', help='Dealer stands on soft 17 (instead of hitting, as in the game)', action='store_true')
+    parser.add_argument('--blackjack-payout', help='Blackjack payout per unit wagered', type=float, default=1.5)
+    parser.add_argument('--no-double-after-split', help='Disallow doubling split hands', action='store_true')
+    parser.add_argument('-o', '--output', help='Directory to write the CSVs to (default: the strategy cache)')
+    args = parser.parse_args()
+
+    rules = (not args.stand_soft_17, args.blackjack_payout, not args.no_double_after_split)
+    if args.output:
+        write_strategy(generate_strategy(args.decks, *rules), args.output)
+        directory = args.output
+    else:
+        directory = strategy_directory(args.decks, *rules)
+
+    print(f"Strategy tables for {args.decks} decks written to {directory}")
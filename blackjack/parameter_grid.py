@@ -0,0 +1,142 @@
+"""
+Simulation of grids of configurations (cells) on one warm pool of workers.
+
+A grid spec is a JSON file of the settings shared by every cell (`games`, `seed`, `engine` and, optionally,
+`chunk_size`) and a `grid` of the values to sweep for each parameter (see PARAMETERS), e.g.
+
+    {"games": 1000, "seed": 42, "engine": "batch",
+     "grid": {"decks": [1, 6], "strategy": ["default", "optimal"], "auto_wager": [50, 100]}}
+
+Every combination of the values is a cell, and parameters left out of the grid take their `simulate.py` defaults.
+All cells are split into batches of games and scheduled round-robin onto a single pool, so cells finish at about the
+same pace and workers stay busy until the end. Workers switch between cells by re-running `init_worker`, with the
+strategies they load (and compile) cached per process. Each cell is played exactly as `simulate.py` would play it with
+the same settings and seed. When the grid is seeded, each cell's batch summaries are cached in the same ResultCache
+entry as a seeded simulation of its configuration (see blackjack.result_cache), so re-running a grid (or an
+overlapping one, or with more games) only simulates the games it hasn't seen.
+"""
+
+from functools import lru_cache, partial
+from itertools import product
+
+from blackjack.configuration import STRATEGY_MAP, get_simulation_configuration, load_strategy
+from blackjack.display_utils import money_format
+from blackjack.result_cache import DEFAULT_CACHE_SIZE, ResultCache, simulation_key
+from blackjack.simulation import ENGINES, default_chunk_size, game_batches, init_worker, run_games
+
+
+# Parameters that can be swept, with their defaults
+PARAMETERS = {
+    'decks': 3,
+    'strategy': 'default',
+    'bankroll': 1000.0,
+    'auto_wager': 100.0,
+    'turns': 100
+}
+
+# The cell a worker is currently set up for (see `run_cell_games`)
+_cell = None
+
+
+def grid_cells(spec, seed):
+    """Get the cells of a grid spec (dicts of every parameter and shared setting), in the order the grid lists them."""
+    unknown = set(spec.get('grid', {})) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unsupported grid parameters: {', '.join(sorted(unknown))}")
+    engine = spec.get('engine', 'headless')
+    if engine not in ENGINES:
+        raise ValueError(f"Unsupported engine: {engine}")
+    # Values are cast to their default's type, so that e.g. a bankroll of 1000 and 1000.0 are the same cell.
+    values = [
+        [type(default)(value) for value in spec.get('grid', {}).get(parameter, [default])]
+        for parameter, default in PARAMETERS.items()
+    ]
+    for strategy in values[list(PARAMETERS).index('strategy')]:
+        if strategy not in STRATEGY_MAP:
+            raise ValueError(f"Unsupported strategy: {strategy}")
+    shared = {'games': spec.get('games', 100), 'seed': seed, 'engine': engine}
+    return [dict(zip(PARAMETERS, combination), **shared) for combination in product(*values)]
+
+
+def cell_key(cell):
+    """Get the hash of a (seeded) cell's configuration, seed and engine, as a simulation of it is keyed."""
+    return simulation_key(cell_configuration(cell), cell['seed'], cell['engine'], None)
+
+
+def cell_cache(cell, max_bytes=DEFAULT_CACHE_SIZE):
+    """Get the cached batch summaries of a (seeded) cell, shared with seeded simulations of the same configuration."""
+    return ResultCache(cell_key(cell), max_bytes)
+
+
+@lru_cache(maxsize=None)
+def cached_strategy(name, number_of_decks):
+    """Load (and compile) a strategy once per process, for every cell that plays it."""
+    return load_strategy(name, number_of_decks)
+
+
+def cell_configuration(cell):
+    """Get the game configuration of a cell (as `simulate.py` builds it)."""
+    strategy = partial(cached_strategy, cell['strategy'], cell['decks'])
+    return get_simulation_configuration(cell['bankroll'], cell['auto_wager'], cell['decks'], strategy, cell['turns'])
+
+
+def run_cell_games(task):
+    """Run a (cell, batch of game indices) task inside a worker, setting the worker up for the cell if it isn't yet."""
+    global _cell
+    cell, game_indices = task
+    if cell != _cell:
+        init_worker(cell_configuration(cell), seed=cell['seed'], engine=cell['engine'])
+        _cell = cell
+    return run_games(game_indices)
+
+
+def cell_tasks(cells, chunk_size, first_games=None):
+    """
+    Split the games of each cell (from its first game index on, e.g. after its cached games) into batches and
+    interleave them round-robin (the first batch of every cell, then the second, ...), as (cell index, (cell, batch))
+    pairs.
+    """
+    first_games = first_games or [0] * len(cells)
+    batches = [
+        list(game_batches(cell['games'], chunk_size, first_game)) for cell, first_game in zip(cells, first_games)
+    ]
+    for round_index in range(max(map(len, batches), default=0)):
+        for index, cell in enumerate(cells):
+            if round_index < len(batches[index]):
+                yield index, (cell, batches[index][round_index])
+
+
+def grid_chunk_size(cells, concurrency):
+    """Number of games per task, aiming for a few batches per worker in each cell (as `simulate.py` does)."""
+    return max(default_chunk_size(cell['games'], concurrency) for cell in cells) if cells else 1
+
+
+def result_row(cell, summary):
+    """Get the row of the results table of a finished cell, as {column: value}."""
+    return {
+        'decks': cell['decks'],
+        'strategy': cell['strategy'],
+        'bankroll': cell['bankroll'],
+        'auto_wager': cell['auto_wager'],
+        'turns': cell['turns'],
+        'games': summary.games,
+        'hands': summary.turns,
+        'ev_per_hand': summary.mean_turn_net(),
+        'ev_per_hand_half_width': summary.turn_net_half_width(),
+        'avg_final_bankroll': summary.mean_final_bankroll(),
+        'avg_final_bankroll_half_width': summary.final_bankroll_half_width(),
+        'risk_of_ruin': summary.final_bankrolls[0.0] / summary.games
+    }
+
+
+def print_results(rows):
+    """Print the combined results table of a grid."""
+    print(f"{'Decks':>5} {'Strategy':<10} {'Bankroll':>12} {'Auto-Wager':>11} {'Turns':>6} {'Games':>8} {'Hands':>10} "
+          f"{'EV/Hand':>10} {'95% CI':>10} {'Avg Bankroll':>13} {'95% CI':>10} {'Ruin':>7}")
+    for row in rows:
+        print(f"{row['decks']:>5} {row['strategy']:<10} {money_format(row['bankroll']):>12} "
+              f"{money_format(row['auto_wager']):>11} {row['turns']:>6} {row['games']:>8,} {row['hands']:>10,} "
+              f"{money_format(row['ev_per_hand']):>10} {'± ' + money_format(row['ev_per_hand_half_width']):>10} "
+              f"{money_format(row['avg_final_bankroll']):>13} "
+              f"{'± ' + money_format(row['avg_final_bankroll_half_width']):>10} {row['risk_of_ruin']:>7.2%}")
+    print()
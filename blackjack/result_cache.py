@@ -0,0 +1,121 @@
+"""
+On-disk cache of the results of seeded simulations.
+
+A seeded simulation's results only depend on its configuration, seed and settings (see blackjack.simulation), so they
+are cached under a hash of all of them: the game configuration, with each strategy identified by its class and the
+contents of its compiled decision tables (so editing a strategy's CSVs invalidates its results), the seed, the engine
+and its ENGINE_VERSION, and the other settings that change what is summarized.
+
+An entry holds the summaries of consecutive batches of games from game 0, in order, which are merged into the same
+summary as a fresh simulation. A simulation asking for fewer games reuses the batches that fit, and one asking for more
+(or stopping on a target precision) continues after the last cached batch and extends the entry with its new batches.
+The cache is bounded in size: entries are touched when used, and the least recently used ones are evicted once the
+cache directory grows beyond its limit.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+from blackjack.cache_utils import cache_path
+from blackjack.simulation import ENGINE_VERSION
+
+
+# Default limit of the total size of the cached simulation results, in bytes
+DEFAULT_CACHE_SIZE = 256 * 2 ** 20
+
+
+def strategy_fingerprint(strategy):
+    """Identify a strategy by its class and, for static strategies, the contents of its compiled decision tables."""
+    strategy_class = type(strategy)
+    fingerprint = {'class': f"{strategy_class.__module__}.{strategy_class.__qualname__}"}
+    for table in ('split_table', 'soft_table', 'hard_table'):
+        if hasattr(strategy, table):
+            fingerprint[table] = list(getattr(strategy, table))
+    return fingerprint
+
+
+def simulation_key(configuration, seed, engine, strategies, sample_games=0, variance_reduction=()):
+    """
+    Get the hash of a simulation's configuration (with its strategy, or the several `strategies` compared), seed,
+    engine (and engine version) and the other settings that change its results.
+    """
+    gameplay = {key: value for key, value in configuration['gameplay'].items() if key != 'strategy'}
+    strategies = strategies or [configuration['gameplay']['strategy']]
+    description = {
+        'engine': engine,
+        'engine_version': ENGINE_VERSION,
+        'seed': seed,
+        'gambler': configuration['gambler'],
+        'shoe': configuration['shoe'],
+        'gameplay': gameplay,
+        'strategies': [strategy_fingerprint(strategy()) for strategy in strategies],
+        'sample_games': sample_games,
+        'variance_reduction': list(variance_reduction)
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+def evict(directory, max_bytes, keep=None):
+    """Delete the least recently used files of a directory (except `keep`) until its total size is within a limit."""
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+    files = sorted((os.stat(path).st_mtime, os.path.getsize(path), path) for path in paths if os.path.isfile(path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        if path != keep:
+            os.remove(path)
+            total -= size
+
+
+class ResultCache:
+    """The cached batch summaries (MetricSummaries or StrategyComparisons) of a simulation, from game 0 on."""
+
+    def __init__(self, key, max_bytes=DEFAULT_CACHE_SIZE):
+        self.path = cache_path('simulations', f"{key}.pickle")
+        self.max_bytes = max_bytes
+        self.summaries = []
+        self.games = 0  # Number of games cached (the index of the first game after them)
+        self.extended = False
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as cache_file:
+                self.summaries = pickle.load(cache_file)
+            self.games = sum(summary.games for summary in self.summaries)
+            os.utime(self.path)  # Mark the entry as recently used
+
+    def cached_summaries(self, games=None):
+        """Get the cached batch summaries of (up to) a number of games, or of all cached games, in order."""
+        cached = []
+        cached_games = 0
+        for summary in self.summaries:
+            if games is not None and cached_games + summary.games > games:
+                break
+            cached.append(summary)
+            cached_games += summary.games
+        return cached
+
+    def add(self, first_game, summary):
+        """Add the summary of a batch of games starting at a game index, if it continues the cached games."""
+        if first_game == self.games:
+            self.summaries.append(summary)
+            self.games += summary.games
+            self.extended = True
+
+    def extend(self, batch_summaries, first_game):
+        """Yield the summaries of consecutive batches of games from a game index on, adding each one as it goes."""
+        for summary in batch_summaries:
+            self.add(first_game, summary)
+            first_game += summary.games
+            yield summary
+
+    def save(self):
+        """Write the entry if it was extended (atomically), and evict old entries if the cache has grown too large."""
+        if not self.extended:
+            return
+        with open(f"{self.path}.tmp", 'wb') as cache_file:
+            pickle.dump(self.summaries, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{self.path}.tmp", self.path)
+        self.extended = False
+        evict(os.path.dirname(self.path), self.max_bytes, keep=self.path)
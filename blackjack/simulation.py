@@ -0,0 +1,203 @@
+"""
+Multiprocess helpers for simulating many games.
+
+Workers are handed the game configuration once, when the pool starts, and load (and compile) the configured strategy
+once per process. Each task is then just a batch (range) of game indices, and each result a compact MetricSummary of
+the whole batch, merged inside the worker. The parent folds batch summaries into a running summary as they arrive, in
+game order, without its memory growing with games or turns.
+
+Every game shuffles with its own random stream, derived from a master seed and the game's index, so a seeded
+simulation gives bit-identical results no matter how games are spread across workers and batches. With the 'batch'
+engine, each batch of games is played in lockstep by a BatchGameController. Its games shuffle with NumPy generators
+spawned the same way (which is much faster), so a seed reproduces a batch simulation too, but not the same games as the
+default 'headless' engine.
+
+Several strategies can be compared on shared shoes: each game's card piles are then shuffled once (see SharedShuffle)
+and played once per strategy, and the results are a StrategyComparison instead of a MetricSummary. Each strategy's
+shoe deals the piles at its own pace, so strategies that take different cards are dealt different hands from then on.
+
+Variance reduction techniques (see blackjack.analytics.variance_reduction) can be opted into. Their accumulators are
+kept with the summaries. With antithetic shuffles, games are paired up by index (0 and 1, 2 and 3, ...), and the
+second game of each pair is dealt the mirrored cards of the first, so a master seed is needed. The time spent in
+each phase of the games can be measured too (see PhaseTimings), and is kept with the summaries as well.
+"""
+
+import random
+from collections import deque
+from itertools import count
+
+import numpy as np
+
+from blackjack.analytics.metric_summary import merge_all
+from blackjack.analytics.phase_timings import PhaseTimings
+from blackjack.analytics.strategy_comparison import StrategyComparison, merge_comparisons
+from blackjack.analytics.variance_reduction import TECHNIQUES
+from blackjack.game_setup import setup_batch_game, setup_game
+from blackjack.models.shoe import AntitheticShuffler, SharedShuffle
+
+
+# Per-process state, set up once per worker by `init_worker`
+_configuration = None
+_strategies = []
+_sample_games = 0
+_seed = None
+_engine = 'headless'
+_variance_reduction = ()
+_time_phases = False
+
+# Engines that games can be played with (see `run_games`)
+ENGINES = ('headless', 'batch')
+
+# Number of games run per task when simulating until a target precision (or time budget) is reached
+ADAPTIVE_CHUNK_SIZE = 50
+
+# Bump when a change to the game engines (or to how games are summarized) changes the results of a seed, so that stale
+# results are not loaded from the result cache (see blackjack.result_cache)
+ENGINE_VERSION = 1
+
+
+def new_seed():
+    """Draw a fresh master seed from the operating system's entropy."""
+    return np.random.SeedSequence().entropy
+
+
+def game_rng(seed, game_index):
+    """Get the independent random stream of a game, spawned from a master seed (as `SeedSequence.spawn` would)."""
+    seed_sequence = np.random.SeedSequence(seed, spawn_key=(game_index,))
+    return random.Random(int(seed_sequence.generate_state(1, dtype=np.uint64)[0]))
+
+
+def game_generator(seed, game_index):
+    """Get the independent NumPy generator of a game, spawned from a master seed (as `SeedSequence.spawn` would)."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(game_index,)))
+
+
+def init_worker(configuration, sample_games=0, seed=None, engine='headless', strategies=None, variance_reduction=(),
+                time_phases=False):
+    """
+    Pool initializer: keep the configuration and load its strategy once for this worker process.
+    The full bankroll progression is kept for the first `sample_games` games. Games are shuffled with streams
+    derived from the master `seed` (see `game_rng`), or unseeded if there is none, and played with `engine`.
+    If a list of (several) `strategies` is given, they are compared on shared shoes instead of the configured one.
+    Accumulators of the `variance_reduction` techniques are kept with the summaries, and so are the timings of each
+    game's phases if `time_phases` is set.
+    """
+    global _configuration, _strategies, _sample_games, _seed, _engine, _variance_reduction, _time_phases
+    if engine not in ENGINES:
+        raise ValueError(f"Unsupported engine: {engine}")
+    for technique in variance_reduction:
+        if technique not in TECHNIQUES:
+            raise ValueError(f"Unsupported variance reduction technique: {technique}")
+    if 'antithetic' in variance_reduction and seed is None:
+        raise ValueError('Antithetic shuffles need a master seed, so both games of a pair get the same stream')
+    if time_phases and engine != 'headless':
+        raise ValueError('Phases can only be timed with the headless engine')
+    _configuration = configuration
+    _strategies = [strategy() for strategy in strategies or [configuration['gameplay']['strategy']]]
+    _sample_games = sample_games
+    _seed = seed
+    _engine = engine
+    _variance_reduction = tuple(variance_reduction)
+    _time_phases = time_phases
+
+
+def seeded_rng(make_rng, game_index):
+    """
+    Get the random stream of a game from the master seed (see `game_rng` and `game_generator`). With antithetic
+    shuffles, the second game of each pair gets the first game's stream, mirrored (see AntitheticShuffler).
+    """
+    if 'antithetic' not in _variance_reduction:
+        return make_rng(_seed, game_index)
+    rng = make_rng(_seed, game_index - game_index % 2)
+    return AntitheticShuffler(rng) if game_index % 2 else rng
+
+
+def shuffle_rngs(rng):
+    """Get the random generator of each strategy's shoe: a shuffle shared by all of them, if there are several."""
+    if len(_strategies) == 1:
+        return [rng]
+    shared_shuffle = SharedShuffle(_configuration['shoe']['number_of_decks'], rng)
+    return [shared_shuffle.shuffler() for _ in _strategies]
+
+
+def summarize_game(game_index, metric_trackers):
+    """Summarize the MetricTrackers of a game played by each strategy."""
+    keep_bankroll_progression = game_index < _sample_games
+    if len(metric_trackers) == 1:
+        return metric_trackers[0].summarize(keep_bankroll_progression, _variance_reduction, game_index)
+    return StrategyComparison.from_metric_trackers(
+        metric_trackers, keep_bankroll_progression, _variance_reduction, game_index
+    )
+
+
+def run_game(game_index):
+    """Build a configured game inside the worker, run it to completion and return a summary of its tracked metrics."""
+    rng = seeded_rng(game_rng, game_index) if _seed is not None else random.Random()
+    metric_trackers = []
+    for strategy, strategy_rng in zip(_strategies, shuffle_rngs(rng)):
+        timings = PhaseTimings() if _time_phases else None
+        game = setup_game(
+            _configuration, strategy=strategy, rng=strategy_rng, timings=timings, track_deals=bool(_variance_reduction)
+        )
+        game.play()
+        metric_trackers.append(game.metric_tracker)
+    return summarize_game(game_index, metric_trackers)
+
+
+def run_batch_game(game_indices):
+    """Play a batch of games in lockstep inside the worker and return a summary of each game's metrics, in order."""
+    rngs = [
+        shuffle_rngs(seeded_rng(game_generator, game_index) if _seed is not None else np.random.default_rng())
+        for game_index in game_indices
+    ]
+    strategy_metric_trackers = []
+    for index, strategy in enumerate(_strategies):
+        game = setup_batch_game(
+            _configuration, [game_rngs[index] for game_rngs in rngs], strategy=strategy,
+            track_deals=bool(_variance_reduction)
+        )
+        game.play()
+        strategy_metric_trackers.append(game.metric_trackers())
+    return (
+        summarize_game(game_index, metric_trackers)
+        for game_index, *metric_trackers in zip(game_indices, *strategy_metric_trackers)
+    )
+
+
+def run_games(game_indices):
+    """Run a batch of games inside the worker and return a single summary of all of them, in order."""
+    merge = merge_all if len(_strategies) == 1 else merge_comparisons
+    if _engine == 'batch':
+        return merge(run_batch_game(game_indices))
+    return merge(run_game(game_index) for game_index in game_indices)
+
+
+def game_batches(games, chunk_size, first_game=0):
+    """
+    Split a number of games (from the first game index on) into consecutive ranges of game indices of (at most) a
+    chunk size. If the number of games is None, the batches are endless.
+    """
+    if games is None:
+        return (range(start, start + chunk_size) for start in count(first_game, chunk_size))
+    return (range(start, min(start + chunk_size, games)) for start in range(first_game, games, chunk_size))
+
+
+def imap_bounded(pool, batches, max_pending):
+    """
+    Run batches of games in a pool and yield their summaries in order (as `pool.imap(run_games, batches)` would), but
+    with at most `max_pending` batches submitted ahead of the one being waited on. Batches can then be endless, and the
+    caller can stop consuming at any point, leaving only a few batches to discard.
+    """
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.apply_async(run_games, (batch,)))
+        if len(pending) >= max_pending:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def default_chunk_size(games, concurrency):
+    """Number of games to run per task, aiming for a few batches per worker (as `Pool.map` does)."""
+    chunk_size, extra = divmod(games, concurrency * 4)
+    return max(1, chunk_size + bool(extra))
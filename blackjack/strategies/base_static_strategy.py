@@ -1,48 +1,89 @@
+import csv
 import os
 
-from pandas import read_csv
+import numpy as np
 
-from blackjack.strategies.base_strategy import BaseStrategy
+from blackjack.models.card import CSV_FORMAT, NUM_CARDS
+from blackjack.strategies.base_strategy import ACTION_BITS, ACTION_CODES, ACTIONS, NO_PAIR, BaseStrategy
 
 
 DIRECTORY = os.path.dirname(os.path.realpath(__file__))
 
+# Dealer upcard / pair rank columns of the compiled tables, in the order CSV rows and headers are labelled.
+CSV_LABELS = ('A', '2', '3', '4', '5', '6', '7', '8', '9', '10')
+NUM_COLUMNS = len(CSV_LABELS)
+
+# Column (or split table row) of each encoded card in the compiled tables.
+CARD_INDEX = tuple(CSV_LABELS.index(CSV_FORMAT[card]) for card in range(NUM_CARDS))
+
+# Hand totals covered by the compiled hard/soft tables (anything above 21 is busted and never looked up).
+MAX_TOTAL = 21
+
+# Marker for table cells with no entry in the source CSV
+NO_ACTION = -1
+
+# Column of each encoded card, as an array for gathering (card codes of the first suit double as rank indices)
+CARD_INDICES = np.array(CARD_INDEX, dtype=np.int64)
+
+HIT, DOUBLE, SPLIT = (ACTION_CODES[action] for action in ('Hit', 'Double', 'Split'))
+
 
 class BaseStaticStrategy(BaseStrategy):
     """
     Base predetermined Strategy from which other static Strategies can be derrived.
     Note that concrete static Strategies must implement the required BaseStrategy methods omitted here.
+
+    Decision CSVs are loaded with the standard `csv` module (so simulations never import pandas) and compiled into
+    flat lists of action codes indexed by `row * NUM_COLUMNS + upcard column`. The same tables are kept as arrays for
+    deciding on batches of hands with `get_hand_actions`.
     """
 
-    def __init__(self, strategy_name):
+    def __init__(self, strategy_name, csv_directory=None):
         super().__init__()
-        self.split_df = self._load_df(strategy_name, 'split')
-        self.soft_df = self._load_df(strategy_name, 'soft')
-        self.hard_df = self._load_df(strategy_name, 'hard')
+        # CSVs are loaded from `csv/<strategy_name>/`, unless a directory (e.g. of generated tables) is given.
+        self.csv_directory = csv_directory or f"{DIRECTORY}/csv/{strategy_name}"
+        self.split_table = self._compile_table(self._load_csv('split'), CSV_LABELS, {'Yes': True, 'No': False}, False)
+        self.soft_table = self._compile_table(self._load_csv('soft'), range(MAX_TOTAL + 1), ACTION_CODES, NO_ACTION)
+        self.hard_table = self._compile_table(self._load_csv('hard'), range(MAX_TOTAL + 1), ACTION_CODES, NO_ACTION)
+        self.split_array = np.array(self.split_table, dtype=bool)
+        self.soft_array = np.array(self.soft_table, dtype=np.int64)
+        self.hard_array = np.array(self.hard_table, dtype=np.int64)
+
+    def _load_csv(self, csv_type):
+        """Load a CSV for determining actions, as a dictionary of {row label: {column label: cell}}."""
+        csv_path = os.path.join(self.csv_directory, f"{csv_type}.csv")
+        with open(csv_path, newline='') as csv_file:
+            header, *rows = csv.reader(csv_file)
+        return {row[0]: dict(zip(header[1:], row[1:])) for row in rows}
 
     @staticmethod
-    def _load_df(strategy_name, csv_type):
-        """Load a DataFrame from a CSV for determining actions."""
-        csv_path = f"{DIRECTORY}/csv/{strategy_name}/{csv_type}.csv"
-        return read_csv(csv_path, index_col=0)
+    def _compile_table(cells, rows, codes, default):
+        """Compile a decision CSV's cells into a flat list of codes, indexed by `row index * NUM_COLUMNS + column index`."""
+        table = [default] * (len(rows) * NUM_COLUMNS)
+        for row_index, row in enumerate(rows):
+            row_cells = cells.get(str(row))
+            if row_cells is None:
+                continue
+            for column_index, column in enumerate(CSV_LABELS):
+                table[row_index * NUM_COLUMNS + column_index] = codes[row_cells[column]]
+        return table
 
     def get_hand_action(self, hand, options, dealer_upcard):
         """Get the action to take on the hand ('Hit', 'Stand', etc.)"""
-        # Get the dealer value by which to look up the correct action
-        column = dealer_upcard.csv_format()
+        # Get the dealer column by which to look up the correct action
+        column = CARD_INDEX[dealer_upcard]
 
         # If splitting is an option, check if that action should be taken first.
         if 'Split' in options.values():
-            row = hand.cards[0].csv_format()
-            if self.split_df.at[row, column] == 'Yes':
+            if self.split_table[CARD_INDEX[hand.cards[0]] * NUM_COLUMNS + column]:
                 return 'Split'
 
-        # Use the appropriate 'soft' or 'hard' hand DataFrame to decide which action should be taken.
-        row = hand.final_total()
-        if hand.is_soft():
-            action = self.soft_df.at[row, column]
-        else:
-            action = self.hard_df.at[row, column]
+        # Use the appropriate 'soft' or 'hard' hand table to decide which action should be taken.
+        table = self.soft_table if hand.is_soft() else self.hard_table
+        code = table[hand.final_total() * NUM_COLUMNS + column]
+        if code == NO_ACTION:
+            raise KeyError(f"No strategy action for hand total {hand.final_total()} against dealer upcard {CSV_LABELS[column]}")
+        action = ACTIONS[code]
 
         # Handle the edge case where doubling is the recommended action, but the user doesn't have enough money to do so.
         if action == 'Double' and 'Double' not in options.values():
@@ -53,3 +94,32 @@ class BaseStaticStrategy(BaseStrategy):
             return 'Surrender'
         
         return action
+
+    def get_hand_actions(self, hard_totals, soft, pair_ranks, dealer_upcards, allowed):
+        """Get the action code to take on each of a batch of hands, with table gathers (see BaseStrategy)."""
+        hard_totals = np.asarray(hard_totals, dtype=np.int64)
+        soft = np.asarray(soft, dtype=bool)
+        pair_ranks = np.asarray(pair_ranks, dtype=np.int64)
+        allowed = np.asarray(allowed, dtype=np.int64)
+        column = CARD_INDICES[np.asarray(dealer_upcards, dtype=np.int64)]
+
+        # If splitting is an option, check if that action should be taken first.
+        pair = pair_ranks != NO_PAIR
+        split = (allowed & ACTION_BITS[SPLIT] != 0) & pair
+        split &= self.split_array[CARD_INDICES[np.where(pair, pair_ranks, 0)] * NUM_COLUMNS + column]
+
+        # Use the appropriate 'soft' or 'hard' hand table to decide which action should be taken.
+        index = (hard_totals + 10 * soft) * NUM_COLUMNS + column
+        actions = np.where(soft, self.soft_array[index], self.hard_array[index])
+        missing = (actions == NO_ACTION) & ~split
+        if missing.any():
+            hand = np.argmax(missing)
+            raise KeyError(
+                f"No strategy action for hand total {hard_totals[hand] + 10 * soft[hand]} against dealer upcard "
+                f"{CSV_LABELS[column[hand]]}"
+            )
+
+        # Hit when doubling is the recommended action, but the user doesn't have enough money to do so.
+        actions[(actions == DOUBLE) & (allowed & ACTION_BITS[DOUBLE] == 0)] = HIT
+        actions[split] = SPLIT
+        return actions
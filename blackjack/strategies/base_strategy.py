@@ -1,4 +1,64 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import numpy as np
+
+from blackjack.models.card import ACE
+from blackjack.models.hand import GamblerHand
+
+
+# Integer codes for hand actions, as used by compiled strategy tables.
+ACTIONS = ('Hit', 'Stand', 'Double', 'Split', 'Surrender')
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# Bit of each action (by code) in the allowed-action masks of the batched decision API. A mask ORs together the bits
+# of the actions that are options for a hand.
+ACTION_BITS = tuple(1 << code for code in range(len(ACTIONS)))
+
+# Keys of each action in an options OrderedDict (see GameController.get_hand_options)
+OPTION_KEYS = {'Hit': 'h', 'Stand': 's', 'Double': 'd', 'Split': 'x', 'Surrender': 'u'}
+
+# Pair rank of hands that are not a pair, in the batched decision API
+NO_PAIR = -1
+
+
+def action_mask(options):
+    """Get the allowed-action mask of an options OrderedDict."""
+    mask = 0
+    for action in options.values():
+        mask |= ACTION_BITS[ACTION_CODES[action]]
+    return mask
+
+
+def mask_options(mask):
+    """Get the options OrderedDict of an allowed-action mask (the inverse of `action_mask`)."""
+    return OrderedDict((OPTION_KEYS[action], action) for code, action in enumerate(ACTIONS) if mask & ACTION_BITS[code])
+
+
+def representative_hand(hard_total, soft, pair_rank):
+    """
+    Build a GamblerHand with a given hard total, softness and pair rank (or NO_PAIR), for asking a per-hand strategy.
+    Cards are of the first suit, so a card's code is its rank index. Hands always have at least two cards, and hard
+    hands that aren't pairs are two cards of different ranks when their total allows it (any total but 4 and above 20).
+    """
+    if pair_rank != NO_PAIR:
+        return GamblerHand(cards=[pair_rank, pair_rank])
+
+    if not soft and hard_total <= 20:
+        low = max(2, hard_total - 10)
+        high = hard_total - low
+        # A 10 with a 10 is split into a Ten and a Jack, which aren't a pair.
+        return GamblerHand(cards=[low - 1, high if low == high == 10 else high - 1])
+
+    cards = [ACE] if soft else []
+    remaining = hard_total - len(cards)
+    while remaining > 0:
+        value = min(10, remaining)
+        if remaining - value == 1:
+            value -= 1  # Don't leave a lone Ace, which would make a hard hand soft
+        cards.append(ACE if value == 1 else value - 1)
+        remaining -= value
+    return GamblerHand(cards=cards)
 
 
 class BaseStrategy(ABC):
@@ -16,6 +76,30 @@ class BaseStrategy(ABC):
     def get_hand_action(self, hand, options, dealer_upcard):
         """Get the action to take on the hand ('Hit', 'Stand', etc.)"""
 
+    def get_hand_actions(self, hard_totals, soft, pair_ranks, dealer_upcards, allowed):
+        """
+        Get the action code to take on each of a batch of hands (batched `get_hand_action`).
+
+        hard_totals - Array of hand totals, with every Ace counted as 1
+        soft - Boolean array of whether each hand is soft (has an Ace counted as 11)
+        pair_ranks - Array of the rank index of each hand's pair, or NO_PAIR
+        dealer_upcards - Array of the encoded cards the dealer is showing
+        allowed - Array of allowed-action masks (see ACTION_BITS)
+
+        Strategies that can decide on arrays override this. By default, each hand is decided by `get_hand_action`.
+        """
+        return np.fromiter(
+            (
+                ACTION_CODES[self.get_hand_action(representative_hand(hard_total, is_soft, pair_rank), mask_options(mask), upcard)]
+                for hard_total, is_soft, pair_rank, upcard, mask in zip(
+                    np.asarray(hard_totals).tolist(), np.asarray(soft).tolist(), np.asarray(pair_ranks).tolist(),
+                    np.asarray(dealer_upcards).tolist(), np.asarray(allowed).tolist()
+                )
+            ),
+            dtype=np.int64,
+            count=len(hard_totals)
+        )
+
     @abstractmethod
     def wants_even_money(self):
         """Get a yes/no response (bool) for whether a the gambler wants to take even money for a blackjack when facing an Ace."""
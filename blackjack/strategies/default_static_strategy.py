@@ -4,8 +4,8 @@ from blackjack.strategies.base_static_strategy import BaseStaticStrategy
 class DefaultStaticStrategy(BaseStaticStrategy):
     """Default StaticStrategy for optimal odds."""
 
-    def __init__(self):
-        super().__init__(strategy_name='default')
+    def __init__(self, strategy_name='default', csv_directory=None):
+        super().__init__(strategy_name=strategy_name, csv_directory=csv_directory)
 
     def wants_to_change_wager(self):
         """Get a yes/no response (bool) for whether the gambler wants to change their auto-wager."""
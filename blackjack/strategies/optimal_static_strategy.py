@@ -0,0 +1,9 @@
+from blackjack.odds.strategy_generator import strategy_directory
+from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
+
+
+class OptimalStaticStrategy(DefaultStaticStrategy):
+    """Same as the DefaultStaticStrategy except its CSVs are generated to maximize EV for the number of decks played."""
+
+    def __init__(self, number_of_decks=3):
+        super().__init__(strategy_name='optimal', csv_directory=strategy_directory(number_of_decks))
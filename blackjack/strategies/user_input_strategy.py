@@ -32,7 +32,7 @@ class UserInputStrategy(BaseStrategy):
         
         hand - GamblerHand instance
         options - OrderedDict of possible actions like: {'h': 'Hit', 's': 'Stand' ... }
-        dealer_upcard - Card instance dealer is showing (applicable to other InputControllers)
+        dealer_upcard - Encoded card the dealer is showing (applicable to other InputControllers)
         """
         # Formatted options to display to the user
         display_options = [f"{option} ({abbreviation})" for abbreviation, option in options.items()]
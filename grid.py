@@ -0,0 +1,84 @@
+"""Script for simulating a grid of configurations (see blackjack.parameter_grid) on one warm pool of workers."""
+
+import csv
+import json
+import multiprocessing as mp
+from argparse import ArgumentParser
+
+from tqdm import tqdm
+
+from blackjack.analytics.metric_summary import MetricSummary
+from blackjack.display_utils import clear, header
+from blackjack.parameter_grid import (
+    cell_cache, cell_tasks, grid_cells, grid_chunk_size, print_results, result_row, run_cell_games
+)
+from blackjack.result_cache import DEFAULT_CACHE_SIZE
+from blackjack.simulation import new_seed
+
+
+if __name__ == '__main__':
+
+    # Command line args
+    parser = ArgumentParser()
+    parser.add_argument('spec', help='JSON grid spec file')
+    parser.add_argument('--cache-size', help='Size limit of the cache of seeded simulation results, in megabytes', type=float, default=DEFAULT_CACHE_SIZE / 2 ** 20)
+    parser.add_argument('-c', '--concurrency', help='Number of game subprocesses to run simultaneously', type=int, default=4)
+    parser.add_argument('-o', '--output', help='CSV file to also write the results table to')
+    parser.add_argument('--no-cache', help='Simulate every cell, even those with cached results', action='store_true')
+    args = parser.parse_args()
+
+    with open(args.spec) as spec_file:
+        spec = json.load(spec_file)
+
+    # Every cell is played with the same master seed, so cells are compared on the same shoes.
+    seed = spec['seed'] if spec.get('seed') is not None else new_seed()
+    try:
+        cells = grid_cells(spec, seed)
+    except ValueError as error:
+        parser.error(str(error))
+
+    # Clear the terminal screen.
+    clear()
+
+    # Load the games of each cell that were already simulated (only seeded results are cached, as they can be
+    # reproduced), and schedule the batches of the games after them onto one pool.
+    use_cache = spec.get('seed') is not None and not args.no_cache
+    caches = [cell_cache(cell, args.cache_size * 2 ** 20) if use_cache else None for cell in cells]
+    summaries = [MetricSummary() for _ in cells]
+    for summary, cache, cell in zip(summaries, caches, cells):
+        for batch_summary in cache.cached_summaries(cell['games']) if cache else []:
+            summary.update(batch_summary)
+    pending = [index for index, cell in enumerate(cells) if summaries[index].games < cell['games']]
+    print(f"Simulating {len(pending)} of {len(cells)} cells ({len(cells) - len(pending)} cached)...\n")
+
+    # Batch summaries come back in the order their tasks were scheduled, which keeps each cell's batches in game order.
+    chunk_size = spec.get('chunk_size') or grid_chunk_size([cells[index] for index in pending], args.concurrency)
+    first_games = [summaries[index].games for index in pending]
+    scheduled = list(cell_tasks([cells[index] for index in pending], chunk_size, first_games))
+    remaining = {index: 0 for index in pending}
+    for task_index, _ in scheduled:
+        remaining[pending[task_index]] += 1
+
+    with mp.Pool(args.concurrency) as pool:
+        with tqdm(total=sum(cells[index]['games'] - summaries[index].games for index in pending)) as progress_bar:
+            tasks = (task for _, task in scheduled)
+            for (task_index, (_, game_indices)), batch_summary in zip(scheduled, pool.imap(run_cell_games, tasks)):
+                index = pending[task_index]
+                summaries[index].update(batch_summary)
+                progress_bar.update(batch_summary.games)
+                remaining[index] -= 1
+                if caches[index]:
+                    caches[index].add(game_indices.start, batch_summary)
+                    if not remaining[index]:
+                        caches[index].save()
+
+    # Combine the results of every cell into one table
+    rows = [result_row(cell, summary) for cell, summary in zip(cells, summaries)]
+    print(header('GRID RESULTS'))
+    print(f"Seed: {seed}\n")
+    print_results(rows)
+    if args.output and rows:
+        with open(args.output, 'w', newline='') as output_file:
+            writer = csv.DictWriter(output_file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
@@ -2,6 +2,7 @@
 
 from argparse import ArgumentParser
 
+from blackjack.analytics.plotting import PLOT_MODES
 from blackjack.analytics.single_game_analyzer import SingleGameAnalyzer
 from blackjack.configuration import get_interactive_configuration
 from blackjack.display_utils import clear, header
@@ -13,6 +14,8 @@ if __name__ == '__main__':
     # Command line args
     parser = ArgumentParser()
     parser.add_argument('-d', '--default', help='Use the default game setup instead of manually configuring', action='store_true')
+    parser.add_argument('--plots', help='Show the plots in a window, save them to --plot-file, or skip them', default='show', choices=PLOT_MODES)
+    parser.add_argument('--plot-file', help='File to save plots to with --plots file (its extension sets the format, e.g. .png or .svg)', default='game.png')
     args = parser.parse_args()
 
     # Clear the terminal screen.
@@ -31,4 +34,5 @@ if __name__ == '__main__':
     print(header('ANALYTICS'))
     analyzer = SingleGameAnalyzer(**game.metric_tracker.serialize_metrics())
     analyzer.print_summary()
-    analyzer.create_plots()
+    if args.plots != 'none':
+        analyzer.create_plots(args.plot_file if args.plots == 'file' else None)
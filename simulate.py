@@ -1,28 +1,27 @@
 """Script for analyzing how a strategy performs in repeated simulations of a set number of turns."""
 
 import multiprocessing as mp
+import sys
 from argparse import ArgumentParser
+from functools import partial
+from itertools import chain
+from time import perf_counter
 
 from tqdm import tqdm
 
+from blackjack.analytics.bankroll_distribution import BankrollDistribution, PayoutDistribution
+from blackjack.analytics.metric_summary import MetricSummary
 from blackjack.analytics.multi_game_analyzer import MultiGameAnalyzer
-from blackjack.configuration import get_simulation_configuration
-from blackjack.display_utils import clear, header
-from blackjack.game_setup import setup_game
-from blackjack.strategies.default_static_strategy import DefaultStaticStrategy
-from blackjack.strategies.insurance_static_strategy import InsuranceStaticStrategy
-
-
-STRATEGY_MAP = {
-    'default': DefaultStaticStrategy,
-    'insurance': InsuranceStaticStrategy
-}
-
-
-def worker(game):
-    """Multiprocess worker function to run a configured game to completion and return its tracked metrics."""
-    game.play()
-    return game.metric_tracker
+from blackjack.analytics.plotting import PLOT_MODES, labelled_path
+from blackjack.analytics.strategy_comparison import StrategyComparison
+from blackjack.analytics.variance_reduction import TECHNIQUES
+from blackjack.checkpoint import CHECKPOINT_INTERVAL, Checkpointer, load_checkpoint
+from blackjack.configuration import STRATEGY_MAP, get_simulation_configuration, load_strategy
+from blackjack.display_utils import clear, header, money_format
+from blackjack.result_cache import DEFAULT_CACHE_SIZE, ResultCache, simulation_key
+from blackjack.simulation import (
+    ADAPTIVE_CHUNK_SIZE, ENGINES, default_chunk_size, game_batches, imap_bounded, init_worker, new_seed
+)
 
 
 if __name__ == '__main__':
@@ -31,29 +30,141 @@ if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('-a', '--auto-wager', help='Initial Gambler auto-wager', type=float, default=100.0)
     parser.add_argument('-b', '--bankroll', help='Initial Gambler bankroll', type=float, default=1000.0)
+    parser.add_argument('--cache-size', help='Size limit of the cache of seeded simulation results, in megabytes', type=float, default=DEFAULT_CACHE_SIZE / 2 ** 20)
+    parser.add_argument('--checkpoint', help='File to checkpoint the running simulation to, to --resume it from if it is interrupted')
+    parser.add_argument('--checkpoint-interval', help='Number of seconds between checkpoints', type=float, default=CHECKPOINT_INTERVAL)
     parser.add_argument('-c', '--concurrency', help='Number of game subprocesses to run simultaneously', type=int, default=4)
+    parser.add_argument('--chunk-size', help='Number of games run (and merged) by a subprocess per task (default: a few batches per subprocess)', type=int)
+    parser.add_argument('--convolve', help='Compute the final bankroll distribution by convolving a distribution of hand payouts, instead of simulating every game (flat bets only)', action='store_true')
     parser.add_argument('-d', '--decks', help='Number of decks to play with', type=int, default=3)
-    parser.add_argument('-g', '--games', help='Number of games to simulate', type=int, default=100)
-    parser.add_argument('-s', '--strategy', help='Name of the gameplay strategy to use', default='default', choices=STRATEGY_MAP.keys())
+    parser.add_argument('-e', '--engine', help='Engine to play games with (batch plays the games of each task in lockstep)', default='headless', choices=ENGINES)
+    parser.add_argument('-g', '--games', help='Number of games to simulate (default: 100, or no limit with --precision/--time-budget)', type=int)
+    parser.add_argument('--no-cache', help='Simulate every game, without loading or caching the results of seeded simulations', action='store_true')
+    parser.add_argument('--plots', help='Show the plots in a window, save them to --plot-file, or skip them', default='show', choices=PLOT_MODES)
+    parser.add_argument('--payout-hands', help='Number of hands to simulate to estimate the hand payout distribution with --convolve', type=int, default=200000)
+    parser.add_argument('--plot-file', help='File to save plots to with --plots file (its extension sets the format, e.g. .png or .svg; strategy names are added when comparing)', default='simulation.png')
+    parser.add_argument('-p', '--precision', help='Stop once the 95%% confidence interval of the EV per hand (or of the per-turn differences, when comparing strategies) is within this many dollars', type=float)
+    parser.add_argument('--sample-games', help='Number of games to keep full bankroll progressions for', type=int, default=0)
+    parser.add_argument('--seed', help='Master random seed, for reproducible results (default: drawn at random)', type=int)
+    parser.add_argument('--resume', help='Continue the simulation from the last checkpoint in --checkpoint (with the same arguments)', action='store_true')
+    parser.add_argument('-s', '--strategy', help='Name of the gameplay strategy to use (several are compared on shared shoes, hand by hand)', nargs='+', default=['default'], choices=STRATEGY_MAP.keys())
     parser.add_argument('-t', '--turns', help='Max number of turns to play per game', type=int, default=100)
+    parser.add_argument('--time-budget', help='Stop after this many seconds of simulation', type=float)
+    parser.add_argument('--time-phases', help='Time each phase of the games and print a table of where the time went (headless engine only)', action='store_true')
+    parser.add_argument('--variance-reduction', help='Variance reduction techniques to estimate the EV per hand with (antithetic pairs up games on mirrored shoes)', nargs='+', default=[], choices=TECHNIQUES)
     args = parser.parse_args()
+    if args.time_phases and args.engine != 'headless':
+        parser.error('--time-phases needs the headless engine')
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs the --checkpoint file to resume from')
 
     # Clear the terminal screen.
     clear()
 
-    # Get the requested gameplay strategy
-    strategy = STRATEGY_MAP[args.strategy]
+    # Get the requested gameplay strategies (built inside each worker)
+    strategies = [partial(load_strategy, name, args.decks) for name in args.strategy]
+
+    # Several strategies are played on shared shoes, with the first as the baseline they are compared against.
+    compared_strategies = strategies if len(strategies) > 1 else None
 
     # Load the game configuration (in this case, the 'simulation' configuration).
-    configuration = get_simulation_configuration(args.bankroll, args.auto_wager, args.decks, strategy, args.turns)
+    configuration = get_simulation_configuration(args.bankroll, args.auto_wager, args.decks, strategies[0], args.turns)
+
+    # With a target precision or time budget, games are simulated until either is reached (or the number of games).
+    adaptive = args.precision is not None or args.time_budget is not None
+    games = args.games if args.games is not None or adaptive else 100
+
+    # Every game gets its own random stream derived from the master seed, so results only depend on the seed. A resumed
+    # simulation continues with the seed it was checkpointed with.
+    checkpoint = load_checkpoint(args.checkpoint) if args.resume else None
+    if checkpoint and args.seed is not None and args.seed != checkpoint['seed']:
+        parser.error(f"{args.checkpoint} was checkpointed with seed {checkpoint['seed']}")
+    seed = checkpoint['seed'] if checkpoint else args.seed if args.seed is not None else new_seed()
+
+    # Convolution mode: estimate each strategy's hand payouts once, and step the bankroll distribution through the turns.
+    if args.convolve:
+        print(header('ANALYTICS'))
+        print(f"Seed: {seed}\n")
+        for name, strategy in zip(args.strategy, strategies):
+            print(f"=== Strategy: {name} ===\n")
+            payouts = PayoutDistribution.simulate(strategy(), args.decks, args.payout_hands, seed=seed)
+            distribution = BankrollDistribution.convolve(payouts, args.bankroll, args.auto_wager, args.turns)
+            distribution.print_summary(payouts)
+        sys.exit()
+
+    # Seeded results are cached, so the games already simulated with the same configuration are loaded instead of being
+    # played again (phase timings are measurements, so timed simulations always play every game).
+    use_cache = args.seed is not None and not args.no_cache and not args.time_phases
+    key = None
+    if use_cache or args.checkpoint:
+        key = simulation_key(configuration, seed, args.engine, compared_strategies, args.sample_games,
+                             args.variance_reduction)
+    cache = ResultCache(key, args.cache_size * 2 ** 20) if use_cache else None
+    cached_summaries = cache.cached_summaries(games) if cache and not checkpoint else []
+
+    # The running summary is checkpointed periodically, and a resumed simulation starts from the checkpointed one.
+    if checkpoint and checkpoint['key'] != key:
+        parser.error(f"{args.checkpoint} was checkpointed with a different configuration")
+    checkpointer = Checkpointer(args.checkpoint, key, seed, args.checkpoint_interval) if args.checkpoint else None
 
-    # Multiprocess game execution and collect MetricTrackers from each simulated game (with a progress bar!)
+    # Multiprocess game execution and fold the MetricSummary (or StrategyComparison) of each batch of simulated games
+    # into a running summary, in game order (with a progress bar!), after those of the cached (or checkpointed) games.
+    # Games are built and their summaries merged inside the workers. Stopping early leaves the batches still running in
+    # the pool to be discarded.
     print('Running Game Simulations...\n')
-    with mp.Pool(args.concurrency) as pool:
-        results = list(tqdm(pool.imap(worker, (setup_game(configuration) for _ in range(args.games))), total=args.games))
+    if args.chunk_size:
+        chunk_size = args.chunk_size
+    else:
+        chunk_size = ADAPTIVE_CHUNK_SIZE if games is None else default_chunk_size(games, args.concurrency)
+    if checkpoint:
+        summary = checkpoint['summary']
+    else:
+        summary = StrategyComparison(len(compared_strategies)) if compared_strategies else MetricSummary()
+    initargs = (configuration, args.sample_games, seed, args.engine, compared_strategies, args.variance_reduction,
+                args.time_phases)
+    stop_reason = 'Game limit reached'
+    start = perf_counter() - (checkpoint['elapsed'] if checkpoint else 0.0)
+    with mp.Pool(args.concurrency, initializer=init_worker, initargs=initargs) as pool:
+        with tqdm(total=games, initial=summary.games) as progress_bar:
+            first_game = summary.games + sum(batch_summary.games for batch_summary in cached_summaries)
+            batch_summaries = imap_bounded(pool, game_batches(games, chunk_size, first_game), args.concurrency * 2)
+            if cache:
+                batch_summaries = chain(cached_summaries, cache.extend(batch_summaries, first_game))
+            for batch_summary in batch_summaries:
+                summary.update(batch_summary)
+                progress_bar.update(batch_summary.games)
+                if checkpointer:
+                    checkpointer.update(summary, perf_counter() - start)
+                if args.precision is not None and summary.best_turn_net_half_width(args.decks) <= args.precision:
+                    stop_reason = 'Target precision reached'
+                    break
+                if args.time_budget is not None and perf_counter() - start >= args.time_budget:
+                    stop_reason = 'Time budget ran out'
+                    break
+    if cache:
+        cache.save()
+    if checkpointer:
+        checkpointer.update(summary, perf_counter() - start, force=True)
 
     # Analyze the results of the games
     print(header('ANALYTICS'))
-    analyzer = MultiGameAnalyzer(results)
-    analyzer.print_summary()
-    analyzer.create_plots()
+    print(f"Seed: {seed}\n")
+    if adaptive:
+        hands = summary.summaries[0].turns if compared_strategies else summary.turns
+        print(f"{stop_reason} after {summary.games} games ({hands} hands), "
+              f"with a 95% confidence interval of ± {money_format(summary.best_turn_net_half_width(args.decks))} per hand.\n")
+    plot_file = args.plot_file if args.plots == 'file' else None
+    if not compared_strategies:
+        analyzer = MultiGameAnalyzer(summary, args.decks)
+        analyzer.print_summary()
+        if args.plots != 'none':
+            analyzer.create_plots(plot_file)
+    else:
+        analyzers = [MultiGameAnalyzer(strategy_summary, args.decks) for strategy_summary in summary.summaries]
+        for name, analyzer in zip(args.strategy, analyzers):
+            print(f"=== Strategy: {name} ===\n")
+            analyzer.print_summary()
+        summary.print_summary(args.strategy)
+        if args.plots != 'none':
+            for name, analyzer in zip(args.strategy, analyzers):
+                analyzer.create_plots(plot_file and labelled_path(plot_file, name))
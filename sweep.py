@@ -0,0 +1,70 @@
+"""Script for sweeping the final bankrolls of a strategy over many bankroll/wager pairs, from one set of recorded games."""
+
+import os
+from argparse import ArgumentParser
+from time import perf_counter
+
+import numpy as np
+
+from blackjack.analytics.metric_summary import Z_95, confidence_half_width
+from blackjack.analytics.unit_outcomes import UnitOutcomes
+from blackjack.configuration import STRATEGY_MAP, load_strategy
+from blackjack.display_utils import header, money_format
+from blackjack.simulation import new_seed
+
+
+if __name__ == '__main__':
+
+    # Command line args
+    parser = ArgumentParser()
+    parser.add_argument('-a', '--auto-wagers', help='Auto-wagers to sweep', type=float, nargs='+', default=[100.0])
+    parser.add_argument('-b', '--bankrolls', help='Initial bankrolls to sweep', type=float, nargs='+', default=[1000.0])
+    parser.add_argument('-d', '--decks', help='Number of decks to play with', type=int, default=3)
+    parser.add_argument('-g', '--games', help='Number of games to record (default: 10000)', type=int)
+    parser.add_argument('--seed', help='Master random seed, for reproducible results (default: drawn at random)', type=int)
+    parser.add_argument('-s', '--strategy', help='Name of the gameplay strategy to use', default='default', choices=STRATEGY_MAP.keys())
+    parser.add_argument('--store', help='File (.npz) to load recorded games from if it exists, or to save them to')
+    parser.add_argument('-t', '--turns', help='Max number of turns to play per game', type=int, default=100)
+    args = parser.parse_args()
+
+    strategy = load_strategy(args.strategy, args.decks)
+
+    # Record the games once (or load them), with a bankroll that never limits a bet.
+    start = perf_counter()
+    if args.store and os.path.exists(args.store):
+        outcomes = UnitOutcomes.load(args.store)
+        if outcomes.number_of_decks != args.decks:
+            parser.error(f"{args.store} was recorded with {outcomes.number_of_decks} decks")
+        if outcomes.strategy_name != type(strategy).__name__:
+            parser.error(f"{args.store} was recorded with {outcomes.strategy_name}")
+        if args.turns > outcomes.turns:
+            parser.error(f"{args.store} was recorded with {outcomes.turns} turns per game")
+        # The recorded games are replayed as they are, so a different number of games or seed can't apply to them.
+        if args.games is not None and args.games != outcomes.games:
+            print(f"Ignoring --games {args.games}: {args.store} holds {outcomes.games} games")
+        if args.seed is not None and args.seed != outcomes.seed:
+            print(f"Ignoring --seed {args.seed}: {args.store} was recorded with seed {outcomes.seed}")
+        print(f"Loaded {outcomes.games} games of {outcomes.turns} turns from {args.store} "
+              f"in {perf_counter() - start:.2f}s (seed {outcomes.seed})\n")
+    else:
+        seed = args.seed if args.seed is not None else new_seed()
+        games = args.games if args.games is not None else 10000
+        outcomes = UnitOutcomes.record(strategy, args.decks, games, args.turns, seed)
+        print(f"Recorded {outcomes.games} games of {outcomes.turns} turns in {perf_counter() - start:.2f}s (seed {seed})\n")
+        if args.store:
+            outcomes.save(args.store)
+
+    # Rescore the recorded games for every bankroll/wager pair.
+    print(header('SWEEP'))
+    print(f"{'Bankroll':>12} {'Auto-Wager':>12} {'Avg Bankroll':>14} {'95% CI':>12} {'Median':>12} "
+          f"{'Risk of Ruin':>13} {'Re-Simulated':>13} {'Time (s)':>9}")
+    for bankroll in args.bankrolls:
+        for auto_wager in args.auto_wagers:
+            start = perf_counter()
+            final, replayed = outcomes.final_bankrolls(strategy, bankroll, auto_wager, args.turns)
+            elapsed = perf_counter() - start
+            half_width = confidence_half_width(len(final), final.sum(), final @ final, Z_95)
+            print(f"{money_format(bankroll):>12} {money_format(auto_wager):>12} {money_format(final.mean()):>14} "
+                  f"{'± ' + money_format(half_width):>12} {money_format(np.median(final)):>12} "
+                  f"{(final == 0).mean():>13.2%} {replayed / len(final):>13.2%} {elapsed:>9.3f}")
+    print()